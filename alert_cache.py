@@ -1,77 +1,202 @@
 import os
 import pickle
 import logging
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Set, Union
+
+from cache_backends import CacheBackend, PickleCacheBackend, create_backend
+from compact_store import CompactSeenStore
 
 logger = logging.getLogger(__name__)
 
 
 class AlertCache:
-    """Manages a persistent cache of seen alerts to prevent duplicates"""
+    """Manages a persistent cache of seen alerts to prevent duplicates
+
+    Entries are stored through a pluggable backend (``CACHE_BACKEND``): an
+    append-only log (default), SQLite in WAL mode, or the legacy pickle file.
+    Only entries added or removed since the last save are written.
+
+    ``seen_alerts`` is kept ordered by the time each alert was marked, which
+    doubles as the expiry index: expired entries are always at the front, so
+    eviction pops from the front in O(expired) and runs on every mark_seen.
+    Because entries are only written by mark_seen, that order is also the
+    least-recently-used order used to enforce the ``max_entries`` cap.
 
-    def __init__(self, cache_file: str = "alert_cache.pkl", duration_hours: int = None):
-        self.cache_file = Path(cache_file)
+    With ``compact`` (``CACHE_COMPACT=1``) entries live in a CompactSeenStore
+    of binary UUIDs and float timestamps, optionally behind a Bloom filter
+    (``CACHE_BLOOM_FILTER=1``), for much lower memory use per alert.
+    """
+
+    def __init__(
+        self,
+        cache_file: str = "alert_cache.pkl",
+        duration_hours: int = None,
+        backend: Union[str, CacheBackend] = None,
+        max_entries: int = None,
+        compact: bool = None,
+        bloom_filter: bool = None,
+    ):
+        # The pickle file is the legacy format, still read for migration
+        self.legacy_file = Path(cache_file)
         self.duration_hours = duration_hours or int(
             os.getenv("CACHE_DURATION_HOURS", "24")
         )
-        self.seen_alerts: Dict[str, datetime] = {}
+        # Hard cap on cached alerts, 0 disables it
+        self.max_entries = (
+            max_entries
+            if max_entries is not None
+            else int(os.getenv("CACHE_MAX_ENTRIES", "100000"))
+        )
+        if not isinstance(backend, CacheBackend):
+            backend = create_backend(
+                backend or os.getenv("CACHE_BACKEND", "log"), self.legacy_file
+            )
+        self.backend = backend
+        self.cache_file = self.backend.path
+        self.compact = (
+            compact if compact is not None else os.getenv("CACHE_COMPACT") == "1"
+        )
+        self.bloom_filter = (
+            bloom_filter
+            if bloom_filter is not None
+            else os.getenv("CACHE_BLOOM_FILTER") == "1"
+        )
+        self.seen_alerts = self._new_store()
+        # Changes not yet written to the backend
+        self._added: Dict[str, datetime] = {}
+        self._removed: Set[str] = set()
+        # Lookups that found a duplicate / a new alert since startup
+        self.hits = 0
+        self.misses = 0
         self.load_cache()
 
     def load_cache(self):
         """Load the cache from disk"""
         try:
-            if self.cache_file.exists():
-                with open(self.cache_file, "rb") as f:
-                    self.seen_alerts = pickle.load(f)
+            if self.backend.exists():
+                self.seen_alerts = self._ordered(self.backend.load())
                 logger.info(f"Loaded {len(self.seen_alerts)} alerts from cache")
                 self.cleanup_expired()
+            elif (
+                not isinstance(self.backend, PickleCacheBackend)
+                and self.legacy_file.exists()
+            ):
+                self.migrate_legacy_cache()
             else:
                 logger.info("No existing cache file found, starting fresh")
         except Exception as e:
             logger.error(f"Failed to load cache: {e}")
-            self.seen_alerts = {}
+            self.seen_alerts = self._new_store()
+
+    def _new_store(self):
+        """Empty seen-alert map: an OrderedDict, or the compact store"""
+        if self.compact:
+            return CompactSeenStore(bloom=self.bloom_filter)
+        return OrderedDict()
+
+    def _ordered(self, entries: Dict[str, datetime]):
+        """Load entries oldest first to rebuild the expiry index"""
+        store = self._new_store()
+        for alert_uuid, timestamp in sorted(entries.items(), key=lambda item: item[1]):
+            store[alert_uuid] = timestamp
+        return store
+
+    def migrate_legacy_cache(self):
+        """Import the legacy pickle file into the configured backend"""
+        with open(self.legacy_file, "rb") as f:
+            self.seen_alerts = self._ordered(pickle.load(f))
+        self.cleanup_expired()
+        self.backend.replace_all(self.seen_alerts)
+        self._added.clear()
+        self._removed.clear()
+        # Keep the old file around, but never import it a second time
+        self.legacy_file.rename(
+            self.legacy_file.with_name(self.legacy_file.name + ".migrated")
+        )
+        logger.info(
+            f"Migrated {len(self.seen_alerts)} alerts from {self.legacy_file} "
+            f"to {self.backend.name} cache {self.cache_file}"
+        )
 
     def save_cache(self):
-        """Save the cache to disk"""
+        """Write entries added or removed since the last save to disk"""
         try:
-            with open(self.cache_file, "wb") as f:
-                pickle.dump(self.seen_alerts, f)
-            logger.debug(f"Saved {len(self.seen_alerts)} alerts to cache")
+            self.backend.flush(self.seen_alerts, self._added, self._removed)
+            logger.debug(
+                f"Saved {len(self._added)} new and {len(self._removed)} removed alerts to cache"
+            )
+            self._added = {}
+            self._removed = set()
         except Exception as e:
             logger.error(f"Failed to save cache: {e}")
 
     def cleanup_expired(self):
         """Remove expired alerts from cache"""
+        removed_count = self._evict()
+        if removed_count > 0:
+            logger.info(f"Cleaned up {removed_count} expired alerts from cache")
+
+    def _evict(self) -> int:
+        """Pop expired and over-cap entries off the front of the expiry index"""
         cutoff_time = datetime.now() - timedelta(hours=self.duration_hours)
-        before_count = len(self.seen_alerts)
+        removed_count = 0
 
-        # Remove expired entries
-        expired_uuids = [
-            uuid
-            for uuid, timestamp in self.seen_alerts.items()
-            if timestamp < cutoff_time
-        ]
+        while self.seen_alerts:
+            oldest_uuid, timestamp = next(iter(self.seen_alerts.items()))
+            over_cap = 0 < self.max_entries < len(self.seen_alerts)
+            if timestamp >= cutoff_time and not over_cap:
+                break
+            self.seen_alerts.popitem(last=False)
+            self._forget(oldest_uuid)
+            removed_count += 1
 
-        for uuid in expired_uuids:
-            del self.seen_alerts[uuid]
+        return removed_count
 
-        removed_count = before_count - len(self.seen_alerts)
-        if removed_count > 0:
-            logger.info(f"Cleaned up {removed_count} expired alerts from cache")
+    def _forget(self, alert_uuid: str):
+        """Record that an entry was dropped so the next save removes it"""
+        self._added.pop(alert_uuid, None)
+        self._removed.add(alert_uuid)
+
+    def clear(self):
+        """Delete the cache from memory and disk"""
+        self.backend.clear()
+        self.seen_alerts = self._new_store()
+        self._added = {}
+        self._removed = set()
 
     def is_seen(self, alert_uuid: str) -> bool:
         """Check if an alert has been seen before"""
-        return alert_uuid in self.seen_alerts
+        if alert_uuid in self.seen_alerts:
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
 
     def mark_seen(self, alert_uuid: str):
-        """Mark an alert as seen"""
-        self.seen_alerts[alert_uuid] = datetime.now()
+        """Mark an alert as seen, evicting anything that expired or overflowed"""
+        timestamp = datetime.now()
+        self.seen_alerts[alert_uuid] = timestamp
+        self.seen_alerts.move_to_end(alert_uuid)
+        # Re-added last, so the backend writes entries in recency order
+        self._added.pop(alert_uuid, None)
+        self._added[alert_uuid] = timestamp
+        self._removed.discard(alert_uuid)
+
+        removed_count = self._evict()
+        if removed_count > 0:
+            logger.debug(f"Evicted {removed_count} alerts from cache")
 
     def get_stats(self) -> Dict[str, int]:
         """Get cache statistics"""
         return {
             "total_alerts": len(self.seen_alerts),
             "cache_duration_hours": self.duration_hours,
+            "max_entries": self.max_entries,
+            "compact": self.compact,
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
         }
@@ -0,0 +1,118 @@
+import os
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Async token-bucket rate limiter
+
+    Waiters are served in arrival order; ``rate`` tokens are added per second
+    up to ``capacity``, which bounds the size of a burst.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AlertPipeline:
+    """Staged filter -> geocode -> notify pipeline for new alerts
+
+    Stages are connected by bounded queues and each runs its own pool of
+    workers, so a burst of alerts takes roughly as long as the slowest stage
+    instead of the sum of every geocode and notification.
+    """
+
+    def __init__(
+        self,
+        accept: Callable[[dict], bool],
+        geocode: Callable[[dict], Awaitable[Any]],
+        notify: Callable[[dict, Any], Awaitable[None]],
+        geocode_workers: int = None,
+        notify_workers: int = None,
+        queue_size: int = None,
+    ):
+        self.accept = accept
+        self.geocode = geocode
+        self.notify = notify
+        self.geocode_workers = geocode_workers or int(
+            os.getenv("PIPELINE_GEOCODE_WORKERS", "4")
+        )
+        self.notify_workers = notify_workers or int(
+            os.getenv("PIPELINE_NOTIFY_WORKERS", "8")
+        )
+        self.queue_size = queue_size or int(os.getenv("PIPELINE_QUEUE_SIZE", "32"))
+
+    async def run(self, alerts: Iterable[dict]) -> int:
+        """Push alerts through every stage and return how many passed the filter"""
+        geocode_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        notify_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        workers = [
+            asyncio.create_task(self._geocode_worker(geocode_queue, notify_queue))
+            for _ in range(self.geocode_workers)
+        ] + [
+            asyncio.create_task(self._notify_worker(notify_queue))
+            for _ in range(self.notify_workers)
+        ]
+
+        accepted = 0
+        try:
+            # Filter stage: cheap and synchronous, feeds the bounded geocode queue
+            for alert in alerts:
+                if self.accept(alert):
+                    accepted += 1
+                    await geocode_queue.put(alert)
+
+            await geocode_queue.join()
+            await notify_queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        return accepted
+
+    async def _geocode_worker(
+        self, geocode_queue: asyncio.Queue, notify_queue: asyncio.Queue
+    ):
+        while True:
+            alert = await geocode_queue.get()
+            try:
+                result = await self.geocode(alert)
+                await notify_queue.put((alert, result))
+            except Exception as e:
+                logger.error(f"Geocode stage error for {alert.get('uuid')}: {e}")
+            finally:
+                geocode_queue.task_done()
+
+    async def _notify_worker(self, notify_queue: asyncio.Queue):
+        while True:
+            alert, result = await notify_queue.get()
+            try:
+                await self.notify(alert, result)
+            except Exception as e:
+                logger.error(f"Notify stage error for {alert.get('uuid')}: {e}")
+            finally:
+                notify_queue.task_done()
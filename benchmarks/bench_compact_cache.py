@@ -0,0 +1,93 @@
+"""Benchmark memory and lookup cost of the seen-alert stores.
+
+Compares the OrderedDict[str, datetime] AlertCache uses by default with
+CompactSeenStore, with and without its Bloom pre-filter. Run with:
+
+    pipenv run python benchmarks/bench_compact_cache.py --sizes 10000,100000,1000000
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import typer
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from compact_store import CompactSeenStore  # noqa: E402
+
+STORES = {
+    "dict": lambda: OrderedDict(),
+    "compact": lambda: CompactSeenStore(),
+    "compact+bloom": lambda: CompactSeenStore(bloom=True),
+}
+
+
+def build_store(name: str, keys):
+    store = STORES[name]()
+    base = datetime.now()
+    for offset, key in enumerate(keys):
+        # Copy the key so the store owns its strings, as it does for parsed JSON
+        store[(key + " ")[:-1]] = base + timedelta(seconds=offset)
+    return store
+
+
+def bench_store(name: str, keys, misses, lookups: int):
+    gc.collect()
+    tracemalloc.start()
+    store = build_store(name, keys)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del store
+
+    gc.collect()
+    start = time.perf_counter()
+    store = build_store(name, keys)
+    insert_time = time.perf_counter() - start
+
+    hits = keys[:lookups]
+    start = time.perf_counter()
+    for key in hits:
+        key in store
+    hit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in misses:
+        key in store
+    miss_time = time.perf_counter() - start
+
+    del store
+    return memory, insert_time, hit_time / len(hits), miss_time / len(misses)
+
+
+def main(
+    sizes: str = typer.Option(
+        "10000,100000,1000000", "--sizes", help="Comma-separated entry counts"
+    ),
+    lookups: int = typer.Option(100000, "--lookups", help="Lookups per measurement"),
+):
+    """Compare memory per entry and lookup latency of the seen-alert stores"""
+    typer.echo(
+        f"{'entries':>9} {'store':<14} {'memory':>10} {'bytes/entry':>12} "
+        f"{'insert s':>9} {'hit us':>7} {'miss us':>8}"
+    )
+    for size in (int(value) for value in sizes.split(",")):
+        keys = [str(uuid.uuid4()) for _ in range(size)]
+        misses = [str(uuid.uuid4()) for _ in range(min(lookups, size))]
+        for name in STORES:
+            memory, insert_time, hit, miss = bench_store(
+                name, keys, misses, min(lookups, size)
+            )
+            typer.echo(
+                f"{size:>9} {name:<14} {memory / 1e6:>8.1f}MB {memory / size:>12.1f} "
+                f"{insert_time:>9.2f} {hit * 1e6:>7.2f} {miss * 1e6:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,108 @@
+"""Benchmark georss parsing: whole-payload json vs the selective parser.
+
+Scales sample_waze_response.json up to realistic sizes (alerts, jams and users
+are all replicated) and measures parse time and peak memory for:
+
+- baseline: json.loads of the whole payload, then filter, as before
+- each selective backend that is installed (ijson streaming, orjson, json)
+
+Run with:
+
+    pipenv run python benchmarks/bench_georss_parse.py --scales 10,50,200
+"""
+
+import copy
+import json
+import sys
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+import typer
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import georss_parser  # noqa: E402
+
+WATCHED = {"POLICE"}
+
+
+def build_payload(scale: int) -> bytes:
+    """Replicate the sample response; a tenth of the alerts become POLICE"""
+    sample = json.loads((ROOT / "sample_waze_response.json").read_text())
+    payload = dict(sample)
+    for key in ("alerts", "jams", "users"):
+        items = []
+        for _ in range(scale):
+            for item in sample.get(key, []):
+                item = copy.deepcopy(item)
+                if "uuid" in item:
+                    item["uuid"] = str(uuid.uuid4())
+                items.append(item)
+        payload[key] = items
+    for index, alert in enumerate(payload["alerts"]):
+        if index % 10 == 0:
+            alert["type"] = "POLICE"
+    return json.dumps(payload).encode()
+
+
+def baseline(payload: bytes):
+    data = json.loads(payload)
+    alerts = data.get("alerts", [])
+    return [alert for alert in alerts if alert.get("type") == "POLICE"]
+
+
+def selective(backend: str):
+    """parse_alerts pinned to one backend"""
+
+    def parse(payload: bytes):
+        return georss_parser.parse_alerts(payload, WATCHED, backend).alerts
+
+    return parse
+
+
+def measure(parse, payload: bytes, repeat: int):
+    tracemalloc.start()
+    kept = parse(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse(payload)
+    elapsed = (time.perf_counter() - start) / repeat
+    return len(kept), elapsed, peak
+
+
+def main(
+    scales: str = typer.Option(
+        "10,50,200", "--scales", help="Comma-separated sample replication factors"
+    ),
+    repeat: int = typer.Option(5, "--repeat", help="Timed runs per measurement"),
+):
+    """Compare parse time and peak memory of the georss parsers"""
+    parsers = {"baseline json": baseline}
+    if georss_parser.backend_module("ijson") is not None:
+        parsers["selective ijson"] = selective("ijson")
+    if georss_parser.backend_module("orjson") is not None:
+        parsers["selective orjson"] = selective("orjson")
+    parsers["selective json"] = selective("json")
+
+    typer.echo(
+        f"{'alerts':>7} {'payload':>9} {'parser':<17} {'kept':>5} {'ms':>8} {'peak MB':>8}"
+    )
+    for scale in (int(value) for value in scales.split(",")):
+        payload = build_payload(scale)
+        alerts = len(json.loads(payload)["alerts"])
+        for name, parse in parsers.items():
+            kept, elapsed, peak = measure(parse, payload, repeat)
+            typer.echo(
+                f"{alerts:>7} {len(payload) / 1e6:>7.1f}MB {name:<17} {kept:>5} "
+                f"{elapsed * 1000:>8.1f} {peak / 1e6:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,71 @@
+"""Load benchmark of the whole poll pipeline on replayed georss payloads.
+
+Scales sample_waze_response.json to each alert volume and duplicate ratio and
+feeds it through check_waze_alerts with local stubs in place of Waze,
+Nominatim, Pushover and Discord (see `main.py replay`). Reports throughput,
+cycle latency percentiles and peak traced memory. Run with:
+
+    pipenv run python benchmarks/bench_replay.py --alerts 100,1000 --duplicate-ratios 0,0.9
+"""
+
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+import typer
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main  # noqa: E402
+from replay import (  # noqa: E402
+    SAMPLE_PAYLOAD,
+    load_payloads,
+    percentile,
+    synthesize_cycles,
+)
+
+
+def run(
+    alerts: str = typer.Option(
+        "100,1000", "--alerts", help="Comma-separated alerts per cycle"
+    ),
+    duplicate_ratios: str = typer.Option(
+        "0,0.5,0.9", "--duplicate-ratios", help="Comma-separated duplicate ratios"
+    ),
+    cycles: int = typer.Option(10, "--cycles", help="Poll cycles per measurement"),
+    recipients: int = typer.Option(
+        1, "--recipients", help="Stub Pushover users and Discord webhooks each"
+    ),
+    trace_memory: bool = typer.Option(
+        True, "--trace-memory/--no-trace-memory", help="Measure peak memory"
+    ),
+):
+    """Measure alerts/s, cycle latency and memory across alert volumes"""
+    logging.getLogger().setLevel(logging.WARNING)
+    templates = load_payloads([str(SAMPLE_PAYLOAD)])
+
+    typer.echo(
+        f"{'alerts':>7} {'dup':>5} {'new':>7} {'alerts/s':>9} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'peak MB':>8}"
+    )
+    for volume in (int(value) for value in alerts.split(",")):
+        for ratio in (float(value) for value in duplicate_ratios.split(",")):
+            payloads = synthesize_cycles(templates, volume, cycles, ratio, main.bounds)
+            stats = asyncio.run(
+                main.replay_cycles(payloads, None, recipients, trace_memory)
+            )
+            peak = f"{stats.peak_memory / 1e6:>8.1f}" if trace_memory else f"{'-':>8}"
+            typer.echo(
+                f"{volume:>7} {ratio:>5.2f} {stats.new_alerts:>7} "
+                f"{stats.alerts_per_second:>9.1f} "
+                + " ".join(
+                    f"{percentile(stats.latencies, q) * 1000:>8.1f}"
+                    for q in (50, 95, 99)
+                )
+                + f" {peak}"
+            )
+
+
+if __name__ == "__main__":
+    typer.run(run)
@@ -0,0 +1,97 @@
+"""Benchmark pooled vs per-request HTTP sessions against a local stub server.
+
+Simulates one poll cycle: a Waze fetch, one geocode per new alert and one
+notification per alert per recipient. Run with:
+
+    pipenv run python benchmarks/bench_session_pool.py --alerts 15 --recipients 4
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import typer
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from session_manager import SessionManager, session_for  # noqa: E402
+
+
+async def start_stub_server() -> web.AppRunner:
+    """Start a stub HTTP server that answers every request with a tiny JSON body"""
+
+    async def handler(request: web.Request) -> web.Response:
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner
+
+
+async def run_cycle(base_url: str, alerts: int, recipients: int, session_manager):
+    """Issue the requests of one poll cycle, sequentially like check_waze_alerts"""
+    urls = [f"{base_url}/live-map/api/georss"]
+    for _ in range(alerts):
+        urls.append(f"{base_url}/reverse")
+        urls.extend(f"{base_url}/notify" for _ in range(recipients))
+
+    for url in urls:
+        async with session_for(url, session_manager) as session:
+            async with session.get(url) as response:
+                await response.read()
+    return len(urls)
+
+
+async def bench(alerts: int, recipients: int, cycles: int):
+    runner = await start_stub_server()
+    port = runner.addresses[0][1]
+    base_url = f"http://127.0.0.1:{port}"
+
+    try:
+        # Warm up the server side
+        await run_cycle(base_url, 1, 1, None)
+
+        start = time.perf_counter()
+        for _ in range(cycles):
+            requests = await run_cycle(base_url, alerts, recipients, None)
+        fresh = (time.perf_counter() - start) / cycles
+
+        async with SessionManager() as session_manager:
+            await run_cycle(base_url, 1, 1, session_manager)
+            start = time.perf_counter()
+            for _ in range(cycles):
+                await run_cycle(base_url, alerts, recipients, session_manager)
+            pooled = (time.perf_counter() - start) / cycles
+    finally:
+        await runner.cleanup()
+
+    typer.echo(f"Requests per cycle: {requests}")
+    typer.echo(f"  New session per request: {fresh * 1000:.2f} ms/cycle")
+    typer.echo(f"  Pooled sessions:         {pooled * 1000:.2f} ms/cycle")
+    typer.echo(
+        f"  Saved per cycle:         {(fresh - pooled) * 1000:.2f} ms "
+        f"({(fresh - pooled) / requests * 1000:.3f} ms/request)"
+    )
+    typer.echo(
+        "Note: the stub server is plain HTTP on loopback; real upstreams add "
+        "DNS and TLS handshakes, so savings in production are larger."
+    )
+
+
+def main(
+    alerts: int = typer.Option(15, "--alerts", help="New alerts per cycle"),
+    recipients: int = typer.Option(4, "--recipients", help="Recipients per alert"),
+    cycles: int = typer.Option(20, "--cycles", help="Cycles to average over"),
+):
+    """Compare per-request sessions with the pooled SessionManager"""
+    asyncio.run(bench(alerts, recipients, cycles))
+
+
+if __name__ == "__main__":
+    typer.run(main)
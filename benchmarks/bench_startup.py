@@ -0,0 +1,81 @@
+"""Startup time of each CLI subcommand.
+
+Runs `main.py <command> --help` for every registered command, plus the
+lightweight commands themselves, in fresh interpreters and reports the
+wall-clock time of each. The commands run in a temporary directory so the
+real cache, outbox and log files are untouched. Run with:
+
+    pipenv run python benchmarks/bench_startup.py --runs 10
+"""
+
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+import typer
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Commands that finish without network access
+LIGHTWEIGHT_COMMANDS = [
+    ["cache-stats"],
+    ["outbox"],
+    ["show-bounds", "--save", "bounds.html"],
+]
+
+
+def command_names() -> List[str]:
+    """Names of the commands registered on the typer app"""
+    import main
+
+    return [
+        command.name or command.callback.__name__.replace("_", "-")
+        for command in main.app.registered_commands
+    ]
+
+
+def time_command(args: List[str], runs: int, cwd: str) -> List[float]:
+    """Wall-clock seconds of each run of main.py with the given arguments"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, str(ROOT / "main.py"), *args],
+            cwd=cwd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run(
+    runs: int = typer.Option(5, "--runs", help="Interpreter launches per command"),
+):
+    """Measure how long each subcommand takes to start"""
+    cases = [["--help"]] + [[name, "--help"] for name in command_names()]
+    cases += LIGHTWEIGHT_COMMANDS
+
+    typer.echo(f"{'command':<32} {'min ms':>8} {'median ms':>10} {'max ms':>8}")
+    with tempfile.TemporaryDirectory() as cwd:
+        # Keep the bare interpreter start-up as a floor for comparison
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        floor = (time.perf_counter() - start) * 1000
+        typer.echo(f"{'(python -c pass)':<32} {floor:>8.1f}")
+        for args in cases:
+            timings = [t * 1000 for t in time_command(args, runs, cwd)]
+            typer.echo(
+                f"{' '.join(args):<32} {min(timings):>8.1f} "
+                f"{statistics.median(timings):>10.1f} {max(timings):>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    typer.run(run)
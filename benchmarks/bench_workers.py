@@ -0,0 +1,107 @@
+"""Throughput of `monitor --workers N` against a local stub georss server.
+
+Serves one large synthetic payload (sample_waze_response.json scaled to
+``--alerts`` alerts over the default bounds) from a stub process and polls it
+``--cycles`` times with each worker count through the real coordinator and
+worker processes. Reports alerts fetched and parsed per second and the speedup
+over one worker; expect it to track the number of free cores. Run with:
+
+    pipenv run python benchmarks/bench_workers.py --workers 1,2,4 --alerts 20000
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import typer
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from replay import (  # noqa: E402
+    SAMPLE_PAYLOAD,
+    StubUpstreams,
+    load_payloads,
+    synthesize_cycles,
+)
+
+
+def serve_stub(payload: dict, urls):
+    """Run the stub upstreams in their own process so they do not share a core"""
+
+    async def serve():
+        async with StubUpstreams(alert_cap=10**9) as stubs:
+            stubs.payload = payload
+            urls.put((stubs.georss_url, stubs.nominatim_url, stubs.pushover_url))
+            await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+def run(
+    workers: str = typer.Option("1,2,4", "--workers", help="Comma-separated counts"),
+    alerts: int = typer.Option(20000, "--alerts", help="Alerts in the payload"),
+    cycles: int = typer.Option(20, "--cycles", help="Polls per worker"),
+):
+    """Measure alerts/s polled by each number of worker processes"""
+    # Caches, outbox and log land in a scratch directory
+    os.chdir(tempfile.mkdtemp(prefix="bench-workers-"))
+    context = multiprocessing.get_context("spawn")
+    urls = context.Queue()
+    # Bounds match main.bounds without importing main before the env is set
+    bounds = {"top": 34.8233, "bottom": 32.5123, "left": -119.2073, "right": -117.6461}
+    payload = synthesize_cycles(
+        load_payloads([str(SAMPLE_PAYLOAD)]), alerts, 1, 0, bounds
+    )[0]
+    stub = context.Process(target=serve_stub, args=(payload, urls), daemon=True)
+    stub.start()
+    georss_url, nominatim_url, pushover_url = urls.get(timeout=30)
+
+    # Worker processes read their configuration from the environment
+    os.environ.update(
+        {
+            "WAZE_GEORSS_URL": georss_url,
+            "NOMINATIM_URL": nominatim_url,
+            "PUSHOVER_API_URL": pushover_url,
+            "PUSHOVER_API_KEY": "bench",
+            "PUSHOVER_USER_KEYS": "bench-user",
+            "NOMINATIM_RATE_LIMIT": "1000000",
+            "WAZE_TILE_ALERT_CAP": str(10**9),
+        }
+    )
+    import main
+    from alert_cache import AlertCache
+    from geocode_cache import GeocodeCache
+    from regions import Region
+    from spatial_dedupe import SpatialDedupe
+
+    logging.getLogger().setLevel(logging.WARNING)
+    alert_types = sorted({alert["type"] for alert in payload["alerts"]})
+    region = Region(name="bench", bounds=bounds, alert_types=alert_types)
+
+    typer.echo(f"{'workers':>7} {'seconds':>8} {'alerts/s':>10} {'speedup':>8}")
+    baseline = None
+    try:
+        for count in (int(value) for value in workers.split(",")):
+            # Every run starts cold so the coordinator does the same work
+            main.alert_cache = AlertCache(cache_file=f"alerts-{count}.pkl")
+            main.geocode_cache = GeocodeCache(cache_file=f"geocode-{count}.pkl")
+            main.spatial_dedupe = SpatialDedupe()
+            start = time.perf_counter()
+            main.run_workers([region], count, cycles=cycles)
+            elapsed = time.perf_counter() - start
+            rate = alerts * cycles / elapsed
+            baseline = baseline or rate
+            typer.echo(
+                f"{count:>7} {elapsed:>8.2f} {rate:>10.0f} {rate / baseline:>7.2f}x"
+            )
+    finally:
+        stub.terminate()
+
+
+if __name__ == "__main__":
+    typer.run(run)
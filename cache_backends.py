@@ -0,0 +1,241 @@
+import os
+import pickle
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable
+
+if TYPE_CHECKING:
+    # Only the sqlite backend needs sqlite3; it is imported when first opened
+    import sqlite3
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend:
+    """Storage for AlertCache entries
+
+    ``flush`` receives the full in-memory cache plus the entries added and
+    removed since the previous flush, so incremental backends only write the
+    delta while the legacy pickle backend can still rewrite everything.
+    """
+
+    name = "base"
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def size_bytes(self) -> int:
+        return self.path.stat().st_size if self.path.exists() else 0
+
+    def load(self) -> Dict[str, datetime]:
+        raise NotImplementedError
+
+    def flush(
+        self,
+        seen_alerts: Dict[str, datetime],
+        added: Dict[str, datetime],
+        removed: Iterable[str],
+    ):
+        raise NotImplementedError
+
+    def replace_all(self, seen_alerts: Dict[str, datetime]):
+        """Rewrite the store so it holds exactly ``seen_alerts``"""
+        raise NotImplementedError
+
+    def clear(self):
+        if self.path.exists():
+            self.path.unlink()
+
+    def close(self):
+        pass
+
+
+class PickleCacheBackend(CacheBackend):
+    """Legacy format: the whole dict pickled, rewritten atomically on every flush"""
+
+    name = "pickle"
+
+    def load(self) -> Dict[str, datetime]:
+        if not self.path.exists():
+            return {}
+        with open(self.path, "rb") as f:
+            return pickle.load(f)
+
+    def flush(self, seen_alerts, added, removed):
+        self.replace_all(seen_alerts)
+
+    def replace_all(self, seen_alerts):
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(dict(seen_alerts.items()), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+class AppendLogCacheBackend(CacheBackend):
+    """Append-only log of ``A <uuid> <epoch>`` / ``D <uuid>`` records
+
+    Each flush appends just the delta and fsyncs it. A torn final line from a
+    crash is ignored on load. Once the log holds many more records than live
+    entries it is compacted by atomically replacing it with a fresh snapshot.
+    """
+
+    name = "log"
+
+    def __init__(
+        self, path: Path, compact_ratio: float = None, min_records: int = None
+    ):
+        super().__init__(path)
+        self.compact_ratio = compact_ratio or float(
+            os.getenv("CACHE_LOG_COMPACT_RATIO", "2.0")
+        )
+        self.min_records = min_records or int(
+            os.getenv("CACHE_LOG_COMPACT_MIN_RECORDS", "1000")
+        )
+        self.record_count = 0
+        # Set when a crash left a torn final line without its newline
+        self._needs_newline = False
+
+    def load(self) -> Dict[str, datetime]:
+        seen_alerts: Dict[str, datetime] = {}
+        self.record_count = 0
+        if not self.path.exists():
+            return seen_alerts
+
+        with open(self.path, "r") as f:
+            for line in f:
+                self._needs_newline = not line.endswith("\n")
+                parts = line.split()
+                try:
+                    if parts[0] == "A" and len(parts) == 3:
+                        seen_alerts[parts[1]] = datetime.fromtimestamp(float(parts[2]))
+                    elif parts[0] == "D" and len(parts) == 2:
+                        seen_alerts.pop(parts[1], None)
+                    else:
+                        raise ValueError(line)
+                except (IndexError, ValueError):
+                    logger.warning(f"Skipping corrupt cache log record: {line!r}")
+                    continue
+                self.record_count += 1
+        return seen_alerts
+
+    def flush(self, seen_alerts, added, removed):
+        records = [f"D {uuid}\n" for uuid in removed]
+        records.extend(
+            f"A {uuid} {timestamp.timestamp():.6f}\n"
+            for uuid, timestamp in added.items()
+        )
+        if records:
+            if self._needs_newline:
+                records.insert(0, "\n")
+                self._needs_newline = False
+            with open(self.path, "a") as f:
+                f.writelines(records)
+                f.flush()
+                os.fsync(f.fileno())
+            self.record_count += len(records)
+
+        if self.record_count > max(
+            self.min_records, self.compact_ratio * len(seen_alerts)
+        ):
+            self.replace_all(seen_alerts)
+
+    def replace_all(self, seen_alerts):
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            f.writelines(
+                f"A {uuid} {timestamp.timestamp():.6f}\n"
+                for uuid, timestamp in seen_alerts.items()
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._needs_newline = False
+        logger.debug(
+            f"Compacted cache log from {self.record_count} to {len(seen_alerts)} records"
+        )
+        self.record_count = len(seen_alerts)
+
+
+class SqliteCacheBackend(CacheBackend):
+    """SQLite store in WAL mode; each flush is one transaction over the delta"""
+
+    name = "sqlite"
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self._conn = None
+
+    def _connection(self) -> "sqlite3.Connection":
+        if self._conn is None:
+            import sqlite3
+
+            self._conn = sqlite3.connect(self.path)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS seen_alerts "
+                "(uuid TEXT PRIMARY KEY, seen_at REAL NOT NULL) WITHOUT ROWID"
+            )
+        return self._conn
+
+    def exists(self) -> bool:
+        if not self.path.exists():
+            return False
+        row = self._connection().execute("SELECT 1 FROM seen_alerts LIMIT 1")
+        return row.fetchone() is not None
+
+    def load(self) -> Dict[str, datetime]:
+        if not self.path.exists():
+            return {}
+        rows = self._connection().execute("SELECT uuid, seen_at FROM seen_alerts")
+        return {uuid: datetime.fromtimestamp(seen_at) for uuid, seen_at in rows}
+
+    def flush(self, seen_alerts, added, removed):
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "DELETE FROM seen_alerts WHERE uuid = ?", ((u,) for u in removed)
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO seen_alerts (uuid, seen_at) VALUES (?, ?)",
+                ((u, t.timestamp()) for u, t in added.items()),
+            )
+
+    def replace_all(self, seen_alerts):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM seen_alerts")
+            conn.executemany(
+                "INSERT INTO seen_alerts (uuid, seen_at) VALUES (?, ?)",
+                ((u, t.timestamp()) for u, t in seen_alerts.items()),
+            )
+
+    def clear(self):
+        self.close()
+        for suffix in ("", "-wal", "-shm"):
+            path = self.path.with_name(self.path.name + suffix)
+            if path.exists():
+                path.unlink()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def create_backend(name: str, legacy_file: Path) -> CacheBackend:
+    """Build a backend by name; its file sits next to the legacy pickle file"""
+    legacy_file = Path(legacy_file)
+    if name == "pickle":
+        return PickleCacheBackend(legacy_file)
+    if name == "log":
+        return AppendLogCacheBackend(legacy_file.with_suffix(".log"))
+    if name == "sqlite":
+        return SqliteCacheBackend(legacy_file.with_suffix(".db"))
+    raise ValueError(f"Unknown cache backend: {name}")
@@ -0,0 +1,276 @@
+import hashlib
+import uuid
+from array import array
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Tuple
+
+KEY_SIZE = 16
+
+_EMPTY = 0
+_USED = 1
+_DELETED = 2
+
+
+def is_uuid(alert_uuid: str) -> bool:
+    """True for a UUID in the canonical form from_key gives back"""
+    return (
+        len(alert_uuid) == 36
+        and alert_uuid[8] == alert_uuid[13] == alert_uuid[18] == alert_uuid[23] == "-"
+        and alert_uuid == alert_uuid.lower()
+    )
+
+
+def to_key(alert_uuid: str) -> bytes:
+    """16-byte binary key for an alert UUID (hashed if it is not a UUID)"""
+    if is_uuid(alert_uuid):
+        try:
+            key = bytes.fromhex(alert_uuid.replace("-", ""))
+        except ValueError:
+            key = b""
+        if len(key) == KEY_SIZE:
+            return key
+    return hashlib.blake2b(alert_uuid.encode(), digest_size=KEY_SIZE).digest()
+
+
+def from_key(key: bytes) -> str:
+    return str(uuid.UUID(bytes=bytes(key)))
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over 16-byte keys
+
+    Waze UUIDs are random, so the two halves of the key are used directly as
+    the base hashes for double hashing instead of running a hash function.
+    """
+
+    def __init__(self, capacity: int, bits_per_entry: int = 8, hashes: int = 4):
+        self.size = max(64, capacity * bits_per_entry)
+        self.hashes = hashes
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def add(self, key: bytes):
+        bits, size = self.bits, self.size
+        position = int.from_bytes(key[:8], "little") % size
+        step = int.from_bytes(key[8:], "little") % size | 1
+        for _ in range(self.hashes):
+            bits[position >> 3] |= 1 << (position & 7)
+            position = (position + step) % size
+
+    def might_contain(self, key: bytes) -> bool:
+        bits, size = self.bits, self.size
+        position = int.from_bytes(key[:8], "little") % size
+        step = int.from_bytes(key[8:], "little") % size | 1
+        for _ in range(self.hashes):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+            position = (position + step) % size
+        return True
+
+
+class CompactSeenStore:
+    """Memory-compact, insertion-ordered map of alert UUID -> seen time
+
+    A drop-in for the ``OrderedDict[str, datetime]`` AlertCache keeps, storing
+    each entry as a 16-byte binary key and a float64 epoch timestamp in flat
+    arrays instead of a str and a datetime object. Timestamps keep their
+    microseconds, so entries reloaded from disk sort back into LRU order. Ids
+    that are not canonical UUIDs are hashed to a key and their original text
+    kept in ``_names``, so iteration and eviction return the id the backend
+    stored:
+
+    - an open-addressing hash table (``_keys``/``_times``/``_state``) of slots
+    - an append-only order log of slot numbers; ``_pos`` maps each slot to its
+      live position in the log so moved or deleted entries become stale
+      records that iteration skips and a rebuild drops
+
+    An optional Bloom filter in front of the table answers most misses
+    without probing.
+    """
+
+    def __init__(self, capacity: int = 1024, bloom: bool = False):
+        self.bloom_enabled = bloom
+        # Hashed key -> original id, for ids that are not canonical UUIDs
+        self._names: Dict[bytes, str] = {}
+        self._allocate(max(8, 1 << (capacity - 1).bit_length()))
+
+    def _allocate(self, capacity: int):
+        self._capacity = capacity
+        self._mask = capacity - 1
+        self._keys = bytearray(capacity * KEY_SIZE)
+        self._times = array("d", bytes(8 * capacity))
+        self._state = bytearray(capacity)
+        self._pos = array("I", bytes(4 * capacity))
+        self._order = array("I")
+        self._head = 0
+        self._used = 0
+        self._deleted = 0
+        self._bloom = BloomFilter(capacity) if self.bloom_enabled else None
+
+    # -- hash table ---------------------------------------------------------
+
+    def _find(self, key: bytes) -> int:
+        """Slot holding key, or -1"""
+        index = int.from_bytes(key[:8], "little") & self._mask
+        keys, state = self._keys, self._state
+        while True:
+            slot_state = state[index]
+            if slot_state == _EMPTY:
+                return -1
+            if (
+                slot_state == _USED
+                and keys[index * KEY_SIZE : (index + 1) * KEY_SIZE] == key
+            ):
+                return index
+            index = (index + 1) & self._mask
+
+    def _free_slot(self, key: bytes) -> int:
+        index = int.from_bytes(key[:8], "little") & self._mask
+        while self._state[index] == _USED:
+            index = (index + 1) & self._mask
+        return index
+
+    def _rebuild(self, capacity: int):
+        """Rehash live entries in order, dropping tombstones and stale records"""
+        entries = list(self._raw_items())
+        self._allocate(capacity)
+        for key, seconds in entries:
+            self._insert_new(key, seconds)
+
+    def _maybe_grow(self):
+        if (self._used + self._deleted + 1) * 3 > self._capacity * 2:
+            capacity = self._capacity
+            if (self._used + 1) * 3 > capacity:
+                capacity *= 2
+            self._rebuild(capacity)
+        elif len(self._order) - self._head > 2 * self._used + 1024:
+            self._rebuild(self._capacity)
+
+    def _insert_new(self, key: bytes, seconds: float):
+        slot = self._free_slot(key)
+        if self._state[slot] == _DELETED:
+            self._deleted -= 1
+        self._keys[slot * KEY_SIZE : (slot + 1) * KEY_SIZE] = key
+        self._times[slot] = seconds
+        self._state[slot] = _USED
+        self._pos[slot] = len(self._order)
+        self._order.append(slot)
+        self._used += 1
+        if self._bloom is not None:
+            self._bloom.add(key)
+
+    def _remove_slot(self, slot: int):
+        if self._names:
+            self._names.pop(
+                bytes(self._keys[slot * KEY_SIZE : (slot + 1) * KEY_SIZE]), None
+            )
+        self._state[slot] = _DELETED
+        self._used -= 1
+        self._deleted += 1
+
+    def _live(self, position: int) -> Optional[int]:
+        """Slot of the order record at position if that record is current"""
+        slot = self._order[position]
+        if self._state[slot] == _USED and self._pos[slot] == position:
+            return slot
+        return None
+
+    def _name(self, key: bytes) -> str:
+        name = self._names.get(key)
+        return name if name is not None else from_key(key)
+
+    def _raw_items(self) -> Iterator[Tuple[bytes, float]]:
+        # Records before the first live one are stale forever; skip them once
+        while self._head < len(self._order) and self._live(self._head) is None:
+            self._head += 1
+        for position in range(self._head, len(self._order)):
+            slot = self._live(position)
+            if slot is not None:
+                yield (
+                    bytes(self._keys[slot * KEY_SIZE : (slot + 1) * KEY_SIZE]),
+                    self._times[slot],
+                )
+
+    # -- mapping interface used by AlertCache ---------------------------------
+
+    def __len__(self) -> int:
+        return self._used
+
+    def __contains__(self, alert_uuid: str) -> bool:
+        key = to_key(alert_uuid)
+        if self._bloom is not None and not self._bloom.might_contain(key):
+            return False
+        return self._find(key) >= 0
+
+    def __getitem__(self, alert_uuid: str) -> datetime:
+        slot = self._find(to_key(alert_uuid))
+        if slot < 0:
+            raise KeyError(alert_uuid)
+        return datetime.fromtimestamp(self._times[slot])
+
+    def __setitem__(self, alert_uuid: str, timestamp: datetime):
+        """Insert or update an entry; either way it becomes the newest"""
+        key = to_key(alert_uuid)
+        seconds = timestamp.timestamp()
+        slot = self._find(key)
+        if slot >= 0:
+            self._times[slot] = seconds
+            self.move_to_end(alert_uuid)
+            return
+        self._maybe_grow()
+        self._insert_new(key, seconds)
+        if not is_uuid(alert_uuid):
+            self._names[key] = alert_uuid
+
+    def __delitem__(self, alert_uuid: str):
+        slot = self._find(to_key(alert_uuid))
+        if slot < 0:
+            raise KeyError(alert_uuid)
+        self._remove_slot(slot)
+
+    def __iter__(self) -> Iterator[str]:
+        for key, _ in self._raw_items():
+            yield self._name(key)
+
+    def items(self) -> Iterator[Tuple[str, datetime]]:
+        for key, seconds in self._raw_items():
+            yield self._name(key), datetime.fromtimestamp(seconds)
+
+    def move_to_end(self, alert_uuid: str, last: bool = True):
+        if not last:
+            raise NotImplementedError("CompactSeenStore only appends")
+        slot = self._find(to_key(alert_uuid))
+        if slot < 0:
+            raise KeyError(alert_uuid)
+        if self._pos[slot] == len(self._order) - 1:
+            return
+        self._pos[slot] = len(self._order)
+        self._order.append(slot)
+        self._maybe_grow()
+
+    def popitem(self, last: bool = True) -> Tuple[str, datetime]:
+        if last:
+            raise NotImplementedError("CompactSeenStore only pops the oldest entry")
+        while self._head < len(self._order):
+            position = self._head
+            self._head += 1
+            slot = self._live(position)
+            if slot is not None:
+                key = bytes(self._keys[slot * KEY_SIZE : (slot + 1) * KEY_SIZE])
+                seconds = self._times[slot]
+                name = self._name(key)
+                self._remove_slot(slot)
+                return name, datetime.fromtimestamp(seconds)
+        raise KeyError("popitem(): store is empty")
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the backing arrays"""
+        total = (
+            len(self._keys)
+            + len(self._state)
+            + self._times.itemsize * len(self._times)
+            + self._pos.itemsize * len(self._pos)
+            + self._order.itemsize * len(self._order)
+        )
+        if self._bloom is not None:
+            total += len(self._bloom.bits)
+        return total
@@ -0,0 +1,81 @@
+import os
+import asyncio
+import inspect
+import logging
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Signature = Optional[Tuple[int, int]]
+
+
+def file_signature(path: Path) -> Signature:
+    """(mtime in ns, size) of a file, or None while it does not exist"""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ConfigWatcher:
+    """Loads and applies the configuration whenever a watched file changes
+
+    Files are polled by mtime and size every ``interval`` seconds, which
+    needs no platform support and costs one stat per file. ``load`` reads and
+    validates the files in an executor thread, so file I/O never blocks the
+    event loop. ``apply`` then runs on the loop without awaiting, so the swap
+    it makes is atomic to every other task; it may return an awaitable for
+    slow follow-up work such as restarting workers. If either step raises
+    (say, the file was saved half-written or is invalid), the error is
+    logged, the running configuration is kept and the next change is tried
+    again.
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[str],
+        load: Callable[[], Any],
+        apply: Callable[[Any], Optional[Awaitable]],
+        interval: float = None,
+    ):
+        self.paths = [Path(path) for path in paths]
+        self.load = load
+        self.apply = apply
+        self.interval = interval or float(os.getenv("CONFIG_RELOAD_INTERVAL", "5"))
+        self.signatures: Dict[Path, Signature] = {
+            path: file_signature(path) for path in self.paths
+        }
+        self.reloads = 0
+
+    def changed(self) -> bool:
+        current = {path: file_signature(path) for path in self.paths}
+        changed = current != self.signatures
+        self.signatures = current
+        # A file being replaced can briefly be missing; wait for it to return
+        return changed and all(signature is not None for signature in current.values())
+
+    async def check(self) -> bool:
+        """Reload if a file changed; True when a new configuration was applied"""
+        if not self.changed():
+            return False
+        loop = asyncio.get_running_loop()
+        try:
+            loaded = await loop.run_in_executor(None, self.load)
+            pending = self.apply(loaded)
+            if inspect.isawaitable(pending):
+                await pending
+        except Exception as e:
+            logger.error(f"Config reload failed, keeping the running config: {e}")
+            return False
+        self.reloads += 1
+        return True
+
+    async def run(self):
+        logger.info(
+            f"Watching {', '.join(str(path) for path in self.paths)} for changes"
+        )
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check()
@@ -0,0 +1,96 @@
+import os
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from georss_parser import ParsedAlerts
+from tiling import alert_key
+
+
+def fingerprint_alerts(
+    alerts: Iterable[dict], fired: Optional[Dict[str, Iterable[str]]] = None
+) -> str:
+    """Order-independent digest of the (uuid, pubMillis) pairs of a set of alerts
+
+    ``fired`` maps alert keys to the names of the rules that fired for them,
+    so a poll in which a rule held back by quiet hours starts firing counts
+    as changed.
+    """
+    fired = fired or {}
+    entries = sorted(
+        f"{alert.get('uuid')}:{alert.get('pubMillis')}:"
+        f"{','.join(sorted(fired.get(alert_key(alert), ())))}"
+        for alert in alerts
+    )
+    return hashlib.blake2b("\n".join(entries).encode(), digest_size=16).hexdigest()
+
+
+class DeltaTracker:
+    """Detects polls whose alert set is unchanged so their processing can be skipped
+
+    A fingerprint is only committed once its poll was processed, so a poll
+    whose processing failed is not skipped the next time it is seen.
+    Also remembers HTTP validators (ETag / Last-Modified) per tile request so
+    delta polls can be sent as conditional requests without a cache-buster.
+    """
+
+    def __init__(self, enabled: bool = None, max_validators: int = 1024):
+        self.enabled = (
+            enabled if enabled is not None else os.getenv("DELTA_POLLING") == "1"
+        )
+        self.max_validators = max_validators
+        self.fingerprints: Dict[str, str] = {}
+        self.cycles = 0
+        self.noop_cycles = 0
+        # request key -> (etag, last modified, parsed alerts)
+        self.validators: (
+            "OrderedDict[str, Tuple[Optional[str], Optional[str], ParsedAlerts]]"
+        ) = OrderedDict()
+
+    def is_unchanged(self, key: str, fingerprint: str) -> bool:
+        """True if a poll's fingerprint for key matches the last processed one"""
+        self.cycles += 1
+        unchanged = self.fingerprints.get(key) == fingerprint
+        if unchanged:
+            self.noop_cycles += 1
+        return unchanged
+
+    def commit(self, fingerprints: Dict[str, str]):
+        """Remember the fingerprints of a poll that was processed successfully"""
+        self.fingerprints.update(fingerprints)
+
+    def conditional_headers(self, request_key: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for a previously seen request"""
+        cached = self.validators.get(request_key)
+        if cached is None:
+            return {}
+        etag, last_modified, _ = cached
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def remember(
+        self,
+        request_key: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        parsed: ParsedAlerts,
+    ):
+        """Store the validators and result of a 200 response"""
+        if not etag and not last_modified:
+            return
+        self.validators[request_key] = (etag, last_modified, parsed)
+        self.validators.move_to_end(request_key)
+        while len(self.validators) > self.max_validators:
+            self.validators.popitem(last=False)
+
+    def not_modified(self, request_key: str) -> Optional[ParsedAlerts]:
+        """Result to reuse for a 304 response"""
+        cached = self.validators.get(request_key)
+        return cached[2] if cached else None
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"cycles": self.cycles, "noop_cycles": self.noop_cycles}
@@ -0,0 +1,221 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional, Set
+
+from workers import base_name
+
+logger = logging.getLogger(__name__)
+
+
+def feed_record(
+    alert: dict, regions: Iterable[str], street_name: Optional[str] = None
+) -> dict:
+    """The fields of an alert published on the feed"""
+    location = alert.get("location", {})
+    return {
+        "uuid": alert.get("uuid"),
+        "type": alert.get("type"),
+        "subtype": alert.get("subtype") or None,
+        "lat": location.get("y"),
+        "lon": location.get("x"),
+        "pub_millis": alert.get("pubMillis"),
+        "reliability": alert.get("reliability"),
+        "street": street_name or alert.get("street"),
+        "city": alert.get("city"),
+        "regions": sorted(regions),
+    }
+
+
+class AlertFeed:
+    """The monitor's current alerts and a stream of changes for local consumers
+
+    Each poll refreshes the current set from memory, so dashboards and bots
+    read ``/alerts`` or subscribe to ``/events`` (SSE) or ``/ws`` (WebSocket)
+    instead of polling Waze themselves. Alerts leave the set when a poll of
+    their regions no longer returns them, or after ``ttl`` seconds unseen.
+    Records name the configured regions; the (possibly striped) poll regions
+    an alert was seen in are tracked separately, so a poll of one stripe of a
+    region never removes alerts seen in another.
+    Subscribers that fall ``queue_size`` events behind are disconnected
+    rather than slowing the monitor down.
+    """
+
+    def __init__(self, ttl: float = None, queue_size: int = None):
+        self.ttl = ttl or float(os.getenv("FEED_TTL", "900"))
+        self.queue_size = queue_size or int(os.getenv("FEED_QUEUE_SIZE", "100"))
+        self.enabled = False
+        # uuid -> (record, monotonic time last seen, poll regions it was seen in)
+        self.current: Dict[str, tuple] = {}
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.updated: Optional[float] = None
+
+    def _publish(self, event: str, record: dict):
+        message = json.dumps({"event": event, "alert": record})
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                logger.warning("Dropping a feed subscriber that fell behind")
+                self.subscribers.discard(queue)
+                # Swap the backlog for the sentinel that ends its stream
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    def expire(self):
+        """Drop alerts not seen for ``ttl`` seconds"""
+        cutoff = time.monotonic() - self.ttl
+        for uuid, (record, last_seen, _) in list(self.current.items()):
+            if last_seen < cutoff:
+                del self.current[uuid]
+                self._publish("removed", record)
+
+    def update(
+        self,
+        polled_regions: Iterable[str],
+        alerts: List[dict],
+        alert_regions: Dict[str, List[str]],
+    ):
+        """Refresh the current set from one poll of the given regions
+
+        Region names are those that were polled, which in worker mode are
+        shard regions such as ``name#1``.
+        """
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        polled = set(polled_regions)
+        seen = set()
+        for alert in alerts:
+            uuid = alert.get("uuid")
+            if not uuid:
+                continue
+            seen.add(uuid)
+            previous = self.current.get(uuid)
+            record = previous[0] if previous else feed_record(alert, ())
+            sources = (previous[2] if previous else set()) | set(
+                alert_regions.get(uuid, ())
+            )
+            record["regions"] = sorted(
+                set(record["regions"]) | {base_name(name) for name in sources}
+            )
+            record["reliability"] = alert.get("reliability")
+            self.current[uuid] = (record, now, sources)
+        for uuid, (record, _, sources) in list(self.current.items()):
+            if uuid not in seen and (sources or set(record["regions"])) <= polled:
+                del self.current[uuid]
+                self._publish("removed", record)
+        self.expire()
+        self.updated = time.time()
+
+    def publish_new(self, alert: dict, regions: Iterable[str], street_name=None):
+        """Announce a newly notified alert to every subscriber"""
+        if not self.enabled:
+            return
+        record = feed_record(alert, regions, street_name)
+        uuid = alert.get("uuid")
+        if uuid:
+            previous = self.current.get(uuid)
+            sources = previous[2] if previous else set()
+            self.current[uuid] = (record, time.monotonic(), sources)
+        self._publish("alert", record)
+
+    def snapshot(
+        self, alert_type: Optional[str] = None, region: Optional[str] = None
+    ) -> dict:
+        self.expire()
+        alerts = [
+            record
+            for record, _, _ in self.current.values()
+            if (alert_type is None or record["type"] == alert_type)
+            and (region is None or region in record["regions"])
+        ]
+        return {"alerts": alerts, "updated": self.updated}
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+
+    async def start(self, port: int, host: Optional[str] = None):
+        """Serve /alerts, /events and /ws; returns the aiohttp runner"""
+        from aiohttp import WSMsgType, web
+
+        host = host or os.getenv("FEED_HOST", "127.0.0.1")
+        heartbeat = float(os.getenv("FEED_HEARTBEAT", "15"))
+
+        async def alerts(request: web.Request) -> web.Response:
+            query = request.query
+            return web.json_response(
+                self.snapshot(query.get("type"), query.get("region"))
+            )
+
+        async def events(request: web.Request) -> web.StreamResponse:
+            response = web.StreamResponse(
+                headers={
+                    "Content-Type": "text/event-stream",
+                    "Cache-Control": "no-cache",
+                }
+            )
+            await response.prepare(request)
+            queue = self.subscribe()
+            try:
+                while True:
+                    try:
+                        message = await asyncio.wait_for(queue.get(), heartbeat)
+                    except asyncio.TimeoutError:
+                        # Comment line, keeps proxies from closing the stream
+                        await response.write(b": keep-alive\n\n")
+                        continue
+                    if message is None:
+                        break
+                    event = json.loads(message)["event"]
+                    await response.write(
+                        f"event: {event}\ndata: {message}\n\n".encode()
+                    )
+            except ConnectionResetError:
+                pass
+            finally:
+                self.unsubscribe(queue)
+            return response
+
+        async def websocket(request: web.Request) -> web.WebSocketResponse:
+            ws = web.WebSocketResponse(heartbeat=heartbeat)
+            await ws.prepare(request)
+            queue = self.subscribe()
+
+            async def forward():
+                while True:
+                    message = await queue.get()
+                    if message is None:
+                        await ws.close()
+                        return
+                    await ws.send_str(message)
+
+            sender = asyncio.create_task(forward())
+            try:
+                # Reading is what notices the client going away
+                async for msg in ws:
+                    if msg.type == WSMsgType.ERROR:
+                        break
+            finally:
+                sender.cancel()
+                self.unsubscribe(queue)
+            return ws
+
+        app = web.Application()
+        app.router.add_get("/alerts", alerts)
+        app.router.add_get("/events", events)
+        app.router.add_get("/ws", websocket)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        self.enabled = True
+        logger.info(f"Serving the alert feed on http://{host}:{port}/alerts")
+        return runner
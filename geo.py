@@ -0,0 +1,46 @@
+import math
+from typing import List, Tuple
+
+EARTH_RADIUS_METERS = 6371008.8
+METERS_PER_DEGREE_LAT = 111320.0
+
+Cell = Tuple[int, int]
+
+
+def haversine_meters(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in meters"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_METERS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _lon_cell_degrees(row: int, lat_cell_degrees: float) -> float:
+    """Width in degrees of a roughly square cell in the given latitude row"""
+    center_lat = (row + 0.5) * lat_cell_degrees
+    cos_lat = max(math.cos(math.radians(center_lat)), 0.01)
+    return lat_cell_degrees / cos_lat
+
+
+def cell_key(lat: float, lon: float, cell_size_meters: float) -> Cell:
+    """Quantize a point to a roughly square grid cell of the given size"""
+    lat_cell_degrees = cell_size_meters / METERS_PER_DEGREE_LAT
+    row = math.floor(lat / lat_cell_degrees)
+    col = math.floor(lon / _lon_cell_degrees(row, lat_cell_degrees))
+    return row, col
+
+
+def neighbour_cells(lat: float, lon: float, cell_size_meters: float) -> List[Cell]:
+    """The cell containing a point plus its eight neighbours"""
+    lat_cell_degrees = cell_size_meters / METERS_PER_DEGREE_LAT
+    row = math.floor(lat / lat_cell_degrees)
+    cells = []
+    for r in (row - 1, row, row + 1):
+        col = math.floor(lon / _lon_cell_degrees(r, lat_cell_degrees))
+        cells.extend((r, c) for c in (col - 1, col, col + 1))
+    return cells
@@ -0,0 +1,139 @@
+import os
+import pickle
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from geo import Cell, cell_key, haversine_meters, neighbour_cells
+
+logger = logging.getLogger(__name__)
+
+# (lat, lon, street name, resolved at)
+GeocodeEntry = Tuple[float, float, str, datetime]
+
+
+class GeocodeCache:
+    """Persistent reverse-geocode cache bucketed on a spatial grid
+
+    Resolved points are stored in grid cells sized to the match radius, so a
+    lookup only has to inspect the 3x3 block of cells around a point.
+    """
+
+    def __init__(
+        self,
+        cache_file: str = "geocode_cache.pkl",
+        radius_meters: float = None,
+        ttl_hours: int = None,
+        max_entries: int = None,
+    ):
+        self.cache_file = Path(cache_file)
+        self.radius_meters = radius_meters or float(
+            os.getenv("GEOCODE_CACHE_RADIUS_METERS", "75")
+        )
+        self.ttl_hours = ttl_hours or int(os.getenv("GEOCODE_CACHE_TTL_HOURS", "720"))
+        self.max_entries = max_entries or int(
+            os.getenv("GEOCODE_CACHE_MAX_ENTRIES", "5000")
+        )
+        # Ordered least- to most-recently used
+        self.entries: "OrderedDict[Cell, GeocodeEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self.load_cache()
+
+    def load_cache(self):
+        """Load the cache and its lifetime hit/miss counters from disk"""
+        try:
+            if self.cache_file.exists():
+                with open(self.cache_file, "rb") as f:
+                    data = pickle.load(f)
+                self.entries = OrderedDict(data.get("entries", {}))
+                self.hits = data.get("hits", 0)
+                self.misses = data.get("misses", 0)
+                logger.info(f"Loaded {len(self.entries)} geocoded locations from cache")
+                self.cleanup_expired()
+            else:
+                logger.info("No existing geocode cache file found, starting fresh")
+        except Exception as e:
+            logger.error(f"Failed to load geocode cache: {e}")
+            self.entries = OrderedDict()
+
+    def save_cache(self):
+        """Atomically write the cache to disk if it changed since the last save"""
+        if not self._dirty:
+            return
+        try:
+            tmp_file = self.cache_file.with_name(self.cache_file.name + ".tmp")
+            with open(tmp_file, "wb") as f:
+                pickle.dump(
+                    {"entries": self.entries, "hits": self.hits, "misses": self.misses},
+                    f,
+                )
+            os.replace(tmp_file, self.cache_file)
+            self._dirty = False
+            logger.debug(f"Saved {len(self.entries)} geocoded locations to cache")
+        except Exception as e:
+            logger.error(f"Failed to save geocode cache: {e}")
+
+    def cleanup_expired(self):
+        """Remove entries older than the TTL"""
+        cutoff_time = datetime.now() - timedelta(hours=self.ttl_hours)
+        expired = [
+            cell for cell, entry in self.entries.items() if entry[3] < cutoff_time
+        ]
+        for cell in expired:
+            del self.entries[cell]
+        if expired:
+            self._dirty = True
+            logger.info(f"Cleaned up {len(expired)} expired geocoded locations")
+
+    def lookup(self, lat: float, lon: float) -> Optional[str]:
+        """Return the street name of a resolved point within the radius, if any"""
+        cutoff_time = datetime.now() - timedelta(hours=self.ttl_hours)
+        for cell in neighbour_cells(lat, lon, self.radius_meters):
+            entry = self.entries.get(cell)
+            if entry is None:
+                continue
+            if entry[3] < cutoff_time:
+                del self.entries[cell]
+                self._dirty = True
+                continue
+            if haversine_meters(lat, lon, entry[0], entry[1]) <= self.radius_meters:
+                self.entries.move_to_end(cell)
+                self.hits += 1
+                self._dirty = True
+                return entry[2]
+
+        self.misses += 1
+        self._dirty = True
+        return None
+
+    def store(self, lat: float, lon: float, street_name: str):
+        """Record a resolved point, evicting the least recently used on overflow"""
+        cell = cell_key(lat, lon, self.radius_meters)
+        self.entries[cell] = (lat, lon, street_name, datetime.now())
+        self.entries.move_to_end(cell)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self._dirty = True
+
+    def clear(self):
+        """Drop all entries and reset statistics"""
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._dirty = True
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            "total_locations": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "radius_meters": self.radius_meters,
+            "ttl_hours": self.ttl_hours,
+        }
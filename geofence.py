@@ -0,0 +1,187 @@
+import os
+import json
+import math
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from geo import METERS_PER_DEGREE_LAT
+
+logger = logging.getLogger(__name__)
+
+# GeoJSON positions are [lon, lat]
+Position = Sequence[float]
+Ring = List[Position]
+
+
+def point_in_ring(lat: float, lon: float, ring: Ring) -> bool:
+    """Even-odd ray casting test of a point against one closed ring"""
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i][0], ring[i][1]
+        xj, yj = ring[j][0], ring[j][1]
+        if (yi > lat) != (yj > lat) and lon < (xj - xi) * (lat - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def segment_distance_meters(
+    lat: float, lon: float, start: Position, end: Position
+) -> float:
+    """Distance from a point to a line segment, on a local flat projection"""
+    scale_x = METERS_PER_DEGREE_LAT * math.cos(math.radians(lat))
+    ax, ay = (start[0] - lon) * scale_x, (start[1] - lat) * METERS_PER_DEGREE_LAT
+    bx, by = (end[0] - lon) * scale_x, (end[1] - lat) * METERS_PER_DEGREE_LAT
+    dx, dy = bx - ax, by - ay
+    length_squared = dx * dx + dy * dy
+    t = 0.0
+    if length_squared > 0:
+        t = max(0.0, min(1.0, -(ax * dx + ay * dy) / length_squared))
+    return math.hypot(ax + t * dx, ay + t * dy)
+
+
+@dataclass
+class Geofence:
+    """A polygon, or a polyline buffered into a corridor, with its own targets
+
+    Targets and alert types left as None fall back to the enclosing region's.
+    """
+
+    name: str
+    # Polygons as lists of rings (outer ring first, then holes)
+    polygons: List[List[Ring]] = field(default_factory=list)
+    # Polylines and the corridor half-width around them
+    lines: List[List[Position]] = field(default_factory=list)
+    buffer_meters: float = 0.0
+    alert_types: Optional[List[str]] = None
+    pushover_user_keys: Optional[List[str]] = None
+    discord_webhook_urls: Optional[List[str]] = None
+
+    def __post_init__(self):
+        positions = [p for polygon in self.polygons for p in polygon[0]] + [
+            p for line in self.lines for p in line
+        ]
+        if not positions:
+            raise ValueError(f"Geofence {self.name} has no coordinates")
+        lats = [p[1] for p in positions]
+        lons = [p[0] for p in positions]
+        # Widen the box by the corridor buffer so it covers the whole corridor
+        pad_lat = self.buffer_meters / METERS_PER_DEGREE_LAT if self.lines else 0.0
+        pad_lon = pad_lat / max(math.cos(math.radians(max(map(abs, lats)))), 0.01)
+        self.bounds = {
+            "top": max(lats) + pad_lat,
+            "bottom": min(lats) - pad_lat,
+            "left": min(lons) - pad_lon,
+            "right": max(lons) + pad_lon,
+        }
+
+    def contains(self, lat: float, lon: float) -> bool:
+        """Check whether a point is inside a polygon or within a corridor"""
+        b = self.bounds
+        if not (b["bottom"] <= lat <= b["top"] and b["left"] <= lon <= b["right"]):
+            return False
+        for polygon in self.polygons:
+            if point_in_ring(lat, lon, polygon[0]) and not any(
+                point_in_ring(lat, lon, hole) for hole in polygon[1:]
+            ):
+                return True
+        for line in self.lines:
+            for start, end in zip(line, line[1:]):
+                if segment_distance_meters(lat, lon, start, end) <= self.buffer_meters:
+                    return True
+        return False
+
+    def watches(self, alert_type: Optional[str]) -> bool:
+        return self.alert_types is None or alert_type in self.alert_types
+
+    @classmethod
+    def from_feature(cls, feature: dict, index: int = 0) -> "Geofence":
+        """Build a geofence from a GeoJSON Feature
+
+        Polygon and MultiPolygon geometries are used as-is; LineString and
+        MultiLineString geometries need a ``buffer_meters`` property.
+        """
+        properties = feature.get("properties") or {}
+        geometry = feature.get("geometry") or {}
+        kind, coordinates = geometry.get("type"), geometry.get("coordinates")
+        polygons, lines = [], []
+        if kind == "Polygon":
+            polygons = [coordinates]
+        elif kind == "MultiPolygon":
+            polygons = list(coordinates)
+        elif kind == "LineString":
+            lines = [coordinates]
+        elif kind == "MultiLineString":
+            lines = list(coordinates)
+        else:
+            raise ValueError(f"Unsupported geofence geometry: {kind}")
+
+        buffer_meters = float(properties.get("buffer_meters", 0))
+        if lines and buffer_meters <= 0:
+            raise ValueError(f"Line geofence {index} needs a positive buffer_meters")
+        alert_types = properties.get("alert_types")
+        return cls(
+            name=properties.get("name", f"fence-{index}"),
+            polygons=polygons,
+            lines=lines,
+            buffer_meters=buffer_meters,
+            alert_types=list(alert_types) if alert_types is not None else None,
+            pushover_user_keys=properties.get("pushover_user_keys"),
+            discord_webhook_urls=properties.get("discord_webhook_urls"),
+        )
+
+
+def load_geofences(
+    source: Union[str, dict], base_dir: Optional[Path] = None
+) -> List[Geofence]:
+    """Geofences from a GeoJSON FeatureCollection, Feature, or a path to one"""
+    if isinstance(source, str):
+        path = Path(source)
+        if base_dir is not None and not path.is_absolute():
+            path = base_dir / path
+        with open(path, "r") as f:
+            source = json.load(f)
+    features = source.get("features", [source]) if isinstance(source, dict) else source
+    return [Geofence.from_feature(feature, i) for i, feature in enumerate(features)]
+
+
+class FenceIndex:
+    """Uniform lat/lon grid over geofence bounding boxes
+
+    Each fence is listed in every cell its bounding box touches, so a lookup
+    only runs exact containment tests on the handful of fences registered in
+    the alert's own cell.
+    """
+
+    def __init__(self, fences: Iterable[Geofence], cell_degrees: float = None):
+        self.cell_degrees = cell_degrees or float(
+            os.getenv("GEOFENCE_CELL_DEGREES", "0.02")
+        )
+        self.fences = list(fences)
+        self.cells: Dict[Tuple[int, int], List[Geofence]] = {}
+        for fence in self.fences:
+            b = fence.bounds
+            row_min, col_min = self._cell(b["bottom"], b["left"])
+            row_max, col_max = self._cell(b["top"], b["right"])
+            for row in range(row_min, row_max + 1):
+                for col in range(col_min, col_max + 1):
+                    self.cells.setdefault((row, col), []).append(fence)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (
+            math.floor(lat / self.cell_degrees),
+            math.floor(lon / self.cell_degrees),
+        )
+
+    def matching(
+        self, lat: float, lon: float, alert_type: Optional[str] = None
+    ) -> List[Geofence]:
+        """Fences containing the point that watch the given alert type"""
+        return [
+            fence
+            for fence in self.cells.get(self._cell(lat, lon), ())
+            if fence.watches(alert_type) and fence.contains(lat, lon)
+        ]
@@ -0,0 +1,129 @@
+import os
+import json
+import logging
+import importlib
+from dataclasses import dataclass, field
+from typing import Collection, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Optional backends, imported on first use so importing the parser stays cheap:
+# orjson parses whole payloads several times faster than json; ijson streams
+# the payload so only matching alerts are ever built as dicts
+_modules: Dict[str, object] = {}
+
+# Large per-alert fields nothing downstream reads
+HEAVY_FIELDS = ("comments", "wazeData")
+
+
+@dataclass
+class ParsedAlerts:
+    """Alerts kept from one georss payload plus how many it contained in total"""
+
+    alerts: List[dict] = field(default_factory=list)
+    total: int = 0
+
+
+def backend_module(name: str):
+    """The ijson or orjson module, imported on first use; None if not installed"""
+    if name not in _modules:
+        try:
+            _modules[name] = importlib.import_module(name)
+        except ImportError:
+            _modules[name] = None
+    return _modules[name]
+
+
+def parser_backend() -> str:
+    """Parser used for georss payloads: GEORSS_PARSER, else orjson if installed
+
+    orjson is the default because it is the fastest; ijson is slower than
+    even json but keeps peak memory flat as payloads grow, so it is only used
+    when asked for.
+    """
+    backend = os.getenv("GEORSS_PARSER", "auto")
+    if backend == "auto":
+        return "orjson" if backend_module("orjson") is not None else "json"
+    if backend in ("ijson", "orjson") and backend_module(backend) is None:
+        logger.warning(f"GEORSS_PARSER={backend} is not installed, using json")
+        return "json"
+    return backend
+
+
+def _keep(alert: dict, alert_types: Optional[Collection[str]]) -> bool:
+    """Check an alert's type and strip its heavy fields if it is kept"""
+    if alert_types is not None and alert.get("type") not in alert_types:
+        return False
+    for name in HEAVY_FIELDS:
+        alert.pop(name, None)
+    return True
+
+
+def _select(alerts: List[dict], alert_types: Optional[Collection[str]]) -> ParsedAlerts:
+    """Filter already parsed alerts as cheaply as a plain list comprehension"""
+    if alert_types is not None:
+        kept = [alert for alert in alerts if alert.get("type") in alert_types]
+    else:
+        kept = list(alerts)
+    for alert in kept:
+        for name in HEAVY_FIELDS:
+            alert.pop(name, None)
+    return ParsedAlerts(alerts=kept, total=len(alerts))
+
+
+def _stream(items: Iterable[dict], alert_types: Optional[Collection[str]]):
+    parsed = ParsedAlerts()
+    for alert in items:
+        parsed.total += 1
+        if _keep(alert, alert_types):
+            parsed.alerts.append(alert)
+    return parsed
+
+
+def parse_alerts(
+    payload: bytes,
+    alert_types: Optional[Collection[str]] = None,
+    backend: Optional[str] = None,
+) -> ParsedAlerts:
+    """Parse a georss payload, keeping only alerts of the given types"""
+    backend = backend or parser_backend()
+    if backend == "ijson":
+        ijson = backend_module("ijson")
+        try:
+            return _stream(
+                ijson.items(payload, "alerts.item", use_float=True), alert_types
+            )
+        except ijson.JSONError as e:
+            raise json.JSONDecodeError(str(e).splitlines()[0], "", 0) from e
+    if backend == "orjson":
+        data = backend_module("orjson").loads(payload)
+    else:
+        data = json.loads(payload)
+    return _select(data.get("alerts", []), alert_types)
+
+
+async def read_alerts(
+    response, alert_types: Optional[Collection[str]] = None
+) -> ParsedAlerts:
+    """Parse alerts straight off an aiohttp response
+
+    With ijson the body is parsed incrementally as it arrives, so the jams,
+    users and unwanted alerts are never materialized; otherwise the body is
+    read once and parsed with orjson or json. Invalid JSON raises
+    json.JSONDecodeError whichever backend is used.
+    """
+    backend = parser_backend()
+    if backend == "ijson":
+        ijson = backend_module("ijson")
+        parsed = ParsedAlerts()
+        try:
+            async for alert in ijson.items(
+                response.content, "alerts.item", use_float=True
+            ):
+                parsed.total += 1
+                if _keep(alert, alert_types):
+                    parsed.alerts.append(alert)
+        except ijson.JSONError as e:
+            raise json.JSONDecodeError(str(e).splitlines()[0], "", 0) from e
+        return parsed
+    return parse_alerts(await response.read(), alert_types, backend)
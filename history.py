@@ -0,0 +1,212 @@
+import os
+import re
+import time
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Collection, Iterable, Iterator, Optional, Tuple
+
+if TYPE_CHECKING:
+    # sqlite3 is imported when the archive is first opened, not with main
+    import sqlite3
+
+logger = logging.getLogger(__name__)
+
+# Normalized columns kept for every alert, in table order
+COLUMNS = (
+    "uuid",
+    "type",
+    "subtype",
+    "lat",
+    "lon",
+    "pub_millis",
+    "reliability",
+    "street",
+    "city",
+    "first_seen",
+    "last_seen",
+)
+
+RELATIVE_TIME = re.compile(r"^(\d+(?:\.\d+)?)([smhdw])$")
+RELATIVE_UNITS = {
+    "s": "seconds",
+    "m": "minutes",
+    "h": "hours",
+    "d": "days",
+    "w": "weeks",
+}
+
+
+def parse_time(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """Epoch seconds from an ISO 8601 time or a span back from now like 6h or 30d"""
+    if not value:
+        return None
+    match = RELATIVE_TIME.match(value.strip())
+    if match:
+        amount, unit = match.groups()
+        span = timedelta(**{RELATIVE_UNITS[unit]: float(amount)})
+        return ((now or datetime.now()) - span).timestamp()
+    return datetime.fromisoformat(value).timestamp()
+
+
+def normalize_alert(alert: dict, seen_at: float) -> tuple:
+    """The stored fields of one georss alert, in COLUMNS order"""
+    location = alert.get("location", {})
+    return (
+        alert.get("uuid") or alert.get("id"),
+        alert.get("type"),
+        alert.get("subtype") or None,
+        location.get("y"),
+        location.get("x"),
+        alert.get("pubMillis"),
+        alert.get("reliability"),
+        alert.get("street"),
+        alert.get("city"),
+        seen_at,
+        seen_at,
+    )
+
+
+class AlertHistory:
+    """Append-mostly SQLite archive of every watched alert fetched
+
+    Each alert is stored once per UUID; later polls only bump ``last_seen``
+    and ``reliability``. A 3-D R*Tree over (lat, lon, report time) answers
+    "these types in this box during this window" by walking only the matching
+    index nodes, and query results are streamed from the cursor, so lookups
+    stay fast and flat in memory as months of data accumulate.
+    """
+
+    def __init__(self, path: str = None, enabled: Optional[bool] = None):
+        self.path = Path(path or os.getenv("HISTORY_FILE", "alert_history.db"))
+        if enabled is None:
+            enabled = os.getenv("ALERT_HISTORY", "0") == "1"
+        self.enabled = enabled
+        self._conn = None
+
+    def _connection(self) -> "sqlite3.Connection":
+        if self._conn is None:
+            import sqlite3
+
+            self._conn = sqlite3.connect(self.path)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS alerts (
+                    id INTEGER PRIMARY KEY,
+                    uuid TEXT NOT NULL UNIQUE,
+                    type TEXT,
+                    subtype TEXT,
+                    lat REAL,
+                    lon REAL,
+                    pub_millis INTEGER,
+                    reliability INTEGER,
+                    street TEXT,
+                    city TEXT,
+                    first_seen REAL NOT NULL,
+                    last_seen REAL NOT NULL
+                );
+                -- Type-only and unfiltered queries, ordered by report time
+                CREATE INDEX IF NOT EXISTS alerts_type_time ON alerts (type, pub_millis);
+                CREATE INDEX IF NOT EXISTS alerts_time ON alerts (pub_millis);
+                CREATE VIRTUAL TABLE IF NOT EXISTS alerts_index USING rtree(
+                    id, min_lat, max_lat, min_lon, max_lon, min_time, max_time
+                );
+                -- Only new rows are indexed; re-sightings update in place
+                CREATE TRIGGER IF NOT EXISTS alerts_indexed AFTER INSERT ON alerts
+                WHEN NEW.lat IS NOT NULL AND NEW.lon IS NOT NULL
+                BEGIN
+                    INSERT INTO alerts_index VALUES (
+                        NEW.id, NEW.lat, NEW.lat, NEW.lon, NEW.lon,
+                        COALESCE(NEW.pub_millis / 1000.0, NEW.first_seen),
+                        COALESCE(NEW.pub_millis / 1000.0, NEW.first_seen)
+                    );
+                END;
+                """)
+        return self._conn
+
+    def record(self, alerts: Iterable[dict]) -> int:
+        """Store the alerts of one poll in a single transaction"""
+        now = time.time()
+        rows = [normalize_alert(alert, now) for alert in alerts]
+        rows = [row for row in rows if row[0] is not None]
+        if not rows:
+            return 0
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                f"INSERT INTO alerts ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(COLUMNS))}) "
+                "ON CONFLICT (uuid) DO UPDATE SET "
+                "last_seen = excluded.last_seen, reliability = excluded.reliability",
+                rows,
+            )
+        return len(rows)
+
+    def query(
+        self,
+        alert_types: Optional[Collection[str]] = None,
+        bounds: Optional[dict] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[Tuple]:
+        """Stream stored alerts matching every given filter, oldest first
+
+        ``bounds`` is a top/bottom/left/right box; ``since`` and ``until`` are
+        epoch seconds compared against the Waze report time.
+        """
+        conn = self._connection()
+        select = ", ".join(f"a.{column}" for column in COLUMNS)
+        where, params = [], []
+        if bounds is not None or since is not None or until is not None:
+            # The R*Tree stores 32-bit floats rounded outwards, so the exact
+            # time check below drops the few candidates it lets through
+            bounds = bounds or {"top": 90, "bottom": -90, "left": -180, "right": 180}
+            sql = f"SELECT {select} FROM alerts_index r JOIN alerts a ON a.id = r.id"
+            where += [
+                "r.max_lat >= ? AND r.min_lat <= ?",
+                "r.max_lon >= ? AND r.min_lon <= ?",
+                "r.max_time >= ? AND r.min_time <= ?",
+            ]
+            params += [bounds["bottom"], bounds["top"], bounds["left"], bounds["right"]]
+            params += [since or 0, until or 4e9]
+            reported = "COALESCE(a.pub_millis, a.first_seen * 1000)"
+            if since is not None:
+                where.append(f"{reported} >= ?")
+                params.append(since * 1000)
+            if until is not None:
+                where.append(f"{reported} <= ?")
+                params.append(until * 1000)
+        else:
+            sql = f"SELECT {select} FROM alerts a"
+        if alert_types:
+            where.append(f"a.type IN ({', '.join('?' * len(alert_types))})")
+            params += list(alert_types)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY a.pub_millis"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return conn.execute(sql, params)
+
+    def stats(self) -> dict:
+        if not self.path.exists():
+            return {"alerts": 0, "oldest": None, "newest": None, "size_bytes": 0}
+        count, oldest, newest = (
+            self._connection()
+            .execute("SELECT COUNT(*), MIN(pub_millis), MAX(pub_millis) FROM alerts")
+            .fetchone()
+        )
+        return {
+            "alerts": count,
+            "oldest": oldest,
+            "newest": newest,
+            "size_bytes": self.path.stat().st_size,
+        }
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,38 @@
+from typing import Any, Callable
+
+
+class LazyInstance:
+    """Stands in for an object that is only built on first use
+
+    Attribute reads and writes are forwarded to the instance, which the
+    factory creates the first time one happens. Lets module-level globals such
+    as the alert cache stay cheap to import for commands that never touch
+    them.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+
+    @property
+    def built(self) -> bool:
+        return self._instance is not None
+
+    def resolve(self) -> Any:
+        if self._instance is None:
+            object.__setattr__(self, "_instance", self._factory())
+        return self._instance
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.resolve(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self.resolve(), name, value)
+
+    def __len__(self) -> int:
+        return len(self.resolve())
+
+    def __repr__(self) -> str:
+        if self._instance is None:
+            return f"<LazyInstance of {self._factory.__name__}>"
+        return repr(self._instance)
@@ -1,16 +1,61 @@
 import os
-import aiohttp
 import asyncio
 import json
 import logging
+import time
+from contextlib import nullcontext
 from datetime import datetime, timedelta
 import typer
-from typing import Optional, Set, Dict
-import folium
-import webbrowser
+from typing import (
+    TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    Optional,
+    Set,
+    Dict,
+    List,
+    Tuple,
+    Collection,
+    Hashable,
+)
 from pathlib import Path
 from alert_cache import AlertCache
-from notification_provider import NotificationProvider
+from alert_pipeline import AlertPipeline, TokenBucket
+from delta import DeltaTracker, fingerprint_alerts
+from feed import AlertFeed
+from geocode_cache import GeocodeCache
+from georss_parser import ParsedAlerts, read_alerts
+from history import COLUMNS, AlertHistory, parse_time
+from lazy import LazyInstance
+import metrics
+from polling import PollResult, UpstreamError, parse_retry_after
+from regions import (
+    Region,
+    RegionScheduler,
+    default_config_path,
+    load_regions,
+    union_bounds,
+)
+from rules import Rule, RuleSet, load_rules
+from spatial_dedupe import SpatialDedupe
+from tiling import TiledFetcher, alert_key
+import tracing
+from workers import (
+    FeedForwarder,
+    ForwardFilter,
+    WorkerPool,
+    base_name,
+    route_alert,
+    shard_regions,
+)
+
+# aiohttp, folium and the replay stubs are imported where they are used so that
+# --help, cache commands and cron-driven check-once runs start quickly
+if TYPE_CHECKING:
+    from notification_provider import DeliveryResult, NotificationProvider
+    from outbox import Outbox
+    from replay import ReplayStats
+    from session_manager import SessionManager
 
 # Configure logging
 logging.basicConfig(
@@ -22,9 +67,119 @@ logger = logging.getLogger(__name__)
 
 app = typer.Typer()
 
-# Global instances
-alert_cache = AlertCache()
-notification_provider = NotificationProvider()
+
+def build_notification_provider() -> "NotificationProvider":
+    from notification_provider import NotificationProvider
+
+    return NotificationProvider(on_send=record_delivery)
+
+
+def build_outbox() -> "Outbox":
+    from outbox import Outbox
+
+    return Outbox(notification_provider)
+
+
+def outbox_stats() -> Dict[str, int]:
+    """Outbox item counts; a missing outbox is reported empty, not created"""
+    if not outbox.path.exists():
+        return {"pending": 0, "dead": 0, "in_flight": 0}
+    return outbox.stats()
+
+
+# Global instances; the caches and notification stack load files or import
+# aiohttp, so they are only built when a command first uses them
+alert_cache = LazyInstance(AlertCache)
+geocode_cache = LazyInstance(GeocodeCache)
+notification_provider = LazyInstance(build_notification_provider)
+delta_tracker = DeltaTracker()
+# Archive of every watched alert fetched, for the query and export commands
+alert_history = AlertHistory()
+spatial_dedupe = SpatialDedupe()
+# Declarative notification rules; empty means every watched alert is notified
+rule_set = RuleSet()
+# Set in worker processes: receives each poll's watched alerts instead of the
+# dedupe/geocode/notify pipeline, which the coordinator runs
+alert_sink: Optional[Callable[..., int]] = None
+# Notifications are persisted here before delivery and retried until sent
+outbox = LazyInstance(build_outbox)
+# Current alerts and new-alert stream served to local consumers (--feed-port)
+alert_feed = AlertFeed()
+# Per-cycle stage timings written as JSON lines (--trace)
+tracer = tracing.Tracer()
+# (config, rules file, default interval) the regions were loaded from; the
+# monitor reloads them when the files change
+config_source: Optional[Tuple[str, Optional[str], int]] = None
+config_reload_interval = float(os.getenv("CONFIG_RELOAD_INTERVAL", "5"))
+
+# Config file settings: (section, key) -> (global instance, attribute). Only
+# attributes are swapped, so pooled sessions, cache contents and the outbox
+# survive a reload
+RELOADABLE_SETTINGS = {
+    ("notifications", "pushover_user_keys"): (
+        "notification_provider",
+        "pushover_user_keys",
+    ),
+    ("notifications", "discord_webhook_urls"): (
+        "notification_provider",
+        "discord_webhook_urls",
+    ),
+    ("cache", "duration_hours"): ("alert_cache", "duration_hours"),
+    ("cache", "max_entries"): ("alert_cache", "max_entries"),
+    ("cache", "geocode_ttl_hours"): ("geocode_cache", "ttl_hours"),
+}
+# Values from before the config file overrode them, restored when a reload
+# removes the key again
+settings_baseline: Dict[Tuple[str, str], object] = {}
+# Settings given explicitly on the command line, which the config cannot override
+pinned_settings: Set[Tuple[str, str]] = set()
+
+# Cache sizes and lookup counts are read from the caches on each scrape
+metrics.registry.callback(
+    "waze_alert_cache_entries",
+    "Alerts in the seen-alert cache",
+    lambda: len(alert_cache.seen_alerts),
+)
+metrics.registry.callback(
+    "waze_alert_cache_lookups_total",
+    "Seen-alert cache lookups by result",
+    lambda: {("duplicate",): alert_cache.hits, ("new",): alert_cache.misses},
+    kind="counter",
+    labelnames=("result",),
+)
+metrics.registry.callback(
+    "waze_geocode_cache_entries",
+    "Locations in the reverse-geocode cache",
+    lambda: len(geocode_cache.entries),
+)
+metrics.registry.callback(
+    "waze_spatial_dedupe_entries",
+    "Recent alert locations in the spatial dedupe index",
+    lambda: len(spatial_dedupe),
+)
+metrics.registry.callback(
+    "waze_outbox_items",
+    "Notifications waiting in the outbox by state",
+    lambda: {(state,): count for state, count in outbox_stats().items()},
+    labelnames=("state",),
+)
+metrics.registry.callback(
+    "waze_noop_polls_total",
+    "Region polls skipped by delta polling because nothing changed",
+    lambda: delta_tracker.noop_cycles,
+    kind="counter",
+)
+
+# Upstream endpoints; overridable so replays and benchmarks can use local stubs
+WAZE_GEORSS_URL = os.getenv(
+    "WAZE_GEORSS_URL", "https://www.waze.com/live-map/api/georss"
+)
+NOMINATIM_URL = os.getenv(
+    "NOMINATIM_URL", "https://nominatim.openstreetmap.org/reverse"
+)
+
+# Nominatim usage policy allows at most one request per second
+nominatim_limiter = TokenBucket(rate=float(os.getenv("NOMINATIM_RATE_LIMIT", "1.0")))
 
 # Notification Configuration:
 # - Pushover: Set PUSHOVER_API_KEY and PUSHOVER_USER_KEYS (comma-separated)
@@ -50,15 +205,33 @@ bounds = {
 logger.info(f"Monitoring area: {bounds}")
 
 
-async def get_street_name_from_coordinates(lat, lon):
+async def get_street_name_from_coordinates(
+    lat, lon, session_manager: Optional["SessionManager"] = None
+):
     """Fetch street name from coordinates using OpenStreetMap Nominatim"""
-    url = f"https://nominatim.openstreetmap.org/reverse?lat={lat}&lon={lon}&format=json&addressdetails=1"
+    from session_manager import session_for
+
+    # Police reports cluster at the same spots, so reuse nearby resolutions
+    start = time.perf_counter()
+    cached_street = geocode_cache.lookup(lat, lon)
+    if cached_street is not None:
+        logger.debug(f"Geocode cache hit for ({lat}, {lon}): {cached_street}")
+        metrics.GEOCODE_SECONDS.observe(time.perf_counter() - start, source="cache")
+        return cached_street
+
+    url = f"{NOMINATIM_URL}?lat={lat}&lon={lon}&format=json&addressdetails=1"
 
     headers = {"User-Agent": "WazePinger/1.0"}  # Required by Nominatim terms of service
 
     try:
-        async with aiohttp.ClientSession() as session:
+        await nominatim_limiter.acquire()
+        # Timed from after the rate limiter so queueing is not counted
+        start = time.perf_counter()
+        async with session_for(url, session_manager) as session:
             async with session.get(url, headers=headers) as response:
+                metrics.UPSTREAM_RESPONSES.inc(
+                    upstream="nominatim", status=response.status
+                )
                 if response.status == 200:
                     data = await response.json()
 
@@ -77,6 +250,10 @@ async def get_street_name_from_coordinates(lat, lon):
                         or "Unknown Street"
                     )
 
+                    geocode_cache.store(lat, lon, street_name)
+                    metrics.GEOCODE_SECONDS.observe(
+                        time.perf_counter() - start, source="nominatim"
+                    )
                     return street_name
                 else:
                     logger.error(f"Geocoding failed: HTTP {response.status}")
@@ -85,18 +262,182 @@ async def get_street_name_from_coordinates(lat, lon):
                     return "Unknown Street"
     except Exception as e:
         logger.error(f"Geocoding error: {e}")
+        metrics.UPSTREAM_RESPONSES.inc(upstream="nominatim", status="error")
         return "Unknown Street"
 
 
-async def check_waze_alerts(custom_bounds: Optional[dict] = None):
-    # Use custom bounds if provided, otherwise use global bounds
-    current_bounds = custom_bounds or bounds
+def dedupe_scope(regions: List[Region], rules: Optional[List[Rule]]) -> Hashable:
+    """Alerts routed alike go to the same targets, so only they dedupe spatially"""
+    return (
+        frozenset(base_name(region.name) for region in regions),
+        frozenset(rule.name for rule in rules or ()),
+    )
 
-    # Correct Waze API endpoint (working as of 2025)
-    timestamp = int(asyncio.get_event_loop().time() * 1000)
 
-    # Use the working API endpoint
-    url = f"https://www.waze.com/live-map/api/georss?top={current_bounds['top']}&bottom={current_bounds['bottom']}&left={current_bounds['left']}&right={current_bounds['right']}&env=na&types=alerts,traffic,users&_={timestamp}"
+def is_new_alert(alert: dict, scope: Hashable = None) -> bool:
+    """Filter stage: admit alerts that are neither cached nor near a recent one
+
+    Every new uuid is marked seen, including ones suppressed as nearby repeats
+    of an alert in the same ``scope``.
+    """
+    alert_uuid = alert.get("uuid")
+    if alert_uuid:
+        if alert_cache.is_seen(alert_uuid):
+            logger.debug(f"Skipping duplicate alert: {alert_uuid}")
+            metrics.ALERTS.inc(type=alert.get("type"), outcome="duplicate")
+            return False
+        alert_cache.mark_seen(alert_uuid)
+        # Several users reporting the same speed trap get distinct uuids
+        if spatial_dedupe.is_duplicate(alert, scope):
+            metrics.ALERTS.inc(type=alert.get("type"), outcome="nearby")
+            return False
+        metrics.ALERTS.inc(type=alert.get("type"), outcome="new")
+        return True
+
+    # If no UUID, treat as new (shouldn't happen but be safe)
+    logger.warning(f"Alert without UUID found: {alert.get('id', 'unknown')}")
+    metrics.ALERTS.inc(type=alert.get("type"), outcome="new")
+    return True
+
+
+async def geocode_alert(
+    alert: dict, session_manager: Optional["SessionManager"] = None
+) -> Optional[str]:
+    """Geocode stage: resolve the street name for an alert's coordinates"""
+    lat = alert.get("location", {}).get("y")
+    lon = alert.get("location", {}).get("x")
+    if lat and lon:
+        return await get_street_name_from_coordinates(lat, lon, session_manager)
+    return None
+
+
+def alert_label(alert: dict) -> str:
+    """Human readable label for an alert type, e.g. 'Police alert'"""
+    alert_type = alert.get("type") or "Waze"
+    return f"{alert_type.replace('_', ' ').capitalize()} alert"
+
+
+def targets_for_regions(
+    regions: List[Region], alert: Optional[dict] = None
+) -> Tuple[List[str], List[str]]:
+    """Union of the Pushover users and Discord webhooks of the matched regions
+
+    In regions with geofences the targets come from the fences containing the
+    alert; a fence without its own targets uses its region's.
+    """
+    pushover_user_keys: Dict[str, None] = {}
+    discord_webhook_urls: Dict[str, None] = {}
+    owners = []
+    for region in regions:
+        fences = region.matching_fences(alert) if alert is not None else []
+        owners.extend((fence, region) for fence in fences)
+        if not fences:
+            owners.append((region, region))
+    for owner, region in owners:
+        keys = owner.pushover_user_keys
+        if keys is None:
+            keys = region.pushover_user_keys
+        webhooks = owner.discord_webhook_urls
+        if webhooks is None:
+            webhooks = region.discord_webhook_urls
+        pushover_user_keys.update(
+            dict.fromkeys(
+                keys if keys is not None else notification_provider.pushover_user_keys
+            )
+        )
+        discord_webhook_urls.update(
+            dict.fromkeys(
+                webhooks
+                if webhooks is not None
+                else notification_provider.discord_webhook_urls
+            )
+        )
+    return list(pushover_user_keys), list(discord_webhook_urls)
+
+
+async def notify_alert(
+    alert: dict,
+    street_name: Optional[str],
+    regions: Optional[List[Region]] = None,
+    rules: Optional[List[Rule]] = None,
+):
+    """Notify stage: log the alert and queue it for the targets of its regions
+
+    Each fired rule renders its own message, sent to the rule's targets or,
+    where it leaves them out, to those of the regions it applies to.
+    """
+    description = alert.get("street", "Unknown location")
+    location = f"{alert.get('location', {}).get('y', 'N/A')}, {alert.get('location', {}).get('x', 'N/A')}"
+    city = alert.get("city", "Unknown city")
+    label = alert_label(alert)
+
+    if street_name is not None:
+        logger.info(f"{label}: {description} at {street_name} ({location}) in {city}")
+    else:
+        logger.info(f"{label}: {description} at {location} in {city}")
+
+    alert_feed.publish_new(
+        alert, [base_name(region.name) for region in regions or []], street_name
+    )
+
+    for rule in rules or [None]:
+        rule_regions = regions
+        if rule is not None and rule.regions is not None and regions:
+            rule_regions = [r for r in regions if r.name in rule.regions]
+        pushover_user_keys, discord_webhook_urls = None, None
+        if rule_regions:
+            pushover_user_keys, discord_webhook_urls = targets_for_regions(
+                rule_regions, alert
+            )
+        if rule is None:
+            message = f"{label} on {street_name or description} in {city}"
+        else:
+            message = rule.render(alert, street_name, label)
+            if rule.pushover_user_keys is not None:
+                pushover_user_keys = rule.pushover_user_keys
+            if rule.discord_webhook_urls is not None:
+                discord_webhook_urls = rule.discord_webhook_urls
+
+        # Persisted to the outbox rather than sent inline: delivery, digests and
+        # retries happen in the background without holding up the poll
+        outbox.put(
+            message,
+            notification_provider.resolve_targets(
+                pushover_user_keys, discord_webhook_urls
+            ),
+            label,
+        )
+
+
+def record_delivery(result: "DeliveryResult"):
+    """Record the metrics of one HTTP send, which may carry a whole digest"""
+    metrics.NOTIFY_SECONDS.observe(result.latency, channel=result.channel)
+    tracer.delivery(result.channel, result.latency, result.success)
+    metrics.NOTIFICATIONS.inc(
+        channel=result.channel,
+        outcome="delivered" if result.success else "failed",
+    )
+    metrics.UPSTREAM_RESPONSES.inc(
+        upstream=result.channel, status=result.status or "error"
+    )
+
+
+async def fetch_waze_tile(
+    tile_bounds: dict,
+    session_manager: Optional["SessionManager"] = None,
+    alert_types: Optional[Collection[str]] = None,
+) -> ParsedAlerts:
+    """Fetch the alerts of the given types inside one bounding box
+
+    Raises UpstreamError for HTTP and network failures and for responses that
+    could not be parsed, so the scheduler can back off.
+    """
+    # Correct Waze API endpoint (working as of 2025)
+    # Only request alerts; the jams and users arrays are never used
+    url = f"{WAZE_GEORSS_URL}?top={tile_bounds['top']}&bottom={tile_bounds['bottom']}&left={tile_bounds['left']}&right={tile_bounds['right']}&env=na&types=alerts"
+    if not delta_tracker.enabled:
+        timestamp = int(asyncio.get_event_loop().time() * 1000)
+        url += f"&_={timestamp}"
 
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -113,112 +454,829 @@ async def check_waze_alerts(custom_bounds: Optional[dict] = None):
         "X-Requested-With": "XMLHttpRequest",
     }
 
-    logger.info("Checking for Waze alerts...")
-    logger.info(f"Requesting URL: {url}")
+    # Delta mode drops the cache-buster and revalidates with the last
+    # response's ETag / Last-Modified instead
+    request_key = f"{url}|{','.join(sorted(alert_types or []))}"
+    if delta_tracker.enabled:
+        del headers["Cache-Control"], headers["Pragma"]
+        headers.update(delta_tracker.conditional_headers(request_key))
 
+    logger.debug(f"Requesting URL: {url}")
+
+    import aiohttp
+    from session_manager import session_for
+
+    start = time.perf_counter()
     try:
-        async with aiohttp.ClientSession() as session:
+        async with session_for(url, session_manager) as session:
             async with session.get(url, headers=headers) as response:
+                metrics.UPSTREAM_RESPONSES.inc(upstream="waze", status=response.status)
                 if response.status == 200:
-                    data = await response.json()
-                    alerts = data.get("alerts", [])
-                    logger.info(f"✅ Success! Found {len(alerts)} total alerts")
+                    # Only alerts of watched types are materialized
+                    with metrics.PARSE_SECONDS.time(), tracing.stage("parse"):
+                        parsed = await read_alerts(response, alert_types)
+                    if delta_tracker.enabled:
+                        delta_tracker.remember(
+                            request_key,
+                            response.headers.get("ETag"),
+                            response.headers.get("Last-Modified"),
+                            parsed,
+                        )
+                    return parsed
+
+                if response.status == 304:
+                    parsed = delta_tracker.not_modified(request_key)
+                    if parsed is not None:
+                        logger.debug(f"Tile {tile_bounds} not modified")
+                        return parsed
+
+                logger.error(f"HTTP {response.status}: Failed to fetch Waze data")
+                logger.error(f"Response headers: {dict(response.headers)}")
+                response_text = await response.text()
+                logger.error(f"Response body: {response_text[:500]}...")
+                raise UpstreamError(
+                    f"HTTP {response.status} from Waze",
+                    status=response.status,
+                    retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                )
+
+    except UpstreamError:
+        raise
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error(f"Network error: {e}")
+        metrics.UPSTREAM_RESPONSES.inc(upstream="waze", status="error")
+        raise UpstreamError(f"Network error: {e}") from e
+    except json.JSONDecodeError as e:
+        # Usually an HTML challenge page instead of the feed
+        logger.error(f"JSON parsing error: {e}")
+        raise UpstreamError(f"Unparseable response from Waze: {e}") from e
+    except Exception as e:
+        logger.error(f"Unexpected error fetching tile {tile_bounds}: {e}")
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.FETCH_SECONDS.observe(elapsed)
+        tracing.add("fetch", elapsed)
+
+
+def default_region(custom_bounds: Optional[dict] = None, interval: int = 300) -> Region:
+    """The single region used when no regions config is given"""
+    return Region(name="default", bounds=custom_bounds or bounds, interval=interval)
+
+
+def read_settings(config: str) -> dict:
+    """The ``notifications`` and ``cache`` keys of a config file, validated"""
+    with open(config, "r") as f:
+        data = json.load(f)
+    settings = {}
+    for (section, key), _ in RELOADABLE_SETTINGS.items():
+        value = (data.get(section) or {}).get(key)
+        if value is None:
+            continue
+        if section == "notifications":
+            if not isinstance(value, list) or not all(
+                isinstance(target, str) for target in value
+            ):
+                raise ValueError(f"{section}.{key} must be a list of strings")
+        elif not isinstance(value, int) or value < 0:
+            raise ValueError(f"{section}.{key} must be a non-negative integer")
+        settings[(section, key)] = value
+    return settings
+
+
+def apply_settings(settings: dict):
+    """Set the config's notification targets and cache settings on the globals"""
+    for setting, (instance_name, attribute) in RELOADABLE_SETTINGS.items():
+        instance = globals()[instance_name]
+        if setting in pinned_settings:
+            if setting in settings and settings[setting] != getattr(
+                instance, attribute
+            ):
+                logger.warning(
+                    f"Ignoring {'.'.join(setting)} from the config: "
+                    "it was set on the command line"
+                )
+            continue
+        if setting in settings:
+            value = settings[setting]
+            if setting not in settings_baseline:
+                settings_baseline[setting] = getattr(instance, attribute)
+        elif setting in settings_baseline:
+            value = settings_baseline.pop(setting)
+        else:
+            continue
+        if getattr(instance, attribute) != value:
+            setattr(instance, attribute, value)
+            # Values are left out: targets are secrets
+            source = "the config" if setting in settings else "its default"
+            logger.info(f"Set {'.'.join(setting)} from {source}")
+
+
+def resolve_regions(
+    config: Optional[str],
+    custom_bounds: Optional[dict],
+    interval: int,
+    rules: Optional[str] = None,
+) -> List[Region]:
+    """Regions from the config file if one is given, else the single default region
+
+    Rules come from the ``rules`` file if given, else the config's ``rules``
+    key; the types they name are added to the regions they apply to. The
+    config's ``notifications`` and ``cache`` keys override the environment.
+    """
+    global rule_set, config_source
+
+    if config:
+        regions = load_regions(config, default_interval=interval)
+        apply_settings(read_settings(config))
+        config_source = (config, rules, interval)
+        if custom_bounds:
+            logger.warning("Ignoring command line bounds because a config was given")
+    else:
+        regions = [default_region(custom_bounds, interval)]
+
+    if rules or config:
+        rule_set = load_rules(rules or config)
+        rule_set.watch(regions)
+        if rule_set:
+            logger.info(f"Loaded {len(rule_set)} notification rules")
+
+    if config:
+        for region in regions:
+            logger.info(
+                f"Region {region.name}: {region.bounds} every {region.interval}s "
+                f"watching {', '.join(region.alert_types)}"
+            )
+    return regions
+
+
+def load_config() -> Tuple[List[Region], RuleSet, dict]:
+    """Read and validate the config and rules files; blocking, run off the loop"""
+    config, rules, interval = config_source
+    regions = load_regions(config, default_interval=interval)
+    new_rules = load_rules(rules or config)
+    settings = read_settings(config)
+    new_rules.watch(regions)
+    return regions, new_rules, settings
+
+
+def swap_config(
+    loaded: Tuple[List[Region], RuleSet, dict],
+    apply_regions: Callable[[List[Region]], Optional[Awaitable]],
+) -> Optional[Awaitable]:
+    """Swap a loaded config in
+
+    Everything was parsed and validated by load_config, so an invalid file
+    leaves the running configuration untouched. The swap itself does not
+    await, so no poll sees half of it; what ``apply_regions`` returns (e.g.
+    restarting workers) is awaited afterwards.
+    """
+    global rule_set
+
+    regions, rule_set, settings = loaded
+    apply_settings(settings)
+    pending = apply_regions(regions)
+    logger.info(
+        f"Reloaded {config_source[0]}: "
+        f"{', '.join(region.name for region in regions)} "
+        f"with {len(rule_set)} notification rules"
+    )
+    return pending
+
+
+def watch_config(
+    apply_regions: Callable[[List[Region]], Optional[Awaitable]],
+) -> Optional[asyncio.Task]:
+    """Reload the regions' config whenever it changes, if one was loaded"""
+    if config_source is None or config_reload_interval <= 0:
+        return None
+    from config_watcher import ConfigWatcher
+
+    config, rules, _ = config_source
+    paths = [config] + ([rules] if rules and rules != config else [])
+    watcher = ConfigWatcher(
+        paths,
+        load_config,
+        lambda loaded: swap_config(loaded, apply_regions),
+        config_reload_interval,
+    )
+    return asyncio.create_task(watcher.run())
 
-                    police_alerts = [
-                        alert for alert in alerts if alert.get("type") == "POLICE"
-                    ]
-                    logger.info(f"Found {len(police_alerts)} police alerts")
-
-                    # Filter out duplicate alerts using cache
-                    new_police_alerts = []
-                    duplicate_count = 0
-
-                    for alert in police_alerts:
-                        alert_uuid = alert.get("uuid")
-                        if alert_uuid:
-                            if not alert_cache.is_seen(alert_uuid):
-                                new_police_alerts.append(alert)
-                                alert_cache.mark_seen(alert_uuid)
-                            else:
-                                duplicate_count += 1
-                                logger.debug(f"Skipping duplicate alert: {alert_uuid}")
-                        else:
-                            # If no UUID, treat as new (shouldn't happen but be safe)
-                            new_police_alerts.append(alert)
-                            logger.warning(
-                                f"Alert without UUID found: {alert.get('id', 'unknown')}"
-                            )
 
+async def check_waze_alerts(
+    custom_bounds: Optional[dict] = None,
+    session_manager: Optional["SessionManager"] = None,
+    regions: Optional[List[Region]] = None,
+) -> PollResult:
+    """Poll Waze once for the given regions and process any new alerts
+
+    Raises UpstreamError if Waze could not be reached, and re-raises any other
+    failure, so callers back off instead of treating the poll as quiet.
+    """
+    # Use the given regions, or a single region over the custom/global bounds
+    regions = regions or [default_region(custom_bounds)]
+    current_bounds = union_bounds([region.bounds for region in regions])
+
+    logger.info(
+        f"Checking for Waze alerts in {', '.join(region.name for region in regions)}..."
+    )
+
+    with tracer.cycle(region.name for region in regions):
+        start = time.perf_counter()
+        try:
+            # Split the area into tiles fetched concurrently over the shared pool
+            alert_types = {t for region in regions for t in region.alert_types}
+            fetcher = TiledFetcher(
+                lambda tile: fetch_waze_tile(tile, session_manager, alert_types)
+            )
+            with tracing.span("fetch"):
+                alerts = await fetcher.fetch(current_bounds)
+            tracing.count("alerts", len(alerts))
+
+            logger.info(
+                f"✅ Success! Found {len(alerts)} alerts of type {', '.join(sorted(alert_types))}"
+            )
+
+            # Route each alert to every region watching it; dedupe stays per uuid so
+            # an alert in overlapping regions is geocoded and notified only once
+            alert_regions: Dict[str, List[Region]] = {}
+            alert_rules: Dict[str, List[Rule]] = {}
+            watched_alerts = []
+            with tracing.span("route"):
+                for alert in alerts:
+                    matching, fired = route_alert(alert, regions, rule_set)
+                    if not matching:
+                        continue
+                    # Alerts that rules cover but none fires are dropped before dedupe
+                    if fired is not None:
+                        if not fired:
+                            continue
+                        alert_rules[alert_key(alert)] = fired
+                    alert_regions[alert_key(alert)] = matching
+                    watched_alerts.append(alert)
+            tracing.count("watched", len(watched_alerts))
+            logger.info(f"Found {len(watched_alerts)} watched alerts")
+
+            # Refreshed before the delta check, which only skips unchanged polls
+            alert_feed.update(
+                (region.name for region in regions),
+                watched_alerts,
+                {
+                    key: [region.name for region in matching]
+                    for key, matching in alert_regions.items()
+                },
+            )
+
+            # In delta mode skip dedupe, notification and persistence when no
+            # region's alert set (uuid/pubMillis/fired rules) changed since its
+            # last processed poll
+            fingerprints: Dict[str, str] = {}
+            if delta_tracker.enabled:
+                fired = {
+                    key: [rule.name for rule in rules]
+                    for key, rules in alert_rules.items()
+                }
+                for region in regions:
+                    fingerprints[region.name] = fingerprint_alerts(
+                        (
+                            a
+                            for a in watched_alerts
+                            if region in alert_regions[alert_key(a)]
+                        ),
+                        fired,
+                    )
+                unchanged = [
+                    delta_tracker.is_unchanged(name, fingerprint)
+                    for name, fingerprint in fingerprints.items()
+                ]
+                if all(unchanged):
+                    stats = delta_tracker.get_stats()
                     logger.info(
-                        f"Found {len(new_police_alerts)} new police alerts ({duplicate_count} duplicates filtered)"
+                        f"No change since last poll, skipping processing "
+                        f"({stats['noop_cycles']} of {stats['cycles']} region polls were no-ops)"
                     )
+                    return PollResult(retry_after=fetcher.retry_after)
+
+            if alert_history.enabled:
+                with tracing.span("history"):
+                    alert_history.record(watched_alerts)
+
+            if alert_sink is not None:
+                with tracing.span("forward"):
+                    new_count = alert_sink(watched_alerts, alert_regions, alert_rules)
+            else:
+                new_count = await process_alerts(
+                    watched_alerts, alert_regions, alert_rules, session_manager
+                )
+            # Only now, so a failed poll is processed again when next seen
+            delta_tracker.commit(fingerprints)
+            return PollResult(new_alerts=new_count, retry_after=fetcher.retry_after)
+
+        except UpstreamError as e:
+            logger.error(f"Failed to fetch Waze data for every tile: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error: {e}")
+            raise
+        finally:
+            metrics.POLL_SECONDS.observe(time.perf_counter() - start)
+
+
+async def process_alerts(
+    watched_alerts: List[dict],
+    alert_regions: Dict[str, List[Region]],
+    alert_rules: Dict[str, List[Rule]],
+    session_manager: Optional["SessionManager"] = None,
+) -> int:
+    """Dedupe, geocode and notify routed alerts, then persist the caches"""
+    # Filter out duplicates, then geocode and notify new alerts concurrently
+    pipeline = AlertPipeline(
+        accept=tracing.timed(
+            "filter",
+            lambda alert: is_new_alert(
+                alert,
+                dedupe_scope(
+                    alert_regions[alert_key(alert)], alert_rules.get(alert_key(alert))
+                ),
+            ),
+        ),
+        geocode=tracing.timed_async(
+            "geocode", lambda alert: geocode_alert(alert, session_manager)
+        ),
+        notify=tracing.timed_async(
+            "notify",
+            lambda alert, street_name: notify_alert(
+                alert,
+                street_name,
+                alert_regions[alert_key(alert)],
+                alert_rules.get(alert_key(alert)),
+            ),
+        ),
+    )
+    with tracing.span("pipeline"):
+        new_count = await pipeline.run(watched_alerts)
+    tracing.count("new", new_count)
+    duplicate_count = len(watched_alerts) - new_count
 
-                    # Save cache after processing
-                    alert_cache.save_cache()
-
-                    for alert in new_police_alerts:
-                        description = alert.get("street", "Unknown location")
-                        location = f"{alert.get('location', {}).get('y', 'N/A')}, {alert.get('location', {}).get('x', 'N/A')}"
-                        city = alert.get("city", "Unknown city")
-
-                        # Extract coordinates
-                        lat = alert.get("location", {}).get("y")
-                        lon = alert.get("location", {}).get("x")
-
-                        # Get street name from coordinates
-                        if lat and lon:
-                            street_name = await get_street_name_from_coordinates(
-                                lat, lon
-                            )
-                            logger.info(
-                                f"Police alert: {description} at {street_name} ({location}) in {city}"
-                            )
-                            await notification_provider.notify_all_users(
-                                f"Police alert on {street_name} in {city}"
-                            )
-                        else:
-                            logger.info(
-                                f"Police alert: {description} at {location} in {city}"
-                            )
-                            await notification_provider.notify_all_users(
-                                f"Police alert on {description} in {city}"
-                            )
-                else:
-                    logger.error(f"HTTP {response.status}: Failed to fetch Waze data")
-                    logger.error(f"Response headers: {dict(response.headers)}")
-                    response_text = await response.text()
-                    logger.error(f"Response body: {response_text[:500]}...")
+    logger.info(
+        f"Processed {new_count} new alerts ({duplicate_count} duplicates filtered)"
+    )
+
+    # Save caches after processing
+    with tracing.span("save"):
+        alert_cache.save_cache()
+        geocode_cache.save_cache()
+    return new_count
+
+
+def poll_worker(
+    index: int,
+    shard: List[Region],
+    queue,
+    settings: dict,
+    cycles: Optional[int] = None,
+):
+    """Entry point of a worker process in ``monitor --workers`` mode
+
+    The worker fetches, parses, routes and applies rules for its shard of
+    regions, and forwards each alert to the coordinator the first time it sees
+    it. ``cycles`` polls the shard that many times back to back and exits.
+    """
+    global alert_sink, alert_feed, rule_set
+
+    logging.getLogger().setLevel(settings["log_level"])
+    delta_tracker.enabled = settings["delta"]
+    alert_history.enabled = settings["history"]
+    tracer.enabled = settings["trace"]
+    rule_set = settings["rules"]
+    forward = ForwardFilter(settings["cache_duration"], settings["cache_max_entries"])
+    if settings["feed"]:
+        alert_feed = FeedForwarder(index, queue)
+
+    def sink(watched_alerts, alert_regions, alert_rules) -> int:
+        batch = []
+        for alert in watched_alerts:
+            if not forward.admit(alert.get("uuid")):
+                continue
+            key = alert_key(alert)
+            rules = alert_rules.get(key)
+            batch.append(
+                (
+                    alert,
+                    [base_name(region.name) for region in alert_regions[key]],
+                    None if rules is None else [rule.name for rule in rules],
+                )
+            )
+        if batch:
+            queue.put(("alerts", index, batch))
+        return len(batch)
+
+    alert_sink = sink
+    try:
+        asyncio.run(worker_loop(shard, settings, cycles))
+    except KeyboardInterrupt:
+        pass
+    queue.put(("done", index, None))
 
-    except aiohttp.ClientError as e:
-        logger.error(f"Network error: {e}")
-    except json.JSONDecodeError as e:
-        logger.error(f"JSON parsing error: {e}")
-    except Exception as e:
-        logger.error(f"Unexpected error: {e}")
+
+async def worker_loop(shard: List[Region], settings: dict, cycles: Optional[int]):
+    from session_manager import SessionManager
+
+    async with SessionManager() as session_manager:
+        if cycles is not None:
+            for _ in range(cycles):
+                try:
+                    await check_waze_alerts(
+                        session_manager=session_manager, regions=shard
+                    )
+                except Exception:
+                    pass  # Already logged
+            return
+        scheduler = RegionScheduler(
+            shard,
+            lambda group: check_waze_alerts(
+                session_manager=session_manager, regions=group
+            ),
+            min_interval=settings["min_interval"],
+            max_interval=settings["max_interval"],
+        )
+        await scheduler.run()
+
+
+async def coordinate_workers(
+    pool: WorkerPool,
+    regions: List[Region],
+    metrics_port: Optional[int] = None,
+    feed_port: Optional[int] = None,
+    workers: Optional[int] = None,
+):
+    """Dedupe, geocode and notify the alerts that worker processes forward
+
+    The coordinator alone owns the alert cache, so dedupe stays exact across
+    shards, and the outbox, so every notification is delivered once.
+    """
+    from session_manager import SessionManager
+
+    regions_by_name = {region.name: region for region in regions}
+    rules_by_name = {rule.name: rule for rule in rule_set.rules}
+    loop = asyncio.get_running_loop()
+    finished: Set[int] = set()
+
+    def reshard(new_regions: List[Region]) -> Awaitable:
+        """Apply reloaded regions and rules by restarting the workers
+
+        Stopping and spawning workers blocks for seconds, so it runs in an
+        executor while the loop keeps delivering notifications.
+        """
+        regions_by_name.clear()
+        regions_by_name.update((region.name, region) for region in new_regions)
+        rules_by_name.clear()
+        rules_by_name.update((rule.name, rule) for rule in rule_set.rules)
+        settings, *rest = pool.args
+        settings = {
+            **settings,
+            "rules": rule_set,
+            "cache_duration": alert_cache.duration_hours,
+            "cache_max_entries": alert_cache.max_entries,
+        }
+        shards = shard_regions(new_regions, workers or len(pool.shards))
+        return loop.run_in_executor(None, pool.reshard, shards, (settings, *rest))
+
+    async with SessionManager() as session_manager:
+        notification_provider.session_manager = session_manager
+        metrics_runner = None
+        if metrics_port:
+            metrics_runner = await metrics.start_metrics_server(metrics_port)
+        feed_runner = None
+        if feed_port:
+            feed_runner = await alert_feed.start(feed_port)
+        outbox_task = asyncio.create_task(outbox.run())
+        watch_task = watch_config(reshard)
+        try:
+            while len(finished) < len(pool.shards):
+                message = await loop.run_in_executor(None, pool.get)
+                if message is None:
+                    pool.reap()
+                    if not pool.alive:
+                        break
+                    continue
+                kind, index, batch = message
+                if kind == "done":
+                    finished.add(index)
+                    continue
+                if kind == "feed":
+                    alert_feed.update(*batch)
+                    continue
+                watched_alerts = []
+                alert_regions: Dict[str, List[Region]] = {}
+                alert_rules: Dict[str, List[Rule]] = {}
+                for alert, region_names, rule_names in batch:
+                    # Batches sent before a reload can name removed regions
+                    matching = [
+                        regions_by_name[n] for n in region_names if n in regions_by_name
+                    ]
+                    if not matching:
+                        continue
+                    key = alert_key(alert)
+                    watched_alerts.append(alert)
+                    alert_regions[key] = matching
+                    if rule_names is not None:
+                        alert_rules[key] = [
+                            rules_by_name[n] for n in rule_names if n in rules_by_name
+                        ]
+                batch_regions = {base_name(n) for _, names, _ in batch for n in names}
+                with tracer.cycle(sorted(batch_regions), kind="batch"):
+                    await process_alerts(
+                        watched_alerts, alert_regions, alert_rules, session_manager
+                    )
+        finally:
+            if watch_task is not None:
+                watch_task.cancel()
+            await outbox.drain()
+            outbox_task.cancel()
+            notification_provider.session_manager = None
+            if metrics_runner is not None:
+                await metrics_runner.cleanup()
+            if feed_runner is not None:
+                await feed_runner.cleanup()
+
+
+def run_workers(
+    regions: List[Region],
+    workers: int,
+    min_interval: Optional[float] = None,
+    max_interval: Optional[float] = None,
+    metrics_port: Optional[int] = None,
+    cycles: Optional[int] = None,
+    feed_port: Optional[int] = None,
+):
+    """Poll the regions from ``workers`` processes with this one as coordinator"""
+    settings = {
+        "delta": delta_tracker.enabled,
+        "history": alert_history.enabled,
+        "trace": tracer.enabled,
+        "rules": rule_set,
+        "min_interval": min_interval,
+        "max_interval": max_interval,
+        "cache_duration": alert_cache.duration_hours,
+        "cache_max_entries": alert_cache.max_entries,
+        "log_level": logging.getLogger().level,
+        "feed": bool(feed_port),
+    }
+    shards = shard_regions(regions, workers)
+    pool = WorkerPool(poll_worker, shards, (settings, cycles), restart=cycles is None)
+    pool.start()
+    try:
+        asyncio.run(coordinate_workers(pool, regions, metrics_port, feed_port, workers))
+    except KeyboardInterrupt:
+        logger.info("Shutting down...")
+    finally:
+        pool.stop()
 
 
 async def monitor_loop(
-    interval: int = 300, custom_bounds: Optional[dict] = None, dry_run: bool = False
+    interval: int = 300,
+    custom_bounds: Optional[dict] = None,
+    dry_run: bool = False,
+    regions: Optional[List[Region]] = None,
+    min_interval: Optional[float] = None,
+    max_interval: Optional[float] = None,
+    metrics_port: Optional[int] = None,
+    feed_port: Optional[int] = None,
 ):
     """Main monitoring loop"""
+    regions = regions or [default_region(custom_bounds, interval)]
     logger.info("Starting Waze police alert monitor...")
-    logger.info(f"Monitoring every {interval} seconds")
+    for region in regions:
+        logger.info(f"Monitoring {region.name} every {region.interval} seconds")
 
     if dry_run:
         logger.info("DRY RUN MODE: Notifications will not be sent")
 
-    # Run every specified interval
-    while True:
+    from session_manager import SessionManager
+
+    # Pooled HTTP sessions live for the whole monitor run and are shared with
+    # the notification provider so every poll reuses warm connections
+    async with SessionManager() as session_manager:
+        notification_provider.session_manager = session_manager
+        metrics_runner = None
+        if metrics_port:
+            metrics_runner = await metrics.start_metrics_server(metrics_port)
+        feed_runner = None
+        if feed_port:
+            feed_runner = await alert_feed.start(feed_port)
+
+        # One scheduler polls every region; overlapping regions that fall due
+        # together share a single upstream fetch, and each region's interval
+        # adapts to alert activity and upstream errors
+        scheduler = RegionScheduler(
+            regions,
+            lambda group: check_waze_alerts(
+                session_manager=session_manager, regions=group
+            ),
+            min_interval=min_interval,
+            max_interval=max_interval,
+        )
+        # Delivers new notifications, retries and whatever a previous run left
+        outbox_task = asyncio.create_task(outbox.run())
+        # Config changes swap regions, rules, targets and cache settings in place
+        watch_task = watch_config(scheduler.update)
         try:
-            await check_waze_alerts(custom_bounds)
-            logger.info(f"Sleeping for {interval} seconds...")
-            await asyncio.sleep(interval)
+            await scheduler.run()
         except KeyboardInterrupt:
             logger.info("Shutting down...")
-            break
-        except Exception as e:
-            logger.error(f"Main loop error: {e}")
-            await asyncio.sleep(60)  # Wait 1 minute before retrying
+        finally:
+            if watch_task is not None:
+                watch_task.cancel()
+            outbox_task.cancel()
+            notification_provider.session_manager = None
+            if metrics_runner is not None:
+                await metrics_runner.cleanup()
+            if feed_runner is not None:
+                await feed_runner.cleanup()
+
+
+async def check_once_with_sessions(
+    custom_bounds: Optional[dict] = None, regions: Optional[List[Region]] = None
+):
+    """Run a single check using one pooled session set for all of its requests"""
+    from session_manager import SessionManager
+
+    async with SessionManager() as session_manager:
+        notification_provider.session_manager = session_manager
+        try:
+            await check_waze_alerts(custom_bounds, session_manager, regions)
+        except Exception:
+            pass  # Already logged; there is no next poll to back off
+        finally:
+            # Send what is due now; failures stay in the outbox for the next run
+            await outbox.drain()
+            notification_provider.session_manager = None
+
+
+async def replay_cycles(
+    payloads: List[dict],
+    alert_types: Optional[List[str]] = None,
+    recipients: int = 1,
+    trace_memory: bool = True,
+) -> "ReplayStats":
+    """Feed one payload per cycle through check_waze_alerts against local stubs
+
+    Waze, Nominatim, Pushover and Discord are replaced by a local stub server,
+    and the caches live in a temporary directory, so a replay never touches the
+    network or the real cache files. Every region setting comes from the
+    default region; the Nominatim rate limit is lifted.
+    """
+    import tempfile
+    import tracemalloc
+    from notification_provider import NotificationProvider
+    from outbox import Outbox
+    from replay import ReplayStats, StubUpstreams
+    from session_manager import SessionManager
+
+    global alert_cache, geocode_cache, notification_provider, nominatim_limiter
+    global outbox, alert_history, spatial_dedupe, WAZE_GEORSS_URL, NOMINATIM_URL
+
+    if alert_types is None:
+        alert_types = sorted(
+            {alert.get("type") for p in payloads for alert in p.get("alerts", [])}
+            - {None}
+        )
+    region = Region(name="replay", bounds=bounds, alert_types=alert_types)
+    saved = (
+        alert_cache,
+        geocode_cache,
+        notification_provider,
+        outbox,
+        alert_history,
+        spatial_dedupe,
+        nominatim_limiter,
+        WAZE_GEORSS_URL,
+        NOMINATIM_URL,
+    )
+    stats = ReplayStats()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        async with StubUpstreams() as stubs, SessionManager() as session_manager:
+            alert_cache = AlertCache(cache_file=str(Path(cache_dir) / "alerts.pkl"))
+            geocode_cache = GeocodeCache(cache_file=str(Path(cache_dir) / "geo.pkl"))
+            notification_provider = NotificationProvider(
+                session_manager, on_send=record_delivery
+            )
+            notification_provider.pushover_url = stubs.pushover_url
+            notification_provider.pushover_api_key = "replay"
+            notification_provider.pushover_user_keys = [
+                f"replay-user-{index}" for index in range(recipients)
+            ]
+            notification_provider.discord_webhook_urls = [
+                stubs.discord_webhook(index) for index in range(recipients)
+            ]
+            outbox = Outbox(
+                notification_provider,
+                path=str(Path(cache_dir) / "outbox.db"),
+            )
+            # Archived only if history is on, so its cost can be measured
+            alert_history = AlertHistory(
+                path=str(Path(cache_dir) / "history.db"),
+                enabled=alert_history.enabled,
+            )
+            # Fresh per run, or repeated runs would suppress each other's alerts
+            spatial_dedupe = SpatialDedupe()
+            nominatim_limiter = TokenBucket(rate=1e6, capacity=1e6)
+            WAZE_GEORSS_URL, NOMINATIM_URL = stubs.georss_url, stubs.nominatim_url
+
+            if trace_memory:
+                tracemalloc.start()
+            try:
+                for payload in payloads:
+                    stubs.payload = payload
+                    start = time.perf_counter()
+                    result = await check_waze_alerts(
+                        session_manager=session_manager, regions=[region]
+                    )
+                    # Count delivery too, as a cycle's notifications would
+                    # otherwise still be in the outbox
+                    await outbox.drain()
+                    stats.latencies.append(time.perf_counter() - start)
+                    stats.alerts += sum(
+                        1
+                        for alert in payload.get("alerts", [])
+                        if region.matches(alert)
+                    )
+                    stats.new_alerts += result.new_alerts if result else 0
+                if trace_memory:
+                    stats.peak_memory = tracemalloc.get_traced_memory()[1]
+            finally:
+                if trace_memory:
+                    tracemalloc.stop()
+                outbox.close()
+                alert_history.close()
+                (
+                    alert_cache,
+                    geocode_cache,
+                    notification_provider,
+                    outbox,
+                    alert_history,
+                    spatial_dedupe,
+                    nominatim_limiter,
+                    WAZE_GEORSS_URL,
+                    NOMINATIM_URL,
+                ) = saved
+            stats.requests = dict(stubs.requests)
+
+    return stats
+
+
+def enable_history(history: bool):
+    if history:
+        alert_history.enabled = True
+    if alert_history.enabled:
+        logger.info(f"Archiving watched alerts to {alert_history.path}")
+
+
+def enable_tracing(trace: bool):
+    if trace:
+        tracer.enabled = True
+    if tracer.enabled:
+        logger.info(f"Writing per-cycle stage timings to {tracer.path}")
+
+
+def profiled(profile: Optional[str]):
+    """Sample the main thread's stacks into ``profile`` while the block runs"""
+    if not profile:
+        return nullcontext()
+    from profiler import SamplingProfiler
+
+    logger.info(f"Profiling to {profile}")
+    return SamplingProfiler(profile)
+
+
+def history_rows(
+    alert_types: Optional[str],
+    top: Optional[float],
+    bottom: Optional[float],
+    left: Optional[float],
+    right: Optional[float],
+    since: Optional[str],
+    until: Optional[str],
+    limit: Optional[int] = None,
+):
+    """Stream archived alerts matching the query/export command filters"""
+    query_bounds = None
+    if any(value is not None for value in (top, bottom, left, right)):
+        query_bounds = {
+            "top": 90 if top is None else top,
+            "bottom": -90 if bottom is None else bottom,
+            "left": -180 if left is None else left,
+            "right": 180 if right is None else right,
+        }
+    return alert_history.query(
+        alert_types.split(",") if alert_types else None,
+        query_bounds,
+        parse_time(since),
+        parse_time(until),
+        limit,
+    )
 
 
 @app.command()
@@ -244,8 +1302,71 @@ def monitor(
         "--cache-duration",
         help="Cache duration in hours (overrides CACHE_DURATION_HOURS env var)",
     ),
+    config: Optional[str] = typer.Option(
+        default_config_path(),
+        "--config",
+        "-c",
+        help="JSON config with named regions (overrides bounds; WAZE_PINGER_CONFIG env var)",
+    ),
+    rules: Optional[str] = typer.Option(
+        os.getenv("WAZE_PINGER_RULES"),
+        "--rules",
+        help="JSON file of notification rules (default: the config's rules; WAZE_PINGER_RULES env var)",
+    ),
+    delta: bool = typer.Option(
+        False,
+        "--delta",
+        help="Skip processing polls whose alerts did not change (DELTA_POLLING=1 env var)",
+    ),
+    min_interval: Optional[float] = typer.Option(
+        None,
+        "--min-interval",
+        help="Shortest adaptive interval in seconds (POLL_MIN_INTERVAL env var)",
+    ),
+    max_interval: Optional[float] = typer.Option(
+        None,
+        "--max-interval",
+        help="Longest adaptive interval in seconds (POLL_MAX_INTERVAL env var)",
+    ),
+    metrics_port: Optional[int] = typer.Option(
+        int(os.getenv("METRICS_PORT", "0")) or None,
+        "--metrics-port",
+        help="Serve Prometheus metrics on this port at /metrics (METRICS_PORT env var)",
+    ),
+    feed_port: Optional[int] = typer.Option(
+        int(os.getenv("FEED_PORT", "0")) or None,
+        "--feed-port",
+        help="Serve current alerts at /alerts and new ones at /events and /ws (FEED_PORT env var)",
+    ),
+    reload_interval: float = typer.Option(
+        config_reload_interval,
+        "--reload-interval",
+        help="Seconds between checks of the config for changes, 0 disables (CONFIG_RELOAD_INTERVAL env var)",
+    ),
+    workers: int = typer.Option(
+        int(os.getenv("MONITOR_WORKERS", "1")),
+        "--workers",
+        "-w",
+        help="Poll from this many worker processes (MONITOR_WORKERS env var)",
+    ),
+    history: bool = typer.Option(
+        False,
+        "--history",
+        help="Archive every watched alert for query/export (ALERT_HISTORY=1 env var)",
+    ),
+    trace: bool = typer.Option(
+        False,
+        "--trace",
+        help="Write per-cycle stage timings as JSON lines (TRACE_ENABLED=1 env var)",
+    ),
+    profile: Optional[str] = typer.Option(
+        os.getenv("PROFILE_FILE"),
+        "--profile",
+        help="Write sampled stacks in collapsed format to this file (PROFILE_FILE env var)",
+    ),
 ):
     """Monitor Waze for police alerts in the specified area"""
+    global config_reload_interval
 
     # Build custom bounds if any are provided
     custom_bounds = None
@@ -264,10 +1385,44 @@ def monitor(
     # Update cache duration if specified
     if cache_duration is not None:
         alert_cache.duration_hours = cache_duration
+        pinned_settings.add(("cache", "duration_hours"))
         logger.info(f"Cache duration set to {cache_duration} hours")
 
-    # Run the monitoring loop
-    asyncio.run(monitor_loop(interval, custom_bounds, dry_run))
+    if delta:
+        delta_tracker.enabled = True
+    if delta_tracker.enabled:
+        logger.info("Delta polling enabled: unchanged polls will be skipped")
+    enable_history(history)
+    enable_tracing(trace)
+    config_reload_interval = reload_interval
+
+    regions = resolve_regions(config, custom_bounds, interval, rules)
+
+    with profiled(profile):
+        if workers > 1:
+            run_workers(
+                regions,
+                workers,
+                min_interval,
+                max_interval,
+                metrics_port,
+                feed_port=feed_port,
+            )
+            return
+
+        # Run the monitoring loop
+        asyncio.run(
+            monitor_loop(
+                interval,
+                custom_bounds,
+                dry_run,
+                regions,
+                min_interval,
+                max_interval,
+                metrics_port,
+                feed_port,
+            )
+        )
 
 
 @app.command()
@@ -290,6 +1445,32 @@ def check_once(
         "--cache-duration",
         help="Cache duration in hours (overrides CACHE_DURATION_HOURS env var)",
     ),
+    config: Optional[str] = typer.Option(
+        default_config_path(),
+        "--config",
+        "-c",
+        help="JSON config with named regions (overrides bounds; WAZE_PINGER_CONFIG env var)",
+    ),
+    rules: Optional[str] = typer.Option(
+        os.getenv("WAZE_PINGER_RULES"),
+        "--rules",
+        help="JSON file of notification rules (default: the config's rules; WAZE_PINGER_RULES env var)",
+    ),
+    history: bool = typer.Option(
+        False,
+        "--history",
+        help="Archive every watched alert for query/export (ALERT_HISTORY=1 env var)",
+    ),
+    trace: bool = typer.Option(
+        False,
+        "--trace",
+        help="Write per-cycle stage timings as JSON lines (TRACE_ENABLED=1 env var)",
+    ),
+    profile: Optional[str] = typer.Option(
+        os.getenv("PROFILE_FILE"),
+        "--profile",
+        help="Write sampled stacks in collapsed format to this file (PROFILE_FILE env var)",
+    ),
 ):
     """Check for police alerts once and exit"""
 
@@ -310,10 +1491,77 @@ def check_once(
     # Update cache duration if specified
     if cache_duration is not None:
         alert_cache.duration_hours = cache_duration
+        pinned_settings.add(("cache", "duration_hours"))
         logger.info(f"Cache duration set to {cache_duration} hours")
 
+    enable_history(history)
+    enable_tracing(trace)
+    regions = resolve_regions(config, custom_bounds, 300, rules)
+
     # Run a single check
-    asyncio.run(check_waze_alerts(custom_bounds))
+    with profiled(profile):
+        asyncio.run(check_once_with_sessions(custom_bounds, regions))
+
+
+@app.command()
+def replay(
+    payload_files: Optional[List[Path]] = typer.Argument(
+        None, help="Recorded georss responses (default: sample_waze_response.json)"
+    ),
+    cycles: int = typer.Option(10, "--cycles", "-n", help="Poll cycles to replay"),
+    alerts: int = typer.Option(
+        0,
+        "--alerts",
+        help="Synthesize this many alerts per cycle from the recordings (0 replays them as-is)",
+    ),
+    duplicate_ratio: float = typer.Option(
+        0.5,
+        "--duplicate-ratio",
+        help="Share of synthetic alerts repeated from the previous cycle",
+    ),
+    recipients: int = typer.Option(
+        1, "--recipients", help="Stub Pushover users and Discord webhooks each"
+    ),
+    alert_types: Optional[str] = typer.Option(
+        None,
+        "--types",
+        help="Comma-separated alert types to process (default: every type replayed)",
+    ),
+    trace_memory: bool = typer.Option(
+        True,
+        "--trace-memory/--no-trace-memory",
+        help="Report peak memory (tracemalloc slows the replay down)",
+    ),
+    verbose: bool = typer.Option(False, "--verbose", help="Keep per-alert logging"),
+):
+    """Replay recorded Waze responses through the pipeline against local stubs"""
+    from replay import (
+        SAMPLE_PAYLOAD,
+        load_payloads,
+        recorded_cycles,
+        synthesize_cycles,
+    )
+
+    templates = load_payloads([str(p) for p in payload_files or [SAMPLE_PAYLOAD]])
+    if alerts:
+        payloads = synthesize_cycles(templates, alerts, cycles, duplicate_ratio, bounds)
+    else:
+        payloads = recorded_cycles(templates, cycles)
+
+    # Per-alert log lines would dominate the measurement and fill the log file
+    if not verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    stats = asyncio.run(
+        replay_cycles(
+            payloads,
+            alert_types.split(",") if alert_types else None,
+            recipients,
+            trace_memory,
+        )
+    )
+    for line in stats.summary():
+        typer.echo(line)
 
 
 @app.command()
@@ -324,8 +1572,17 @@ def show_bounds(
     save_path: Optional[str] = typer.Option(
         None, "--save", "-s", help="Save map to specific path"
     ),
+    feed: Optional[str] = typer.Option(
+        os.getenv("FEED_URL"),
+        "--feed",
+        "-f",
+        help="Plot the current alerts of a monitor's feed, e.g. http://127.0.0.1:8765 (FEED_URL env var)",
+    ),
 ):
     """Show the current monitoring bounds and optionally display on a map"""
+    import folium
+    import webbrowser
+
     typer.echo(f"Current monitoring bounds:")
     typer.echo(f"  Top: {bounds['top']}")
     typer.echo(f"  Bottom: {bounds['bottom']}")
@@ -377,6 +1634,9 @@ def show_bounds(
         icon=folium.Icon(color="blue", icon="info-sign"),
     ).add_to(m)
 
+    if feed:
+        plot_feed_alerts(m, feed)
+
     # Determine save path
     if save_path:
         map_path = Path(save_path)
@@ -395,6 +1655,73 @@ def show_bounds(
         typer.echo("Or use: --open to automatically open in browser")
 
 
+def plot_feed_alerts(m, feed: str):
+    """Add the current alerts of a running monitor's feed as clustered markers"""
+    from urllib.request import urlopen
+    import folium
+    from folium.plugins import MarkerCluster
+
+    url = f"{feed.rstrip('/')}/alerts"
+    try:
+        with urlopen(url, timeout=10) as response:
+            alerts = json.load(response)["alerts"]
+    except OSError as e:
+        typer.echo(f"Could not read the alert feed at {url}: {e}")
+        return
+    # Clustering keeps dense areas readable at low zoom levels
+    cluster = MarkerCluster(name="Current alerts").add_to(m)
+    plotted = 0
+    for alert in alerts:
+        if alert["lat"] is None or alert["lon"] is None:
+            continue
+        label = " ".join(part for part in (alert["type"], alert["subtype"]) if part)
+        folium.Marker(
+            [alert["lat"], alert["lon"]],
+            popup=f"{label} on {alert['street'] or 'Unknown location'} "
+            f"in {alert['city'] or 'Unknown city'}",
+            icon=folium.Icon(color="orange", icon="exclamation-sign"),
+        ).add_to(cluster)
+        plotted += 1
+    typer.echo(f"Plotted {plotted} current alerts from {url}")
+
+
+@app.command()
+def stats(
+    last: int = typer.Option(
+        100, "--last", "-n", help="Most recent cycles to summarize"
+    ),
+    trace_file: Optional[str] = typer.Option(
+        None, "--file", help="Trace to read (default: TRACE_FILE or poll_trace.jsonl)"
+    ),
+):
+    """Show p50/p95/p99 per stage over the last traced poll cycles"""
+    path = Path(trace_file) if trace_file else tracer.path
+    if not path.exists():
+        typer.echo(f"No trace at {path}; run monitor or check-once with --trace")
+        raise typer.Exit(1)
+    records = tracing.read_trace(path, last)
+    kinds = [record["type"] for record in records]
+    typer.echo(
+        f"{path}: {kinds.count('cycle')} cycles, {kinds.count('batch')} "
+        f"coordinator batches, {kinds.count('delivery')} deliveries"
+    )
+    # span: wall time of a cycle phase; busy: summed time of concurrent calls
+    typer.echo(
+        f"{'stage':<22} {'count':>6}"
+        + "".join(f" {f'p{q} ms':>9}" for q in tracing.PERCENTILES)
+        + f" {'max ms':>9}"
+    )
+    for stage, values in tracing.summarize(records).items():
+        typer.echo(
+            f"{stage:<22} {len(values):>6}"
+            + "".join(
+                f" {tracing.percentile(values, q) * 1000:>9.1f}"
+                for q in tracing.PERCENTILES
+            )
+            + f" {max(values) * 1000:>9.1f}"
+        )
+
+
 @app.command()
 def cache_stats():
     """Show alert cache statistics"""
@@ -402,27 +1729,45 @@ def cache_stats():
     typer.echo(f"Alert Cache Statistics:")
     typer.echo(f"  Total cached alerts: {stats['total_alerts']}")
     typer.echo(f"  Cache duration: {stats['cache_duration_hours']} hours")
+    typer.echo(f"  Max entries: {stats['max_entries'] or 'unlimited'}")
+    typer.echo(f"  Cache backend: {stats['backend']}")
     typer.echo(f"  Cache file: {alert_cache.cache_file}")
 
     if alert_cache.cache_file.exists():
-        file_size = alert_cache.cache_file.stat().st_size
+        file_size = alert_cache.backend.size_bytes()
         typer.echo(f"  Cache file size: {file_size} bytes")
     else:
         typer.echo(f"  Cache file: Does not exist yet")
 
+    geo_stats = geocode_cache.get_stats()
+    typer.echo(f"Geocode Cache Statistics:")
+    typer.echo(f"  Cached locations: {geo_stats['total_locations']}")
+    typer.echo(f"  Hits: {geo_stats['hits']}  Misses: {geo_stats['misses']}")
+    typer.echo(f"  Hit ratio: {geo_stats['hit_ratio']:.1%}")
+    typer.echo(f"  Match radius: {geo_stats['radius_meters']} meters")
+    typer.echo(f"  Entry lifetime: {geo_stats['ttl_hours']} hours")
+    typer.echo(f"  Cache file: {geocode_cache.cache_file}")
+
+    history_stats = alert_history.stats()
+    typer.echo("Alert History:")
+    typer.echo(f"  Archived alerts: {history_stats['alerts']}")
+    typer.echo(f"  History file: {alert_history.path}")
+    typer.echo(f"  History file size: {history_stats['size_bytes']} bytes")
+
 
 @app.command()
 def clear_cache():
     """Clear the alert cache"""
     try:
-        if alert_cache.cache_file.exists():
-            alert_cache.cache_file.unlink()
+        had_file = alert_cache.cache_file.exists()
+
+        # Reset the on-disk and in-memory cache
+        alert_cache.clear()
+
+        if had_file:
             typer.echo("✅ Cache file deleted successfully")
         else:
             typer.echo("ℹ️  No cache file found")
-
-        # Reset the in-memory cache
-        alert_cache.seen_alerts = {}
         typer.echo("✅ In-memory cache cleared")
 
     except Exception as e:
@@ -443,5 +1788,133 @@ def cleanup_cache():
     typer.echo(f"  Remaining alerts: {after_count}")
 
 
+@app.command("outbox")
+def outbox_status(
+    show_dead: bool = typer.Option(
+        False, "--show-dead", help="List the most recent dead-lettered notifications"
+    ),
+    retry_dead: bool = typer.Option(
+        False, "--retry-dead", help="Queue every dead-lettered notification again"
+    ),
+    purge_dead: bool = typer.Option(
+        False, "--purge-dead", help="Delete every dead-lettered notification"
+    ),
+):
+    """Show the notification outbox and manage its dead letters"""
+    # A missing outbox has nothing to manage; opening it would create the file
+    exists = outbox.path.exists()
+    if retry_dead and exists:
+        typer.echo(f"Requeued {outbox.retry_dead()} dead-lettered notifications")
+    if purge_dead and exists:
+        typer.echo(f"Deleted {outbox.purge_dead()} dead-lettered notifications")
+
+    stats = outbox_stats()
+    typer.echo(f"Outbox: {outbox.path}" + ("" if exists else " (does not exist yet)"))
+    typer.echo(f"Pending notifications: {stats['pending']}")
+    typer.echo(f"Dead-lettered notifications: {stats['dead']}")
+
+    if show_dead and exists:
+        for item_id, channel, target, message, error in outbox.dead_letters():
+            typer.echo(f"  #{item_id} {channel} {target[:40]}: {message} ({error})")
+
+
+@app.command()
+def query(
+    alert_types: Optional[str] = typer.Option(
+        None, "--types", help="Comma-separated alert types (default: all)"
+    ),
+    top: Optional[float] = typer.Option(None, "--top", "-t", help="Top latitude bound"),
+    bottom: Optional[float] = typer.Option(
+        None, "--bottom", "-b", help="Bottom latitude bound"
+    ),
+    left: Optional[float] = typer.Option(
+        None, "--left", "-l", help="Left longitude bound"
+    ),
+    right: Optional[float] = typer.Option(
+        None, "--right", "-r", help="Right longitude bound"
+    ),
+    since: Optional[str] = typer.Option(
+        None, "--since", help="Reported at or after (ISO time or span like 24h, 7d)"
+    ),
+    until: Optional[str] = typer.Option(
+        None, "--until", help="Reported at or before (ISO time or span like 1h)"
+    ),
+    limit: int = typer.Option(50, "--limit", "-n", help="Most alerts to list"),
+):
+    """List archived alerts in an area and time window"""
+    start = time.perf_counter()
+    count = 0
+    for row in history_rows(alert_types, top, bottom, left, right, since, until, limit):
+        record = dict(zip(COLUMNS, row))
+        reported = (
+            datetime.fromtimestamp(record["pub_millis"] / 1000).isoformat(
+                sep=" ", timespec="seconds"
+            )
+            if record["pub_millis"]
+            else "unknown time"
+        )
+        kind = "/".join(filter(None, (record["type"], record["subtype"])))
+        typer.echo(
+            f"{reported}  {kind}  {record['lat']:.5f}, {record['lon']:.5f}  "
+            f"{record['street'] or 'Unknown street'}, {record['city'] or 'Unknown city'}"
+        )
+        count += 1
+    elapsed = (time.perf_counter() - start) * 1000
+    typer.echo(f"{count} alerts in {elapsed:.1f} ms")
+
+
+@app.command()
+def export(
+    output: Optional[Path] = typer.Option(
+        None, "--output", "-o", help="File to write (default: stdout)"
+    ),
+    output_format: str = typer.Option("csv", "--format", help="csv or jsonl"),
+    alert_types: Optional[str] = typer.Option(
+        None, "--types", help="Comma-separated alert types (default: all)"
+    ),
+    top: Optional[float] = typer.Option(None, "--top", "-t", help="Top latitude bound"),
+    bottom: Optional[float] = typer.Option(
+        None, "--bottom", "-b", help="Bottom latitude bound"
+    ),
+    left: Optional[float] = typer.Option(
+        None, "--left", "-l", help="Left longitude bound"
+    ),
+    right: Optional[float] = typer.Option(
+        None, "--right", "-r", help="Right longitude bound"
+    ),
+    since: Optional[str] = typer.Option(
+        None, "--since", help="Reported at or after (ISO time or span like 24h, 7d)"
+    ),
+    until: Optional[str] = typer.Option(
+        None, "--until", help="Reported at or before (ISO time or span like 1h)"
+    ),
+):
+    """Stream archived alerts in an area and time window to CSV or JSON Lines"""
+    import csv
+    import sys
+
+    if output_format not in ("csv", "jsonl"):
+        raise typer.BadParameter("--format must be csv or jsonl")
+    rows = history_rows(alert_types, top, bottom, left, right, since, until)
+    f = open(output, "w", newline="") if output else sys.stdout
+    count = 0
+    try:
+        if output_format == "csv":
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in rows:
+                f.write(json.dumps(dict(zip(COLUMNS, row))) + "\n")
+                count += 1
+    finally:
+        if output:
+            f.close()
+    if output:
+        typer.echo(f"Exported {count} alerts to {output}")
+
+
 if __name__ == "__main__":
     app()
@@ -0,0 +1,233 @@
+import os
+import time
+import logging
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+LabelValues = Tuple[str, ...]
+
+# Seconds; covers cache hits through slow upstream requests
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Metric:
+    """Base class for metrics rendered in the Prometheus text format"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing count, optionally split by labels"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+            for key, value in sorted(self.values.items())
+        ]
+
+
+class Histogram(Metric):
+    """Distribution of observed durations in cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts incl. +Inf, sum)
+        self.values: Dict[LabelValues, Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        counts, total = self.values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+        counts[bisect_left(self.buckets, value)] += 1
+        self.values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[str]:
+        lines = []
+        names = self.labelnames + ("le",)
+        for key, (counts, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                labels = _format_labels(names, key + (le,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class CallbackMetric(Metric):
+    """Gauge or counter whose value is read from the application at scrape time
+
+    The callback returns either a number or a dict of label values to numbers.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        callback: Callable[[], Union[float, Dict[LabelValues, float]]],
+        kind: str = "gauge",
+        labelnames: Sequence[str] = (),
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.callback = callback
+        self.kind = kind
+
+    def samples(self) -> List[str]:
+        try:
+            value = self.callback()
+        except Exception as e:
+            logger.debug(f"Metric {self.name} unavailable: {e}")
+            return []
+        if not isinstance(value, dict):
+            value = {(): value}
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {number}"
+            for key, number in sorted(value.items())
+        ]
+
+
+class Registry:
+    """Collection of metrics rendered together on each scrape"""
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames=()) -> Counter:
+        return self.register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames=()) -> Histogram:
+        return self.register(Histogram(name, help_text, labelnames))
+
+    def callback(self, name: str, help_text: str, callback, **kwargs):
+        return self.register(CallbackMetric(name, help_text, callback, **kwargs))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self.metrics.values()) + "\n"
+
+
+registry = Registry()
+
+# Latency of each stage of a poll cycle
+POLL_SECONDS = registry.histogram(
+    "waze_poll_seconds", "Duration of a whole poll cycle of a region group"
+)
+FETCH_SECONDS = registry.histogram(
+    "waze_fetch_seconds", "Duration of one Waze tile request, including parsing"
+)
+PARSE_SECONDS = registry.histogram(
+    "waze_parse_seconds",
+    "Duration of parsing one Waze tile response (streamed bodies include the download)",
+)
+GEOCODE_SECONDS = registry.histogram(
+    "waze_geocode_seconds", "Duration of reverse geocoding one alert", ("source",)
+)
+NOTIFY_SECONDS = registry.histogram(
+    "waze_notification_seconds",
+    "Duration of one send (a message or digest) to one target",
+    ("channel",),
+)
+
+# Counts
+ALERTS = registry.counter(
+    "waze_alerts_total",
+    "Watched alerts by type and dedupe outcome",
+    ("type", "outcome"),
+)
+UPSTREAM_RESPONSES = registry.counter(
+    "waze_upstream_responses_total",
+    "Upstream HTTP responses by service and status (status=error for no response)",
+    ("upstream", "status"),
+)
+NOTIFICATIONS = registry.counter(
+    "waze_notifications_total",
+    "Sends to notification targets; a digest counts once",
+    ("channel", "outcome"),
+)
+
+
+async def start_metrics_server(port: int, host: Optional[str] = None):
+    """Serve /metrics from the running event loop; returns the aiohttp runner"""
+    # Imported here so the metric definitions stay cheap to import
+    from aiohttp import web
+
+    host = host or os.getenv("METRICS_HOST", "127.0.0.1")
+
+    async def handle(request):
+        return web.Response(
+            text=registry.render(), content_type="text/plain", charset="utf-8"
+        )
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return runner
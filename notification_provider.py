@@ -1,16 +1,136 @@
 import os
 import aiohttp
+import asyncio
 import logging
-from typing import List, Optional
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from polling import parse_retry_after
+from session_manager import SessionManager, session_for
 
 logger = logging.getLogger(__name__)
 
+# Discord accepts at most 10 embeds per webhook message; Pushover messages
+# are capped at 1024 characters
+DISCORD_MAX_EMBEDS = 10
+PUSHOVER_MAX_MESSAGE = 1024
+
+# (channel, target) a digest is delivered to
+Target = Tuple[str, str]
+
+# Label of notifications queued without one, e.g. test messages
+DEFAULT_LABEL = "Waze alert"
+
+
+def alert_title(label: str) -> str:
+    """Notification title for one alert, e.g. 'Police Alert Nearby'"""
+    return f"{label.title()} Nearby"
+
+
+def digest_title(labels: List[str]) -> str:
+    """Title of a digest, e.g. '3 Police Alerts Nearby' or '4 Waze Alerts Nearby'"""
+    if len(labels) == 1:
+        return alert_title(labels[0])
+    label = labels[0] if len(set(labels)) == 1 else DEFAULT_LABEL
+    return f"{len(labels)} {label.title()}s Nearby"
+
+
+@dataclass
+class DeliveryResult:
+    """Outcome of sending one notification to one target"""
+
+    channel: str
+    target: str
+    success: bool
+    status: Optional[int] = None
+    latency: float = 0.0
+    error: Optional[str] = None
+    # Seconds the target asked us to wait before the next send, if any
+    retry_after: Optional[float] = None
+
+    @classmethod
+    def finished(
+        cls,
+        channel: str,
+        target: str,
+        start: float,
+        status: Optional[int],
+        error: Optional[str] = None,
+        retry_after: Optional[float] = None,
+    ) -> "DeliveryResult":
+        """Build a result timed from ``start`` (a time.perf_counter() value)"""
+        return cls(
+            channel=channel,
+            target=target,
+            success=error is None,
+            status=status,
+            latency=time.perf_counter() - start,
+            error=error,
+            retry_after=retry_after,
+        )
+
+
+@dataclass
+class DeliveryReport:
+    """Per-target delivery results for one notification"""
+
+    message: str
+    results: List[DeliveryResult] = field(default_factory=list)
+
+    @property
+    def delivered(self) -> List[DeliveryResult]:
+        return [result for result in self.results if result.success]
+
+    @property
+    def failed(self) -> List[DeliveryResult]:
+        return [result for result in self.results if not result.success]
+
+
+@dataclass
+class _Digest:
+    """Messages waiting to be sent to one target as a single notification"""
+
+    messages: List[str] = field(default_factory=list)
+    # Alert label of each message, e.g. "Police alert", for the titles
+    labels: List[str] = field(default_factory=list)
+    futures: List[asyncio.Future] = field(default_factory=list)
+    timer: Optional[asyncio.TimerHandle] = None
+
+
+def discord_rate_limit(response) -> Optional[float]:
+    """Seconds until a Discord webhook's rate-limit bucket refills, if exhausted"""
+    if response.headers.get("X-RateLimit-Remaining") == "0":
+        reset_after = response.headers.get("X-RateLimit-Reset-After")
+        try:
+            return float(reset_after) if reset_after else None
+        except ValueError:
+            return None
+    return None
+
 
 class NotificationProvider:
-    """Handles sending notifications to users via Pushover and Discord webhooks"""
+    """Handles sending notifications to users via Pushover and Discord webhooks
+
+    Notifications to the same target that arrive within the coalescing window
+    are merged into one digest: one Pushover message listing every alert, or
+    one Discord message with up to 10 embeds. Targets that report a rate limit
+    are paused and their digests queued until the limit resets.
+    """
+
+    def __init__(
+        self,
+        session_manager: Optional[SessionManager] = None,
+        on_send: Optional[Callable[[DeliveryResult], None]] = None,
+    ):
+        # Pooled HTTP sessions, injected by the monitor loop when available
+        self.session_manager = session_manager
+        # Called once per HTTP send, however many messages its digest carries
+        self.on_send = on_send
 
-    def __init__(self):
         # Pushover configuration
+        self.pushover_url = os.getenv(
+            "PUSHOVER_API_URL", "https://api.pushover.net/1/messages.json"
+        )
         self.pushover_api_key = os.getenv("PUSHOVER_API_KEY")
         self.pushover_user_keys = (
             os.getenv("PUSHOVER_USER_KEYS").split(",")
@@ -25,74 +145,299 @@ class NotificationProvider:
             else []
         )
 
-    async def notify_all_users(self, message: str):
-        """Send notification to all configured users via all available channels"""
-        # Send via Pushover
-        for user_key in self.pushover_user_keys:
-            await self.send_pushover_notification(message, user_key)
+        # Fan-out limits: concurrent sends per channel and per-request timeout
+        self.request_timeout = float(os.getenv("NOTIFICATION_TIMEOUT", "10"))
+        self._pushover_semaphore = asyncio.Semaphore(
+            int(os.getenv("PUSHOVER_CONCURRENCY", "4"))
+        )
+        self._discord_semaphore = asyncio.Semaphore(
+            int(os.getenv("DISCORD_CONCURRENCY", "4"))
+        )
+
+        # Coalescing: seconds to hold a target's first message for more to
+        # join it (0 sends every message on its own), and digest size limit
+        self.coalesce_window = float(os.getenv("NOTIFICATION_COALESCE_WINDOW", "5"))
+        self.max_digest = min(
+            DISCORD_MAX_EMBEDS, int(os.getenv("NOTIFICATION_MAX_DIGEST", "10"))
+        )
+        self.max_rate_limit_retries = int(
+            os.getenv("NOTIFICATION_RATE_LIMIT_RETRIES", "5")
+        )
+        self._digests: Dict[Target, _Digest] = {}
+        self._not_before: Dict[Target, float] = {}
+        self._sending: Set[asyncio.Task] = set()
+
+    async def notify_all_users(
+        self,
+        message: str,
+        pushover_user_keys: Optional[List[str]] = None,
+        discord_webhook_urls: Optional[List[str]] = None,
+    ) -> "DeliveryReport":
+        """Send notification to all configured users via all available channels
+
+        Every target is sent to concurrently (capped per channel) with its own
+        timeout, so one slow or broken target cannot delay the others. Explicit
+        target lists override the configured ones, e.g. for per-region routing.
+        """
+        return await self.enqueue(message, pushover_user_keys, discord_webhook_urls)
+
+    def enqueue(
+        self,
+        message: str,
+        pushover_user_keys: Optional[List[str]] = None,
+        discord_webhook_urls: Optional[List[str]] = None,
+    ) -> asyncio.Future:
+        """Queue a notification without waiting for it to be delivered
+
+        Returns a future for its DeliveryReport; ``drain`` sends everything
+        still queued.
+        """
+        targets = self.resolve_targets(pushover_user_keys, discord_webhook_urls)
+        pending = [self.queue_for_target(target, message) for target in targets]
+
+        async def report() -> DeliveryReport:
+            report = DeliveryReport(
+                message=message, results=list(await asyncio.gather(*pending))
+            )
+            if report.results:
+                logger.info(
+                    f"Delivered to {len(report.delivered)}/{len(report.results)} targets"
+                )
+            return report
 
-        # Send via Discord webhooks
-        for webhook_url in self.discord_webhook_urls:
-            await self.send_discord_notification(message, webhook_url)
+        task = asyncio.ensure_future(report())
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+        return task
 
-    async def send_pushover_notification(self, message: str, user_key: str):
+    def resolve_targets(
+        self,
+        pushover_user_keys: Optional[List[str]] = None,
+        discord_webhook_urls: Optional[List[str]] = None,
+    ) -> List[Target]:
+        """(channel, target) pairs to send to, defaulting to the configured ones"""
+        if pushover_user_keys is None:
+            pushover_user_keys = self.pushover_user_keys
+        if discord_webhook_urls is None:
+            discord_webhook_urls = self.discord_webhook_urls
+        return [("pushover", key) for key in pushover_user_keys] + [
+            ("discord", url) for url in discord_webhook_urls
+        ]
+
+    def queue_for_target(
+        self, target: Target, message: str, label: Optional[str] = None
+    ) -> asyncio.Future:
+        """Add a message to the target's pending digest"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        digest = self._digests.get(target)
+        if digest is None:
+            digest = self._digests[target] = _Digest()
+            if self.coalesce_window > 0:
+                digest.timer = loop.call_later(
+                    self.coalesce_window, self._flush_target, target
+                )
+        digest.messages.append(message)
+        digest.labels.append(label or DEFAULT_LABEL)
+        digest.futures.append(future)
+        if self.coalesce_window <= 0 or len(digest.messages) >= self.max_digest:
+            self._flush_target(target)
+        return future
+
+    def _flush_target(self, target: Target):
+        """Start delivering the target's pending digest"""
+        digest = self._digests.pop(target, None)
+        if digest is None:
+            return
+        if digest.timer is not None:
+            digest.timer.cancel()
+        task = asyncio.ensure_future(self._deliver(target, digest))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def drain(self):
+        """Send every pending digest now and wait until all sends finish"""
+        for target in list(self._digests):
+            self._flush_target(target)
+        while self._sending:
+            await asyncio.gather(*list(self._sending), return_exceptions=True)
+
+    async def _deliver(self, target: Target, digest: _Digest):
+        """Send one digest, waiting out and retrying the target's rate limits"""
+        channel, destination = target
+        for attempt in range(self.max_rate_limit_retries + 1):
+            wait = self._not_before.get(target, 0) - time.monotonic()
+            if wait > 0:
+                logger.info(f"{channel} target rate limited, waiting {wait:.1f}s")
+                await asyncio.sleep(wait)
+
+            if channel == "pushover":
+                result = await self.send_pushover_digest(
+                    digest.messages, destination, digest.labels
+                )
+            else:
+                result = await self.send_discord_digest(
+                    digest.messages, destination, digest.labels
+                )
+            if self.on_send is not None:
+                # A failing hook must not leave the digest's futures unresolved
+                try:
+                    self.on_send(result)
+                except Exception as e:
+                    logger.error(f"Failed to record {channel} delivery: {e!r}")
+
+            if result.retry_after:
+                self._not_before[target] = time.monotonic() + result.retry_after
+            elif result.status == 429:
+                # Rate limited without a hint; back off exponentially
+                self._not_before[target] = time.monotonic() + 2**attempt
+            if result.status != 429:
+                break
+
+        for future in digest.futures:
+            if not future.done():
+                future.set_result(result)
+
+    def _request_timeout(self) -> aiohttp.ClientTimeout:
+        return aiohttp.ClientTimeout(total=self.request_timeout)
+
+    async def send_pushover_notification(
+        self, message: str, user_key: str, label: str = DEFAULT_LABEL
+    ) -> "DeliveryResult":
         """Send a notification to a specific user via Pushover"""
+        return await self.send_pushover_digest([message], user_key, [label])
+
+    async def send_pushover_digest(
+        self,
+        messages: List[str],
+        user_key: str,
+        labels: Optional[List[str]] = None,
+    ) -> "DeliveryResult":
+        """Send one or more alerts to a specific user as a single Pushover message"""
         logger.info(f"Pushover ({user_key}) Sending notification")
+        start = time.perf_counter()
+        status = None
+        title = digest_title(labels or [DEFAULT_LABEL] * len(messages))
+        if len(messages) == 1:
+            message = messages[0]
+        else:
+            message = "\n".join(f"• {m}" for m in messages)
+        if len(message) > PUSHOVER_MAX_MESSAGE:
+            message = message[: PUSHOVER_MAX_MESSAGE - 1] + "…"
         try:
-            pushover_url = "https://api.pushover.net/1/messages.json"
+            pushover_url = self.pushover_url
             data = {
                 "token": self.pushover_api_key,
                 "user": user_key,
                 "message": message,
-                "title": "Police Alert Nearby",
+                "title": title,
             }
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(pushover_url, data=data) as response:
-                    if response.status == 200:
-                        logger.info(
-                            f"Pushover ({user_key}) Notification sent: {message}"
-                        )
-                    else:
-                        error_text = await response.text()
-                        logger.error(
-                            f"Pushover ({user_key}) Failed to send notification: HTTP {response.status} - {error_text}"
-                        )
+            async with self._pushover_semaphore:
+                async with session_for(pushover_url, self.session_manager) as session:
+                    async with session.post(
+                        pushover_url, data=data, timeout=self._request_timeout()
+                    ) as response:
+                        status = response.status
+                        if response.status == 200:
+                            logger.info(
+                                f"Pushover ({user_key}) Notification sent: {message}"
+                            )
+                            return DeliveryResult.finished(
+                                "pushover", user_key, start, status
+                            )
+                        else:
+                            error_text = await response.text()
+                            logger.error(
+                                f"Pushover ({user_key}) Failed to send notification: HTTP {response.status} - {error_text}"
+                            )
+                            return DeliveryResult.finished(
+                                "pushover",
+                                user_key,
+                                start,
+                                status,
+                                f"HTTP {response.status} - {error_text}",
+                                parse_retry_after(response.headers.get("Retry-After")),
+                            )
 
         except Exception as e:
-            logger.error(f"Pushover ({user_key}) Failed to send notification: {e}")
+            logger.error(f"Pushover ({user_key}) Failed to send notification: {e!r}")
+            return DeliveryResult.finished("pushover", user_key, start, status, repr(e))
 
-    async def send_discord_notification(self, message: str, webhook_url: str):
+    async def send_discord_notification(
+        self, message: str, webhook_url: str, label: str = DEFAULT_LABEL
+    ) -> "DeliveryResult":
         """Send a notification via Discord webhook"""
+        return await self.send_discord_digest([message], webhook_url, [label])
+
+    async def send_discord_digest(
+        self,
+        messages: List[str],
+        webhook_url: str,
+        labels: Optional[List[str]] = None,
+    ) -> "DeliveryResult":
+        """Send up to 10 alerts as the embeds of a single Discord webhook message"""
         logger.info(f"Discord webhook sending notification")
+        start = time.perf_counter()
+        status = None
+        labels = labels or [DEFAULT_LABEL] * len(messages)
         try:
-            # Create Discord embed for better formatting
-            embed = {
-                "title": "🚨 Police Alert Nearby",
-                "description": message,
-                "color": 0xFF0000,  # Red color
-                "timestamp": None,  # Will be set by Discord
-                "footer": {"text": "Waze Pinger Alert System"},
-            }
+            # Create Discord embeds for better formatting
+            embeds = [
+                {
+                    "title": f"🚨 {alert_title(label)}",
+                    "description": message,
+                    "color": 0xFF0000,  # Red color
+                    "timestamp": None,  # Will be set by Discord
+                    "footer": {"text": "Waze Pinger Alert System"},
+                }
+                for message, label in zip(
+                    messages[:DISCORD_MAX_EMBEDS], labels[:DISCORD_MAX_EMBEDS]
+                )
+            ]
 
             payload = {
-                "embeds": [embed],
+                "embeds": embeds,
                 "username": "Waze Pinger",
                 "avatar_url": "https://cdn-icons-png.flaticon.com/512/124/124010.png",  # Waze-like icon
             }
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(webhook_url, json=payload) as response:
-                    if response.status in [200, 204]:
-                        logger.info(f"Discord webhook notification sent: {message}")
-                    else:
-                        error_text = await response.text()
-                        logger.error(
-                            f"Discord webhook failed to send notification: HTTP {response.status} - {error_text}"
-                        )
+            async with self._discord_semaphore:
+                async with session_for(webhook_url, self.session_manager) as session:
+                    async with session.post(
+                        webhook_url, json=payload, timeout=self._request_timeout()
+                    ) as response:
+                        status = response.status
+                        if response.status in [200, 204]:
+                            logger.info(
+                                f"Discord webhook notification sent: {len(embeds)} alert(s)"
+                            )
+                            return DeliveryResult.finished(
+                                "discord",
+                                webhook_url,
+                                start,
+                                status,
+                                retry_after=discord_rate_limit(response),
+                            )
+                        else:
+                            error_text = await response.text()
+                            logger.error(
+                                f"Discord webhook failed to send notification: HTTP {response.status} - {error_text}"
+                            )
+                            return DeliveryResult.finished(
+                                "discord",
+                                webhook_url,
+                                start,
+                                status,
+                                f"HTTP {response.status} - {error_text}",
+                                parse_retry_after(response.headers.get("Retry-After")),
+                            )
 
         except Exception as e:
-            logger.error(f"Discord webhook failed to send notification: {e}")
+            logger.error(f"Discord webhook failed to send notification: {e!r}")
+            return DeliveryResult.finished(
+                "discord", webhook_url, start, status, repr(e)
+            )
 
     def get_configured_users(self) -> List[str]:
         """Get list of configured Pushover user keys"""
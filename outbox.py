@@ -0,0 +1,269 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    # Type-only, so inspecting the outbox does not import aiohttp; sqlite3 is
+    # imported when the outbox is first opened
+    import sqlite3
+
+    from notification_provider import DeliveryResult, NotificationProvider, Target
+
+logger = logging.getLogger(__name__)
+
+# Client errors that retrying cannot fix, e.g. an invalid user key or a deleted
+# webhook; 408 and 429 are transient
+PERMANENT_STATUSES = set(range(400, 500)) - {408, 429}
+
+
+class Outbox:
+    """Durable queue of notifications between alert detection and delivery
+
+    Every (message, target) pair is written to SQLite before anything is sent
+    and only deleted once delivered, so pending notifications survive crashes
+    and upstream outages and are resumed on restart. At most ``buffer_size``
+    items are handed to the NotificationProvider at once; the rest wait on
+    disk. Failed sends are retried with jittered exponential backoff per
+    target and dead-lettered after ``max_attempts`` or a permanent error.
+    """
+
+    def __init__(
+        self,
+        provider: "NotificationProvider",
+        path: str = None,
+        buffer_size: int = None,
+        max_attempts: int = None,
+        retry_delay: float = None,
+        max_delay: float = None,
+        on_result: Optional[Callable[["DeliveryResult"], None]] = None,
+    ):
+        self.provider = provider
+        self.path = Path(path or os.getenv("OUTBOX_FILE", "notification_outbox.db"))
+        self.buffer_size = buffer_size or int(os.getenv("OUTBOX_BUFFER", "100"))
+        self.max_attempts = max_attempts or int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+        self.retry_delay = retry_delay or float(os.getenv("OUTBOX_RETRY_DELAY", "30"))
+        self.max_delay = max_delay or float(os.getenv("OUTBOX_MAX_DELAY", "3600"))
+        self.on_result = on_result
+        self._conn = None
+        # Item ids handed to the provider and not yet settled
+        self._in_flight: Set[int] = set()
+        self._wake: Optional[asyncio.Event] = None
+
+    def _connection(self) -> "sqlite3.Connection":
+        if self._conn is None:
+            import sqlite3
+
+            self._conn = sqlite3.connect(self.path)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                "id INTEGER PRIMARY KEY, channel TEXT NOT NULL, target TEXT NOT NULL, "
+                "message TEXT NOT NULL, created_at REAL NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, next_attempt REAL NOT NULL, "
+                "dead INTEGER NOT NULL DEFAULT 0, last_error TEXT)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS outbox_due ON outbox (dead, next_attempt)"
+            )
+            # Outboxes written before alert labels were stored lack the column
+            columns = {
+                row[1] for row in self._conn.execute("PRAGMA table_info(outbox)")
+            }
+            if "label" not in columns:
+                with self._conn:
+                    self._conn.execute("ALTER TABLE outbox ADD COLUMN label TEXT")
+        return self._conn
+
+    def put(self, message: str, targets: List["Target"], label: Optional[str] = None):
+        """Persist a notification for each target and start delivering it
+
+        ``label`` names the alert type, e.g. "Police alert", for the title.
+        """
+        if not targets:
+            return
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT INTO outbox "
+                "(channel, target, message, label, created_at, next_attempt) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (channel, target, message, label, now, now)
+                    for channel, target in targets
+                ),
+            )
+        self.pump()
+
+    def pump(self) -> int:
+        """Hand due items to the provider while the in-memory buffer has room"""
+        room = self.buffer_size - len(self._in_flight)
+        if room <= 0:
+            return 0
+        rows = self._connection().execute(
+            "SELECT id, channel, target, message, label FROM outbox "
+            "WHERE dead = 0 AND next_attempt <= ? ORDER BY id LIMIT ?",
+            (time.time(), room + len(self._in_flight)),
+        )
+        started = 0
+        for item_id, channel, target, message, label in rows.fetchall():
+            if item_id in self._in_flight or started >= room:
+                continue
+            self._in_flight.add(item_id)
+            future = self.provider.queue_for_target((channel, target), message, label)
+            future.add_done_callback(partial(self._finished, item_id, channel, target))
+            started += 1
+        return started
+
+    def _finished(self, item_id: int, channel: str, target: str, future):
+        """Settle an item from its delivery future, even one that never resolved"""
+        if future.cancelled():
+            # Not attempted; the item is due again as it is
+            logger.warning(f"Delivery of {channel} notification {item_id} cancelled")
+            self._in_flight.discard(item_id)
+            if self._wake is not None:
+                self._wake.set()
+            return
+        error = future.exception()
+        if error is None:
+            self._settle(item_id, future.result())
+            return
+        from notification_provider import DeliveryResult
+
+        self._settle(
+            item_id, DeliveryResult(channel, target, success=False, error=repr(error))
+        )
+
+    def _settle(self, item_id: int, result: "DeliveryResult"):
+        """Delete a delivered item, or schedule its retry or dead-letter it"""
+        self._in_flight.discard(item_id)
+        if self.on_result is not None:
+            self.on_result(result)
+        conn = self._connection()
+        with conn:
+            if result.success:
+                conn.execute("DELETE FROM outbox WHERE id = ?", (item_id,))
+            else:
+                row = conn.execute(
+                    "SELECT attempts FROM outbox WHERE id = ?", (item_id,)
+                ).fetchone()
+                attempts = (row[0] if row else 0) + 1
+                if attempts >= self.max_attempts or result.status in PERMANENT_STATUSES:
+                    logger.error(
+                        f"Dead-lettering {result.channel} notification {item_id} "
+                        f"after {attempts} attempts: {result.error}"
+                    )
+                    conn.execute(
+                        "UPDATE outbox SET attempts = ?, dead = 1, last_error = ? "
+                        "WHERE id = ?",
+                        (attempts, result.error, item_id),
+                    )
+                else:
+                    backoff = min(
+                        self.max_delay, self.retry_delay * 2 ** (attempts - 1)
+                    )
+                    delay = max(
+                        random.uniform(backoff / 2, backoff), result.retry_after or 0
+                    )
+                    logger.warning(
+                        f"Retrying {result.channel} notification {item_id} "
+                        f"in {delay:.0f}s (attempt {attempts})"
+                    )
+                    conn.execute(
+                        "UPDATE outbox SET attempts = ?, next_attempt = ?, last_error = ? "
+                        "WHERE id = ?",
+                        (attempts, time.time() + delay, result.error, item_id),
+                    )
+        if self._wake is not None:
+            self._wake.set()
+
+    def _seconds_until_due(self) -> Optional[float]:
+        """Seconds until an item not already in flight is due; None if none is"""
+        if len(self._in_flight) >= self.buffer_size:
+            return None
+        in_flight = ",".join(str(item_id) for item_id in self._in_flight)
+        row = (
+            self._connection()
+            .execute(
+                "SELECT MIN(next_attempt) FROM outbox "
+                f"WHERE dead = 0 AND id NOT IN ({in_flight})"
+            )
+            .fetchone()
+        )
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+    async def run(self, idle_poll: float = 60):
+        """Deliver pending items forever, including those left by a previous run"""
+        self._wake = asyncio.Event()
+        pending = self.stats()["pending"]
+        if pending:
+            logger.info(f"Resuming {pending} pending notifications from the outbox")
+        while True:
+            self._wake.clear()
+            self.pump()
+            wait = self._seconds_until_due()
+            wait = idle_poll if wait is None else min(wait, idle_poll)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(wait, 0.05))
+            except asyncio.TimeoutError:
+                pass
+
+    async def drain(self):
+        """Deliver everything due now and wait for it; retries stay queued"""
+        while True:
+            self.pump()
+            if not self._in_flight:
+                return
+            await self.provider.drain()
+            # Let the settle callbacks of finished sends run
+            await asyncio.sleep(0)
+
+    def stats(self) -> Dict[str, int]:
+        pending, dead = (
+            self._connection()
+            .execute(
+                "SELECT COALESCE(SUM(dead = 0), 0), COALESCE(SUM(dead = 1), 0) FROM outbox"
+            )
+            .fetchone()
+        )
+        return {"pending": pending, "dead": dead, "in_flight": len(self._in_flight)}
+
+    def dead_letters(self, limit: int = 20) -> List[Tuple]:
+        """Most recent dead-lettered items: (id, channel, target, message, error)"""
+        rows = self._connection().execute(
+            "SELECT id, channel, target, message, last_error FROM outbox "
+            "WHERE dead = 1 ORDER BY id DESC LIMIT ?",
+            (limit,),
+        )
+        return rows.fetchall()
+
+    def retry_dead(self) -> int:
+        """Move every dead-lettered item back to pending"""
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                "UPDATE outbox SET dead = 0, attempts = 0, next_attempt = ? "
+                "WHERE dead = 1",
+                (time.time(),),
+            )
+        return cursor.rowcount
+
+    def purge_dead(self) -> int:
+        """Delete every dead-lettered item"""
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute("DELETE FROM outbox WHERE dead = 1")
+        return cursor.rowcount
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
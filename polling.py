@@ -0,0 +1,112 @@
+import os
+import random
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamError(Exception):
+    """A Waze request failed; status is None for network errors"""
+
+    def __init__(
+        self,
+        message: str,
+        status: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def rate_limited(self) -> bool:
+        return self.status == 429
+
+
+@dataclass
+class PollResult:
+    """Outcome of one successful poll, used to adapt the polling interval"""
+
+    new_alerts: int = 0
+    # Set when some requests were rate limited even though the poll succeeded
+    retry_after: Optional[float] = None
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class AdaptiveInterval:
+    """Polling interval of one region, adapted to alert activity and errors
+
+    New alerts shrink the interval (never above the configured base) and quiet
+    polls grow it, both clamped to [min_interval, max_interval]. Failed polls
+    back off exponentially with jitter from error_delay up to max_backoff,
+    and a Retry-After from upstream is always honored.
+    """
+
+    def __init__(
+        self,
+        base: float,
+        min_interval: float = None,
+        max_interval: float = None,
+        speedup: float = None,
+        slowdown: float = None,
+        error_delay: float = None,
+        max_backoff: float = None,
+    ):
+        self.base = base
+        self.min_interval = min_interval or float(
+            os.getenv("POLL_MIN_INTERVAL", str(min(base, 60)))
+        )
+        self.max_interval = max_interval or float(
+            os.getenv("POLL_MAX_INTERVAL", str(max(base, 900)))
+        )
+        self.speedup = speedup or float(os.getenv("POLL_SPEEDUP", "0.5"))
+        self.slowdown = slowdown or float(os.getenv("POLL_SLOWDOWN", "1.25"))
+        self.error_delay = error_delay or float(os.getenv("POLL_ERROR_DELAY", "60"))
+        self.max_backoff = max_backoff or float(os.getenv("POLL_MAX_BACKOFF", "1800"))
+        self.current = self._clamp(base)
+        self.failures = 0
+
+    def _clamp(self, interval: float) -> float:
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def on_success(self, result: Optional[PollResult]) -> float:
+        """Seconds until the next poll after a successful one"""
+        self.failures = 0
+        new_alerts = result.new_alerts if result else 0
+        if new_alerts:
+            # Snap back from a long quiet interval as soon as alerts arrive
+            self.current = self._clamp(min(self.current, self.base) * self.speedup)
+        else:
+            self.current = self._clamp(self.current * self.slowdown)
+        if result and result.retry_after:
+            return max(self.current, result.retry_after)
+        return self.current
+
+    def on_error(self, error: Exception) -> float:
+        """Seconds until the next poll after a failed one"""
+        self.failures += 1
+        backoff = min(self.max_backoff, self.error_delay * 2 ** (self.failures - 1))
+        delay = random.uniform(backoff / 2, backoff)
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after:
+            delay = max(delay, retry_after)
+        return delay
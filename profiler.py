@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+import logging
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples one thread's stack at a fixed interval from a daemon thread
+
+    Stacks are written in the collapsed format (``outer;inner count`` per
+    line) read by flamegraph.pl and speedscope. Sampling only reads frames,
+    so the monitor runs at close to full speed while profiled; time the event
+    loop spends waiting shows up under the selector's ``select`` frame.
+    """
+
+    def __init__(self, path: str, interval: float = None, thread_id: int = None):
+        self.path = Path(path)
+        self.interval = interval or float(os.getenv("PROFILE_INTERVAL", "0.005"))
+        self.thread_id = thread_id or threading.main_thread().ident
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame_name(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._sample, name="sampling-profiler", daemon=True
+        )
+        self._started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        with open(self.path, "w", encoding="utf-8") as f:
+            for stack, samples in self.stacks.most_common():
+                f.write(f"{stack} {samples}\n")
+        elapsed = time.perf_counter() - self._started
+        logger.info(
+            f"Wrote {self.samples} stack samples over {elapsed:.1f}s to {self.path}"
+        )
+
+    def __enter__(self) -> "SamplingProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,270 @@
+import os
+import json
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from geofence import FenceIndex, Geofence, load_geofences
+from polling import AdaptiveInterval, PollResult
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Region:
+    """A named monitoring area with its own interval, filters and targets"""
+
+    name: str
+    bounds: dict
+    interval: int = 300
+    alert_types: List[str] = field(default_factory=lambda: ["POLICE"])
+    # None means "use the notification provider's configured targets"
+    pushover_user_keys: Optional[List[str]] = None
+    discord_webhook_urls: Optional[List[str]] = None
+    # When set, only alerts inside one of these fences match the region
+    fences: Optional[FenceIndex] = None
+
+    def contains(self, lat: float, lon: float) -> bool:
+        """Check whether a point lies inside the region's bounding box"""
+        return (
+            self.bounds["bottom"] <= lat <= self.bounds["top"]
+            and self.bounds["left"] <= lon <= self.bounds["right"]
+        )
+
+    def matches(self, alert: dict) -> bool:
+        """Check whether an alert is of a watched type and inside the region
+
+        Alerts without coordinates cannot be placed, so they match on type
+        alone, unless the region is limited to geofences.
+        """
+        if alert.get("type") not in self.alert_types:
+            return False
+        location = alert.get("location", {})
+        lat, lon = location.get("y"), location.get("x")
+        if lat is None or lon is None:
+            return self.fences is None
+        if self.fences is not None:
+            return bool(self.fences.matching(lat, lon, alert.get("type")))
+        return self.contains(lat, lon)
+
+    def matching_fences(self, alert: dict) -> List[Geofence]:
+        """The region's geofences that contain the alert"""
+        location = alert.get("location", {})
+        lat, lon = location.get("y"), location.get("x")
+        if self.fences is None or lat is None or lon is None:
+            return []
+        return self.fences.matching(lat, lon, alert.get("type"))
+
+    @classmethod
+    def from_dict(
+        cls, data: dict, default_interval: int = 300, base_dir: Optional[Path] = None
+    ) -> "Region":
+        """Build a region from its config entry
+
+        ``geofences`` is a GeoJSON FeatureCollection or a path to one (relative
+        to the config file); without ``bounds`` the region polls the union
+        bounding box of its fences.
+        """
+        fences = None
+        if data.get("geofences") is not None:
+            fences = FenceIndex(load_geofences(data["geofences"], base_dir))
+        bounds = data.get("bounds")
+        if bounds is None:
+            if fences is None:
+                raise ValueError(f"Region {data['name']} needs bounds or geofences")
+            bounds = union_bounds([fence.bounds for fence in fences.fences])
+        return cls(
+            name=data["name"],
+            bounds={
+                key: float(bounds[key]) for key in ("top", "bottom", "left", "right")
+            },
+            interval=int(data.get("interval", default_interval)),
+            alert_types=list(data.get("alert_types", ["POLICE"])),
+            pushover_user_keys=data.get("pushover_user_keys"),
+            discord_webhook_urls=data.get("discord_webhook_urls"),
+            fences=fences,
+        )
+
+
+def load_regions(config_path: str, default_interval: int = 300) -> List[Region]:
+    """Load the list of regions from the ``regions`` key of a JSON config file"""
+    with open(Path(config_path), "r") as f:
+        config = json.load(f)
+    base_dir = Path(config_path).parent
+    regions = [
+        Region.from_dict(entry, default_interval, base_dir)
+        for entry in config.get("regions", [])
+    ]
+    if not regions:
+        raise ValueError(f"No regions defined in {config_path}")
+    names = [region.name for region in regions]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate region names in {config_path}")
+    return regions
+
+
+def default_config_path() -> Optional[str]:
+    """Config file named by the WAZE_PINGER_CONFIG environment variable, if any"""
+    return os.getenv("WAZE_PINGER_CONFIG")
+
+
+def bounds_overlap(a: dict, b: dict) -> bool:
+    return (
+        a["bottom"] <= b["top"]
+        and b["bottom"] <= a["top"]
+        and a["left"] <= b["right"]
+        and b["left"] <= a["right"]
+    )
+
+
+def union_bounds(bounds_list: List[dict]) -> dict:
+    """Smallest bounding box covering every box in the list"""
+    return {
+        "top": max(b["top"] for b in bounds_list),
+        "bottom": min(b["bottom"] for b in bounds_list),
+        "left": min(b["left"] for b in bounds_list),
+        "right": max(b["right"] for b in bounds_list),
+    }
+
+
+def group_overlapping(regions: List[Region]) -> List[List[Region]]:
+    """Group regions whose boxes overlap so each group needs one upstream request"""
+    groups: List[List[Region]] = []
+    for region in regions:
+        merged = [region]
+        remaining = []
+        for group in groups:
+            if any(bounds_overlap(region.bounds, other.bounds) for other in group):
+                merged.extend(group)
+            else:
+                remaining.append(group)
+        groups = remaining + [merged]
+    return groups
+
+
+class RegionScheduler:
+    """Schedules every region's polls inside one event loop
+
+    Regions that fall due together and overlap are handed to ``poll_group`` as
+    one group, so they share a single upstream fetch. Each region's next poll
+    is set by its AdaptiveInterval from the group's outcome. Polls run as
+    independent tasks, so a slow group (e.g. one still delivering
+    notifications) never delays regions that are due in the meantime.
+    """
+
+    def __init__(
+        self,
+        regions: List[Region],
+        poll_group: Callable[[List[Region]], Awaitable[Optional[PollResult]]],
+        min_interval: float = None,
+        max_interval: float = None,
+    ):
+        self.regions = regions
+        self.poll_group = poll_group
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.intervals: Dict[str, AdaptiveInterval] = {
+            region.name: AdaptiveInterval(region.interval, min_interval, max_interval)
+            for region in regions
+        }
+        self.next_due: Dict[str, float] = {region.name: 0.0 for region in regions}
+        self.in_flight: Set[str] = set()
+        # Set when the regions change, so run() reschedules without waiting
+        self._changed = asyncio.Event()
+
+    def update(self, regions: List[Region]):
+        """Swap in a new list of regions
+
+        Regions that keep their name and interval keep their adaptive state
+        and next poll time; new ones are due at once. Polls already running
+        for removed regions finish but schedule nothing.
+        """
+        intervals, next_due = {}, {}
+        for region in regions:
+            interval = self.intervals.get(region.name)
+            if interval is None or interval.base != region.interval:
+                interval = AdaptiveInterval(
+                    region.interval, self.min_interval, self.max_interval
+                )
+            intervals[region.name] = interval
+            next_due[region.name] = self.next_due.get(region.name, 0.0)
+        self.regions = regions
+        self.intervals = intervals
+        self.next_due = next_due
+        self._changed.set()
+
+    def due_regions(self, now: float) -> List[Region]:
+        return [
+            r
+            for r in self.regions
+            if r.name not in self.in_flight and self.next_due.get(r.name, 0.0) <= now
+        ]
+
+    async def poll(self, group: List[Region]):
+        """Poll one group and schedule its regions' next polls"""
+        names = [region.name for region in group]
+        self.in_flight.update(names)
+        try:
+            result = await self.poll_group(group)
+            error = None
+        except Exception as e:
+            result, error = None, e
+            logger.error(f"Polling regions [{', '.join(names)}] failed: {e}")
+        finally:
+            self.in_flight.difference_update(names)
+
+        finished = time.monotonic()
+        for region in group:
+            interval = self.intervals.get(region.name)
+            if interval is None:
+                # Removed by a config reload while it was polling
+                continue
+            if error is not None:
+                delay = interval.on_error(error)
+            else:
+                delay = interval.on_success(result)
+            self.next_due[region.name] = finished + delay
+            logger.info(f"Next poll of {region.name} in {delay:.0f} seconds")
+
+    def start_due(self) -> List[asyncio.Task]:
+        """Start a poll task for every group of due regions"""
+        groups = group_overlapping(self.due_regions(time.monotonic()))
+        return [asyncio.create_task(self.poll(group)) for group in groups]
+
+    def seconds_until_due(self) -> Optional[float]:
+        """Seconds until the next idle region is due; None if all are polling"""
+        idle = [r.name for r in self.regions if r.name not in self.in_flight]
+        if not idle:
+            return None
+        next_wake = min(self.next_due[name] for name in idle)
+        return max(0.0, next_wake - time.monotonic())
+
+    async def run_once(self) -> float:
+        """Poll every due region and return seconds until the next one is due"""
+        tasks = self.start_due()
+        if tasks:
+            await asyncio.wait(tasks)
+        return self.seconds_until_due()
+
+    async def run(self):
+        """Poll regions forever"""
+        running: Set[asyncio.Task] = set()
+        while True:
+            running.update(self.start_due())
+            sleep_for = self.seconds_until_due()
+            self._changed.clear()
+            changed = asyncio.create_task(self._changed.wait())
+            # Wake when the next region is due, a poll finishes or the
+            # regions change, whichever comes first
+            try:
+                _, pending = await asyncio.wait(
+                    running | {changed},
+                    timeout=sleep_for,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+            finally:
+                changed.cancel()
+            running = pending - {changed}
@@ -0,0 +1,216 @@
+import copy
+import json
+import random
+import uuid
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from aiohttp import web
+
+from tracing import percentile
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_PAYLOAD = Path(__file__).resolve().parent / "sample_waze_response.json"
+
+
+def load_payloads(paths: Sequence[str]) -> List[dict]:
+    """Load recorded georss responses"""
+    payloads = []
+    for path in paths:
+        with open(path, "r") as f:
+            payloads.append(json.load(f))
+    return payloads
+
+
+def synthesize_cycles(
+    templates: List[dict],
+    alerts: int,
+    cycles: int,
+    duplicate_ratio: float,
+    bounds: dict,
+    seed: int = 0,
+) -> List[dict]:
+    """Scale recorded payloads into one synthetic payload per poll cycle
+
+    Each cycle holds ``alerts`` copies of the recorded alerts spread uniformly
+    over the bounds. A ``duplicate_ratio`` share of them repeat alerts from the
+    previous cycle (as Waze does for alerts that are still active); the rest
+    get fresh UUIDs.
+    """
+    rng = random.Random(seed)
+    prototypes = [alert for payload in templates for alert in payload.get("alerts", [])]
+    if not prototypes:
+        raise ValueError("Recorded payloads contain no alerts to scale")
+
+    def fresh_alert() -> dict:
+        alert = copy.deepcopy(rng.choice(prototypes))
+        alert_uuid = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        alert["uuid"] = alert_uuid
+        alert["id"] = f"alert-{rng.getrandbits(32)}/{alert_uuid}"
+        alert["location"] = {
+            "x": rng.uniform(bounds["left"], bounds["right"]),
+            "y": rng.uniform(bounds["bottom"], bounds["top"]),
+        }
+        return alert
+
+    payloads = []
+    previous: List[dict] = []
+    for _ in range(cycles):
+        repeated = min(len(previous), int(alerts * duplicate_ratio))
+        current = rng.sample(previous, repeated)
+        current.extend(fresh_alert() for _ in range(alerts - repeated))
+        rng.shuffle(current)
+        payloads.append({"alerts": current, "jams": [], "users": []})
+        previous = current
+    return payloads
+
+
+def recorded_cycles(payloads: List[dict], cycles: int) -> List[dict]:
+    """Replay recorded payloads round-robin for the given number of cycles"""
+    return [payloads[index % len(payloads)] for index in range(cycles)]
+
+
+@dataclass
+class ReplayStats:
+    """Throughput, latency and memory of one replay run"""
+
+    latencies: List[float] = field(default_factory=list)
+    alerts: int = 0
+    new_alerts: int = 0
+    peak_memory: Optional[int] = None
+    requests: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def elapsed(self) -> float:
+        return sum(self.latencies)
+
+    @property
+    def alerts_per_second(self) -> float:
+        return self.alerts / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> List[str]:
+        lines = [
+            f"Cycles: {len(self.latencies)}",
+            f"Alerts replayed: {self.alerts} ({self.new_alerts} new)",
+            f"Throughput: {self.alerts_per_second:.1f} alerts/s",
+            "Cycle latency: "
+            + ", ".join(
+                f"p{q} {percentile(self.latencies, q) * 1000:.1f} ms"
+                for q in (50, 95, 99)
+            ),
+        ]
+        if self.peak_memory is not None:
+            lines.append(f"Peak traced memory: {self.peak_memory / 1e6:.1f} MB")
+        lines.append(
+            "Stub requests: "
+            + ", ".join(f"{name} {count}" for name, count in self.requests.items())
+        )
+        return lines
+
+
+class StubUpstreams:
+    """One local HTTP server standing in for Waze, Nominatim, Pushover and Discord
+
+    The georss endpoint answers each tile request with the alerts of the
+    current payload inside the requested box, capped like the live map.
+    Responses are cached per query until the payload changes, so repeated
+    polls of a large payload measure the client rather than the stub.
+    """
+
+    def __init__(self, alert_cap: int = 200):
+        self.alert_cap = alert_cap
+        self._payload: dict = {"alerts": []}
+        self._responses: Dict[str, bytes] = {}
+        self.requests: Dict[str, int] = {
+            "waze": 0,
+            "nominatim": 0,
+            "pushover": 0,
+            "discord": 0,
+        }
+        self.base_url = None
+        self._runner = None
+
+    @property
+    def payload(self) -> dict:
+        return self._payload
+
+    @payload.setter
+    def payload(self, payload: dict):
+        self._payload = payload
+        self._responses.clear()
+
+    async def _georss(self, request: web.Request) -> web.Response:
+        self.requests["waze"] += 1
+        query = request.query
+        key = "|".join(
+            query.get(side, "") for side in ("top", "bottom", "left", "right")
+        )
+        body = self._responses.get(key)
+        if body is None:
+            top, bottom = float(query["top"]), float(query["bottom"])
+            left, right = float(query["left"]), float(query["right"])
+            alerts = [
+                alert
+                for alert in self._payload.get("alerts", [])
+                if bottom <= alert.get("location", {}).get("y", 0) <= top
+                and left <= alert.get("location", {}).get("x", 0) <= right
+            ]
+            body = json.dumps({"alerts": alerts[: self.alert_cap]}).encode()
+            self._responses[key] = body
+        return web.Response(body=body, content_type="application/json")
+
+    async def _reverse(self, request: web.Request) -> web.Response:
+        self.requests["nominatim"] += 1
+        return web.json_response({"address": {"road": "Replay Street"}})
+
+    async def _pushover(self, request: web.Request) -> web.Response:
+        self.requests["pushover"] += 1
+        await request.read()
+        return web.json_response({"status": 1})
+
+    async def _discord(self, request: web.Request) -> web.Response:
+        self.requests["discord"] += 1
+        await request.read()
+        return web.Response(status=204)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_get("/georss", self._georss)
+        app.router.add_get("/reverse", self._reverse)
+        app.router.add_post("/pushover", self._pushover)
+        app.router.add_post("/discord/{webhook}", self._discord)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.base_url = f"http://{host}:{self._runner.addresses[0][1]}"
+        return self.base_url
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def __aenter__(self) -> "StubUpstreams":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @property
+    def georss_url(self) -> str:
+        return f"{self.base_url}/georss"
+
+    @property
+    def nominatim_url(self) -> str:
+        return f"{self.base_url}/reverse"
+
+    @property
+    def pushover_url(self) -> str:
+        return f"{self.base_url}/pushover"
+
+    def discord_webhook(self, index: int) -> str:
+        return f"{self.base_url}/discord/{index}"
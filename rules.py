@@ -0,0 +1,201 @@
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, time as clock
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMPLATE = "{label} on {street} in {city}"
+
+# Dispatch keys are (type, subtype); None stands for "any"
+RuleKey = Tuple[Optional[str], Optional[str]]
+
+
+class TemplateFields(dict):
+    """Template values; unknown placeholders render as empty strings"""
+
+    def __missing__(self, key: str) -> str:
+        return ""
+
+
+def parse_quiet_hours(value: Optional[str]) -> Optional[Tuple[clock, clock]]:
+    """(start, end) from "HH:MM-HH:MM"; the span may wrap past midnight"""
+    if not value:
+        return None
+    start, end = (clock.fromisoformat(part.strip()) for part in value.split("-"))
+    return start, end
+
+
+@dataclass
+class Rule:
+    """Routes alerts of some types/subtypes to a message template and targets
+
+    Empty ``types`` or ``subtypes`` match anything. Targets and ``regions``
+    left as None fall back to the matched regions and their targets.
+    """
+
+    name: str
+    types: List[str] = field(default_factory=list)
+    subtypes: List[str] = field(default_factory=list)
+    min_reliability: Optional[int] = None
+    min_confidence: Optional[int] = None
+    min_thumbs_up: Optional[int] = None
+    road_types: Optional[List[int]] = None
+    quiet_hours: Optional[Tuple[clock, clock]] = None
+    regions: Optional[List[str]] = None
+    template: str = DEFAULT_TEMPLATE
+    pushover_user_keys: Optional[List[str]] = None
+    discord_webhook_urls: Optional[List[str]] = None
+    # Skip the rules after this one when it matches
+    stop: bool = False
+
+    def is_quiet(self, now: datetime) -> bool:
+        if self.quiet_hours is None:
+            return False
+        start, end = self.quiet_hours
+        current = now.time()
+        if start <= end:
+            return start <= current < end
+        return current >= start or current < end
+
+    def accepts(self, alert: dict, now: datetime) -> bool:
+        """Threshold and quiet-hour checks; type and subtype are already matched"""
+        if (
+            self.min_reliability is not None
+            and (alert.get("reliability") or 0) < self.min_reliability
+        ):
+            return False
+        if (
+            self.min_confidence is not None
+            and (alert.get("confidence") or 0) < self.min_confidence
+        ):
+            return False
+        if (
+            self.min_thumbs_up is not None
+            and (alert.get("nThumbsUp") or 0) < self.min_thumbs_up
+        ):
+            return False
+        if self.road_types is not None and alert.get("roadType") not in self.road_types:
+            return False
+        return not self.is_quiet(now)
+
+    def render(self, alert: dict, street_name: Optional[str], label: str) -> str:
+        location = alert.get("location", {})
+        return self.template.format_map(
+            TemplateFields(
+                label=label,
+                type=alert.get("type") or "",
+                subtype=alert.get("subtype") or "",
+                street=street_name or alert.get("street") or "Unknown location",
+                city=alert.get("city") or "Unknown city",
+                lat=location.get("y", "N/A"),
+                lon=location.get("x", "N/A"),
+                reliability=alert.get("reliability", ""),
+                confidence=alert.get("confidence", ""),
+                thumbs_up=alert.get("nThumbsUp", 0),
+                rule=self.name,
+            )
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict, index: int = 0) -> "Rule":
+        return cls(
+            name=data.get("name", f"rule-{index}"),
+            types=list(data.get("types", [])),
+            subtypes=list(data.get("subtypes", [])),
+            min_reliability=data.get("min_reliability"),
+            min_confidence=data.get("min_confidence"),
+            min_thumbs_up=data.get("min_thumbs_up"),
+            road_types=data.get("road_types"),
+            quiet_hours=parse_quiet_hours(data.get("quiet_hours")),
+            regions=data.get("regions"),
+            template=data.get("template", DEFAULT_TEMPLATE),
+            pushover_user_keys=data.get("pushover_user_keys"),
+            discord_webhook_urls=data.get("discord_webhook_urls"),
+            stop=bool(data.get("stop", False)),
+        )
+
+
+class RuleSet:
+    """Rules compiled into a dispatch table keyed on (type, subtype)
+
+    Each rule is filed under every (type, subtype) pair it names, with None
+    for "any". The candidates for an alert are the union of its exact key and
+    the wildcard keys, merged in config order and memoized per key, so
+    matching a fetch is one dict lookup per alert plus the threshold checks of
+    the few rules that can apply.
+    """
+
+    def __init__(self, rules: Iterable[Rule] = ()):
+        self.rules = list(rules)
+        self.table: Dict[RuleKey, List[Tuple[int, Rule]]] = {}
+        for order, rule in enumerate(self.rules):
+            for alert_type in rule.types or [None]:
+                for subtype in rule.subtypes or [None]:
+                    self.table.setdefault((alert_type, subtype), []).append(
+                        (order, rule)
+                    )
+        self._candidates: Dict[RuleKey, List[Rule]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def candidates(self, alert_type: Optional[str], subtype: Optional[str]):
+        key = (alert_type, subtype)
+        rules = self._candidates.get(key)
+        if rules is None:
+            merged = {}
+            for lookup in {key, (alert_type, None), (None, subtype), (None, None)}:
+                merged.update(self.table.get(lookup, ()))
+            rules = [merged[order] for order in sorted(merged)]
+            self._candidates[key] = rules
+        return rules
+
+    def match(
+        self, alert: dict, region_names: Iterable[str], now: Optional[datetime] = None
+    ) -> Optional[List[Rule]]:
+        """The rules that fire for an alert routed to the named regions
+
+        None means no rule covers the alert, so it keeps the default
+        notification; an empty list means rules cover it but none fired.
+        """
+        now = now or datetime.now()
+        names = set(region_names)
+        fired, covered = [], False
+        for rule in self.candidates(alert.get("type"), alert.get("subtype") or None):
+            if rule.regions is not None and not names.intersection(rule.regions):
+                continue
+            covered = True
+            if rule.accepts(alert, now):
+                fired.append(rule)
+                if rule.stop:
+                    break
+        return fired if covered else None
+
+    def watch(self, regions) -> None:
+        """Add the types named by rules to the watched types of their regions"""
+        for region in regions:
+            for rule in self.rules:
+                if rule.regions is not None and region.name not in rule.regions:
+                    continue
+                for alert_type in rule.types:
+                    if alert_type not in region.alert_types:
+                        region.alert_types.append(alert_type)
+
+
+def load_rules(config_path: str) -> RuleSet:
+    """Compile the ``rules`` key of a JSON config file"""
+    with open(Path(config_path), "r") as f:
+        config = json.load(f)
+    rules = [
+        Rule.from_dict(entry, i) for i, entry in enumerate(config.get("rules", []))
+    ]
+    names = [rule.name for rule in rules]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate rule names in {config_path}")
+    return RuleSet(rules)
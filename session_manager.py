@@ -0,0 +1,88 @@
+import os
+import aiohttp
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+
+class SessionManager:
+    """Owns long-lived, pooled HTTP sessions shared by Waze, Nominatim, Pushover and Discord calls"""
+
+    def __init__(
+        self,
+        limit_per_host: int = None,
+        dns_cache_ttl: int = None,
+        keepalive_timeout: float = None,
+        request_timeout: float = None,
+    ):
+        self.limit_per_host = limit_per_host or int(
+            os.getenv("HTTP_LIMIT_PER_HOST", "8")
+        )
+        self.dns_cache_ttl = dns_cache_ttl or int(
+            os.getenv("HTTP_DNS_CACHE_TTL", "300")
+        )
+        self.keepalive_timeout = keepalive_timeout or float(
+            os.getenv("HTTP_KEEPALIVE_TIMEOUT", "75")
+        )
+        self.request_timeout = request_timeout or float(
+            os.getenv("HTTP_REQUEST_TIMEOUT", "30")
+        )
+        # One session (and therefore one connection pool) per scheme://host
+        self.sessions: Dict[str, aiohttp.ClientSession] = {}
+
+    @staticmethod
+    def host_key(url: str) -> str:
+        """Return the scheme://host[:port] key used to pool connections for a URL"""
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def get_session(self, url: str) -> aiohttp.ClientSession:
+        """Get (or lazily create) the pooled session for the host serving a URL"""
+        key = self.host_key(url)
+        session = self.sessions.get(key)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self.limit_per_host,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+            )
+            self.sessions[key] = session
+            logger.debug(f"Opened pooled HTTP session for {key}")
+        return session
+
+    async def close(self):
+        """Close every pooled session and release their connections"""
+        sessions = list(self.sessions.items())
+        self.sessions = {}
+        for key, session in sessions:
+            try:
+                await session.close()
+                logger.debug(f"Closed pooled HTTP session for {key}")
+            except Exception as e:
+                logger.error(f"Failed to close HTTP session for {key}: {e}")
+
+    async def __aenter__(self) -> "SessionManager":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+@asynccontextmanager
+async def session_for(
+    url: str, session_manager: Optional[SessionManager] = None
+) -> AsyncIterator[aiohttp.ClientSession]:
+    """Yield the pooled session for a URL, or a throwaway session when no manager is injected"""
+    if session_manager is not None:
+        yield session_manager.get_session(url)
+    else:
+        async with aiohttp.ClientSession() as session:
+            yield session
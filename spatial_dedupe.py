@@ -0,0 +1,126 @@
+import os
+import time
+import logging
+from collections import deque
+from typing import Deque, Dict, Hashable, List, Optional, Tuple
+
+from geo import Cell, cell_key, haversine_meters, neighbour_cells
+
+logger = logging.getLogger(__name__)
+
+# (report time, lat, lon, alert type, uuid, scope)
+Report = Tuple[float, float, float, Optional[str], Optional[str], Hashable]
+
+
+def report_time(alert: dict) -> float:
+    """When an alert was reported, in epoch seconds (now if Waze omits it)"""
+    pub_millis = alert.get("pubMillis")
+    return pub_millis / 1000 if pub_millis else time.time()
+
+
+class SpatialDedupe:
+    """Suppresses alerts reported near a recent alert of the same type and scope
+
+    Off unless ``radius_meters`` (``DEDUPE_RADIUS_METERS``) is set. Alerts
+    only suppress each other within the same ``scope``, e.g. the regions and
+    rules that route them, so a report never hides one bound for other
+    targets. Accepted alerts are bucketed in a grid whose cells are ``radius_meters``
+    wide, so the reports that can be within the radius of a point are always
+    in its 3x3 cell neighbourhood. Entries expire after ``window_minutes`` in
+    insertion order and at most ``max_entries`` are kept.
+    """
+
+    def __init__(
+        self,
+        radius_meters: float = None,
+        window_minutes: float = None,
+        max_entries: int = None,
+    ):
+        self.radius_meters = (
+            radius_meters
+            if radius_meters is not None
+            else float(os.getenv("DEDUPE_RADIUS_METERS", "0"))
+        )
+        self.window_seconds = 60 * (
+            window_minutes
+            if window_minutes is not None
+            else float(os.getenv("DEDUPE_WINDOW_MINUTES", "15"))
+        )
+        self.max_entries = max_entries or int(os.getenv("DEDUPE_MAX_ENTRIES", "10000"))
+        self.cells: Dict[Cell, List[Report]] = {}
+        # (insertion time, cell, report) oldest first, for expiry and the cap
+        self._order: Deque[Tuple[float, Cell, Report]] = deque()
+        self.suppressed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.radius_meters > 0 and self.window_seconds > 0
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def _evict(self, now: float):
+        while self._order and (
+            len(self._order) > self.max_entries
+            or now - self._order[0][0] > self.window_seconds
+        ):
+            _, cell, report = self._order.popleft()
+            bucket = self.cells.get(cell)
+            if bucket is not None:
+                bucket.remove(report)
+                if not bucket:
+                    del self.cells[cell]
+
+    def find_nearby(self, alert: dict, scope: Hashable = None) -> Optional[Report]:
+        """An earlier report of the same type and scope within the radius and window"""
+        location = alert.get("location", {})
+        lat, lon = location.get("y"), location.get("x")
+        if lat is None or lon is None:
+            return None
+        reported = report_time(alert)
+        for cell in neighbour_cells(lat, lon, self.radius_meters):
+            for report in self.cells.get(cell, ()):
+                if (
+                    report[3] == alert.get("type")
+                    and report[5] == scope
+                    and abs(report[0] - reported) <= self.window_seconds
+                    and haversine_meters(lat, lon, report[1], report[2])
+                    <= self.radius_meters
+                ):
+                    return report
+        return None
+
+    def add(self, alert: dict, scope: Hashable = None):
+        """Index an accepted alert's location"""
+        location = alert.get("location", {})
+        lat, lon = location.get("y"), location.get("x")
+        if lat is None or lon is None:
+            return
+        report = (
+            report_time(alert),
+            lat,
+            lon,
+            alert.get("type"),
+            alert.get("uuid"),
+            scope,
+        )
+        cell = cell_key(lat, lon, self.radius_meters)
+        self.cells.setdefault(cell, []).append(report)
+        now = time.monotonic()
+        self._order.append((now, cell, report))
+        self._evict(now)
+
+    def is_duplicate(self, alert: dict, scope: Hashable = None) -> bool:
+        """True if the alert repeats a nearby recent report; otherwise index it"""
+        if not self.enabled:
+            return False
+        self._evict(time.monotonic())
+        nearby = self.find_nearby(alert, scope)
+        if nearby is not None:
+            self.suppressed += 1
+            logger.debug(
+                f"Suppressing alert {alert.get('uuid')} near earlier report {nearby[4]}"
+            )
+            return True
+        self.add(alert, scope)
+        return False
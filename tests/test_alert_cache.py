@@ -0,0 +1,70 @@
+import pickle
+from datetime import datetime, timedelta
+
+import pytest
+
+from alert_cache import AlertCache
+
+
+@pytest.fixture
+def legacy_cache(tmp_path):
+    """A pickle cache as written before backends existed, with one expired entry"""
+    now = datetime.now()
+    entries = {
+        "expired": now - timedelta(hours=48),
+        "older": now - timedelta(hours=2),
+        "newer": now - timedelta(hours=1),
+    }
+    path = tmp_path / "alert_cache.pkl"
+    with open(path, "wb") as f:
+        pickle.dump(entries, f)
+    return path
+
+
+@pytest.mark.parametrize("backend", ["log", "sqlite"])
+@pytest.mark.parametrize("compact", [False, True])
+def test_legacy_pickle_is_migrated_once(legacy_cache, backend, compact):
+    cache = AlertCache(str(legacy_cache), backend=backend, compact=compact)
+
+    assert list(cache.seen_alerts) == ["older", "newer"]
+    assert not legacy_cache.exists()
+    assert legacy_cache.with_name("alert_cache.pkl.migrated").exists()
+    assert sorted(cache.backend.load()) == ["newer", "older"]
+
+    cache.mark_seen("latest")
+    cache.save_cache()
+    reloaded = AlertCache(str(legacy_cache), backend=backend, compact=compact)
+    assert list(reloaded.seen_alerts) == ["older", "newer", "latest"]
+
+
+def test_pickle_backend_does_not_migrate(legacy_cache):
+    cache = AlertCache(str(legacy_cache), backend="pickle")
+
+    assert list(cache.seen_alerts) == ["older", "newer"]
+    assert legacy_cache.exists()
+
+
+@pytest.mark.parametrize("backend", ["log", "sqlite"])
+def test_existing_backend_wins_over_a_legacy_file(tmp_path, backend):
+    path = tmp_path / "alert_cache.pkl"
+    cache = AlertCache(str(path), backend=backend)
+    cache.mark_seen("current")
+    cache.save_cache()
+    with open(path, "wb") as f:
+        pickle.dump({"stale": datetime.now()}, f)
+
+    reloaded = AlertCache(str(path), backend=backend)
+    assert list(reloaded.seen_alerts) == ["current"]
+    assert path.exists()
+
+
+@pytest.mark.parametrize("backend", ["log", "sqlite", "pickle"])
+def test_clear_removes_the_backend_file(tmp_path, backend):
+    cache = AlertCache(str(tmp_path / "alert_cache.pkl"), backend=backend)
+    cache.mark_seen("alert")
+    cache.save_cache()
+    assert cache.cache_file.exists()
+
+    cache.clear()
+    assert not cache.cache_file.exists()
+    assert len(cache.seen_alerts) == 0
@@ -0,0 +1,100 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from alert_cache import AlertCache
+from compact_store import CompactSeenStore
+
+
+def uuids(count):
+    return [str(uuid.uuid4()) for _ in range(count)]
+
+
+@pytest.mark.parametrize("bloom", [False, True])
+def test_behaves_like_an_ordered_dict(bloom):
+    store = CompactSeenStore(capacity=8, bloom=bloom)
+    ids = uuids(3)
+    now = datetime.now()
+    for offset, alert_uuid in enumerate(ids):
+        store[alert_uuid] = now + timedelta(seconds=offset)
+
+    assert len(store) == 3
+    assert ids[1] in store
+    assert str(uuid.uuid4()) not in store
+    assert store[ids[2]] == now + timedelta(seconds=2)
+
+    store.move_to_end(ids[0])
+    assert list(store) == [ids[1], ids[2], ids[0]]
+
+    assert store.popitem(last=False) == (ids[1], now + timedelta(seconds=1))
+    del store[ids[2]]
+    assert list(store.items()) == [(ids[0], now)]
+    with pytest.raises(KeyError):
+        del store[ids[2]]
+
+
+def test_keeps_order_across_growth_and_rebuilds():
+    store = CompactSeenStore(capacity=8)
+    ids = uuids(5000)
+    now = datetime.now()
+    for alert_uuid in ids:
+        store[alert_uuid] = now
+    for alert_uuid in ids[::2]:
+        del store[alert_uuid]
+    # Re-marking moves an entry to the end, as mark_seen does
+    store[ids[1]] = now
+
+    expected = ids[3::2] + [ids[1]]
+    assert list(store) == expected
+    assert [store.popitem(last=False)[0] for _ in range(len(store))] == expected
+    with pytest.raises(KeyError):
+        store.popitem(last=False)
+
+
+def test_returns_the_original_text_of_ids_that_are_not_uuids():
+    store = CompactSeenStore()
+    upper = str(uuid.uuid4()).upper()
+    now = datetime.now()
+    store["alert-1"] = now
+    store[upper] = now
+
+    assert "alert-1" in store
+    assert list(store) == ["alert-1", upper]
+    assert store.popitem(last=False)[0] == "alert-1"
+    assert store.popitem(last=False)[0] == upper
+
+
+def test_keeps_sub_second_timestamps():
+    store = CompactSeenStore()
+    timestamp = datetime(2024, 5, 1, 12, 0, 0, 123456)
+    store["a"] = timestamp
+    assert store["a"] == timestamp
+
+
+@pytest.mark.parametrize("backend", ["log", "sqlite"])
+def test_evicted_entries_are_removed_from_the_backend(tmp_path, backend):
+    cache_file = str(tmp_path / "alert_cache.pkl")
+    cache = AlertCache(cache_file, backend=backend, compact=True, max_entries=2)
+    ids = ["not-a-uuid", str(uuid.uuid4()).upper(), str(uuid.uuid4())]
+    for alert_uuid in ids:
+        cache.mark_seen(alert_uuid)
+        cache.save_cache()
+
+    assert sorted(cache.backend.load()) == sorted(ids[1:])
+    reloaded = AlertCache(cache_file, backend=backend, compact=True, max_entries=2)
+    assert list(reloaded.seen_alerts) == ids[1:]
+
+
+def test_lru_order_survives_a_reload(tmp_path):
+    cache_file = str(tmp_path / "alert_cache.pkl")
+    cache = AlertCache(cache_file, backend="log", compact=True)
+    ids = uuids(50)
+    # Marked within the same second, so only sub-second times order them
+    for alert_uuid in ids:
+        cache.mark_seen(alert_uuid)
+    cache.mark_seen(ids[0])
+    cache.save_cache()
+
+    reloaded = AlertCache(cache_file, backend="log", compact=True)
+    assert list(reloaded.seen_alerts) == ids[1:] + ids[:1]
@@ -0,0 +1,174 @@
+import asyncio
+
+import pytest
+
+from notification_provider import DeliveryResult, NotificationProvider
+from outbox import Outbox
+
+
+class StubProvider:
+    """Settles each send at once with the next scripted outcome
+
+    True succeeds, a status fails, "cancel" cancels the send and an exception
+    is raised from it.
+    """
+
+    def __init__(self, outcomes=()):
+        self.outcomes = list(outcomes)
+        self.sent = []
+
+    def queue_for_target(self, target, message, label=None):
+        self.sent.append((target, message, label))
+        channel, recipient = target
+        outcome = self.outcomes.pop(0) if self.outcomes else True
+        future = asyncio.get_running_loop().create_future()
+        if outcome is True:
+            future.set_result(DeliveryResult(channel, recipient, success=True))
+        elif outcome == "cancel":
+            future.cancel()
+        elif isinstance(outcome, Exception):
+            future.set_exception(outcome)
+        elif outcome is not None:
+            future.set_result(
+                DeliveryResult(
+                    channel, recipient, success=False, status=outcome, error="failed"
+                )
+            )
+        # None leaves the send in flight forever, like a process that died
+        return future
+
+    async def drain(self):
+        await asyncio.sleep(0)
+
+
+def make_outbox(path, provider, **kwargs):
+    kwargs.setdefault("retry_delay", 0.001)
+    kwargs.setdefault("max_delay", 0.001)
+    return Outbox(provider, path=str(path), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_delivered_items_are_removed(tmp_path):
+    provider = StubProvider()
+    outbox = make_outbox(tmp_path / "outbox.db", provider)
+    outbox.put("hello", [("pushover", "user"), ("discord", "hook")], "Police alert")
+    await outbox.drain()
+
+    assert provider.sent == [
+        (("pushover", "user"), "hello", "Police alert"),
+        (("discord", "hook"), "hello", "Police alert"),
+    ]
+    assert outbox.stats() == {"pending": 0, "dead": 0, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_failed_sends_are_retried_until_delivered(tmp_path):
+    provider = StubProvider([500, 503])
+    outbox = make_outbox(tmp_path / "outbox.db", provider)
+    outbox.put("hello", [("pushover", "user")])
+    await outbox.drain()
+    assert outbox.stats()["pending"] == 1
+
+    for _ in range(2):
+        await asyncio.sleep(0.01)
+        await outbox.drain()
+
+    assert len(provider.sent) == 3
+    assert outbox.stats() == {"pending": 0, "dead": 0, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_dead_lettered_after_max_attempts(tmp_path):
+    provider = StubProvider([500, 500, 500])
+    outbox = make_outbox(tmp_path / "outbox.db", provider, max_attempts=3)
+    outbox.put("hello", [("pushover", "user")])
+    for _ in range(5):
+        await outbox.drain()
+        await asyncio.sleep(0.01)
+
+    assert len(provider.sent) == 3
+    assert outbox.stats()["dead"] == 1
+    [(_, channel, target, message, error)] = outbox.dead_letters()
+    assert (channel, target, message, error) == ("pushover", "user", "hello", "failed")
+
+
+@pytest.mark.asyncio
+async def test_permanent_errors_are_dead_lettered_at_once(tmp_path):
+    provider = StubProvider([404])
+    outbox = make_outbox(tmp_path / "outbox.db", provider)
+    outbox.put("hello", [("discord", "deleted-webhook")])
+    await outbox.drain()
+
+    assert outbox.stats()["dead"] == 1
+
+    assert outbox.retry_dead() == 1
+    await outbox.drain()
+    assert outbox.stats() == {"pending": 0, "dead": 0, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_pending_items_survive_a_restart(tmp_path):
+    path = tmp_path / "outbox.db"
+    crashed = make_outbox(path, StubProvider([None]))
+    crashed.put("hello", [("pushover", "user")])
+    assert crashed.stats()["in_flight"] == 1
+    crashed.close()
+
+    provider = StubProvider()
+    outbox = make_outbox(path, provider)
+    assert outbox.stats()["pending"] == 1
+    await outbox.drain()
+    assert provider.sent == [(("pushover", "user"), "hello", None)]
+    assert outbox.stats()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_buffer_limits_items_in_flight(tmp_path):
+    provider = StubProvider([None] * 5)
+    outbox = make_outbox(tmp_path / "outbox.db", provider, buffer_size=2)
+    outbox.put("hello", [("pushover", f"user{i}") for i in range(5)])
+
+    assert len(provider.sent) == 2
+    assert outbox.stats() == {"pending": 5, "dead": 0, "in_flight": 2}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_sends_are_rescheduled(tmp_path):
+    provider = StubProvider(["cancel"])
+    outbox = make_outbox(tmp_path / "outbox.db", provider)
+    outbox.put("hello", [("pushover", "user")])
+    await asyncio.sleep(0)
+    assert outbox.stats() == {"pending": 1, "dead": 0, "in_flight": 0}
+
+    await outbox.drain()
+    assert len(provider.sent) == 2
+    assert outbox.stats()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_handoffs_are_retried(tmp_path):
+    provider = StubProvider([OSError("disk full")])
+    outbox = make_outbox(tmp_path / "outbox.db", provider)
+    outbox.put("hello", [("pushover", "user")])
+    await asyncio.sleep(0.01)
+    await outbox.drain()
+
+    assert len(provider.sent) == 2
+    assert outbox.stats() == {"pending": 0, "dead": 0, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_failing_send_hook_still_resolves_the_delivery(monkeypatch):
+    monkeypatch.setenv("NOTIFICATION_COALESCE_WINDOW", "0")
+
+    def on_send(result):
+        raise OSError("trace file unwritable")
+
+    async def send(messages, user_key, labels):
+        return DeliveryResult("pushover", user_key, success=True, status=200)
+
+    provider = NotificationProvider(on_send=on_send)
+    monkeypatch.setattr(provider, "send_pushover_digest", send)
+    future = provider.queue_for_target(("pushover", "user"), "hello")
+    result = await asyncio.wait_for(future, timeout=1)
+    assert result.success
@@ -0,0 +1,99 @@
+from datetime import datetime
+
+import pytest
+
+from regions import Region
+from rules import Rule, RuleSet, parse_quiet_hours
+
+NOON = datetime(2024, 5, 1, 12, 0)
+MIDNIGHT = datetime(2024, 5, 1, 0, 30)
+
+
+def police(**fields):
+    return {"type": "POLICE", "subtype": "POLICE_VISIBLE", **fields}
+
+
+def names(rules):
+    return None if rules is None else [rule.name for rule in rules]
+
+
+def test_matches_exact_and_wildcard_rules_in_config_order():
+    rule_set = RuleSet(
+        [
+            Rule("any"),
+            Rule("hidden", types=["POLICE"], subtypes=["POLICE_HIDING"]),
+            Rule("police", types=["POLICE"]),
+            Rule("visible", subtypes=["POLICE_VISIBLE"]),
+            Rule("hazard", types=["HAZARD"]),
+        ]
+    )
+    assert names(rule_set.match(police(), ["home"], NOON)) == [
+        "any",
+        "police",
+        "visible",
+    ]
+    assert names(rule_set.match({"type": "ACCIDENT"}, ["home"], NOON)) == ["any"]
+
+
+def test_stop_skips_later_rules():
+    rule_set = RuleSet(
+        [
+            Rule("first", types=["POLICE"], stop=True),
+            Rule("second", types=["POLICE"]),
+        ]
+    )
+    assert names(rule_set.match(police(), ["home"], NOON)) == ["first"]
+
+
+def test_uncovered_alerts_keep_the_default_notification():
+    rule_set = RuleSet([Rule("police", types=["POLICE"], regions=["work"])])
+    assert rule_set.match(police(), ["home"], NOON) is None
+    assert rule_set.match({"type": "JAM"}, ["work"], NOON) is None
+    assert names(rule_set.match(police(), ["home", "work"], NOON)) == ["police"]
+
+
+@pytest.mark.parametrize(
+    "alert",
+    [
+        police(reliability=4, confidence=3),
+        police(reliability=9, confidence=1),
+        police(reliability=9, confidence=3, roadType=1),
+    ],
+)
+def test_covered_alerts_below_thresholds_fire_nothing(alert):
+    rule_set = RuleSet(
+        [
+            Rule(
+                "reliable",
+                types=["POLICE"],
+                min_reliability=5,
+                min_confidence=2,
+                road_types=[3, 4],
+            )
+        ]
+    )
+    assert rule_set.match(alert, ["home"], NOON) == []
+
+
+def test_quiet_hours_wrap_past_midnight():
+    rule = Rule(
+        "daytime", types=["POLICE"], quiet_hours=parse_quiet_hours("23:00-06:30")
+    )
+    rule_set = RuleSet([rule])
+    assert names(rule_set.match(police(), ["home"], NOON)) == ["daytime"]
+    assert rule_set.match(police(), ["home"], MIDNIGHT) == []
+
+
+def test_watch_adds_rule_types_to_their_regions():
+    bounds = {"top": 1, "bottom": 0, "left": 0, "right": 1}
+    home = Region(name="home", bounds=bounds, alert_types=["POLICE"])
+    work = Region(name="work", bounds=bounds, alert_types=["POLICE"])
+    RuleSet(
+        [
+            Rule("hazards", types=["HAZARD"], regions=["work"]),
+            Rule("jams", types=["JAM"]),
+        ]
+    ).watch([home, work])
+
+    assert home.alert_types == ["POLICE", "JAM"]
+    assert work.alert_types == ["POLICE", "HAZARD", "JAM"]
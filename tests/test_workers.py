@@ -0,0 +1,27 @@
+from regions import Region
+from rules import Rule, RuleSet
+from workers import base_name, route_alert, split_region
+
+
+def police_at(lon):
+    return {"type": "POLICE", "location": {"x": lon, "y": 34.0}}
+
+
+def test_split_region_names_stripes_after_the_configured_region():
+    region = Region("la", {"top": 35, "bottom": 33, "left": -119, "right": -117})
+    stripes = split_region(region, 2)
+    assert [s.name for s in stripes] == ["la#0", "la#1"]
+    assert {base_name(s.name) for s in stripes} == {"la"}
+
+
+def test_region_scoped_rules_fire_in_split_regions():
+    region = Region("la", {"top": 35, "bottom": 33, "left": -119, "right": -117})
+    stripes = split_region(region, 2)
+    rule_set = RuleSet([Rule("la police", types=["POLICE"], regions=["la"])])
+
+    matching, fired = route_alert(police_at(-117.5), stripes, rule_set)
+    assert [region.name for region in matching] == ["la#1"]
+    assert [rule.name for rule in fired] == ["la police"]
+
+    matching, fired = route_alert(police_at(-120.0), stripes, rule_set)
+    assert matching == [] and fired is None
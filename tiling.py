@@ -0,0 +1,145 @@
+import os
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from georss_parser import ParsedAlerts
+from polling import UpstreamError
+
+logger = logging.getLogger(__name__)
+
+# Returns the alerts kept from one tile; raises UpstreamError (or returns None)
+# if the request failed
+TileFetcher = Callable[[dict], Awaitable[Optional[ParsedAlerts]]]
+
+
+def split_bounds(bounds: dict, rows: int, cols: int) -> List[dict]:
+    """Split a bounding box into a rows x cols grid of sub-boxes"""
+    lat_step = (bounds["top"] - bounds["bottom"]) / rows
+    lon_step = (bounds["right"] - bounds["left"]) / cols
+    tiles = []
+    for row in range(rows):
+        for col in range(cols):
+            tiles.append(
+                {
+                    "top": bounds["top"] - row * lat_step,
+                    "bottom": bounds["top"] - (row + 1) * lat_step,
+                    "left": bounds["left"] + col * lon_step,
+                    "right": bounds["left"] + (col + 1) * lon_step,
+                }
+            )
+    return tiles
+
+
+def alert_key(alert: dict) -> str:
+    """Key used to dedupe alerts returned by overlapping or repeated tiles"""
+    return alert.get("uuid") or alert.get("id") or repr(alert.get("location"))
+
+
+class TiledFetcher:
+    """Fetches a large bounding box as a grid of concurrently requested tiles
+
+    The Waze live map caps how many alerts one request returns, so tiles whose
+    payload comes back near the cap (counting alerts of every type, not just
+    the kept ones) are split into quadrants and fetched again until they fall
+    under it or the depth limit is hit. Results are merged and deduplicated by
+    alert UUID.
+
+    Tile failures are tolerated as long as one tile succeeds; the longest
+    Retry-After of any rate-limited tile is kept in ``retry_after``.
+    """
+
+    def __init__(
+        self,
+        fetch_tile: TileFetcher,
+        rows: int = None,
+        cols: int = None,
+        alert_cap: int = None,
+        subdivide_ratio: float = None,
+        max_depth: int = None,
+        concurrency: int = None,
+    ):
+        self.fetch_tile = fetch_tile
+        self.rows = rows or int(os.getenv("WAZE_TILE_ROWS", "2"))
+        self.cols = cols or int(os.getenv("WAZE_TILE_COLS", "2"))
+        self.alert_cap = alert_cap or int(os.getenv("WAZE_TILE_ALERT_CAP", "200"))
+        self.subdivide_ratio = subdivide_ratio or float(
+            os.getenv("WAZE_TILE_SUBDIVIDE_RATIO", "0.9")
+        )
+        self.max_depth = (
+            max_depth
+            if max_depth is not None
+            else int(os.getenv("WAZE_TILE_MAX_DEPTH", "3"))
+        )
+        self.concurrency = concurrency or int(os.getenv("WAZE_TILE_CONCURRENCY", "4"))
+        self.retry_after: Optional[float] = None
+
+    async def fetch(self, bounds: dict) -> List[dict]:
+        """Fetch every alert in the bounds
+
+        Raises UpstreamError if every tile request failed.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        merged: Dict[str, dict] = {}
+        stats = {"requests": 0, "failed": 0}
+        errors: List[UpstreamError] = []
+        self.retry_after = None
+
+        async def fetch_recursive(tile: dict, depth: int):
+            async with semaphore:
+                stats["requests"] += 1
+                try:
+                    parsed = await self.fetch_tile(tile)
+                except UpstreamError as e:
+                    errors.append(e)
+                    if e.retry_after:
+                        self.retry_after = max(self.retry_after or 0, e.retry_after)
+                    parsed = None
+
+            if parsed is None:
+                stats["failed"] += 1
+                return
+
+            for alert in parsed.alerts:
+                merged.setdefault(alert_key(alert), alert)
+
+            if parsed.total >= self.alert_cap * self.subdivide_ratio:
+                if depth < self.max_depth:
+                    logger.debug(
+                        f"Tile {tile} returned {parsed.total} alerts, subdividing"
+                    )
+                    await asyncio.gather(
+                        *(
+                            fetch_recursive(quadrant, depth + 1)
+                            for quadrant in split_bounds(tile, 2, 2)
+                        )
+                    )
+                else:
+                    logger.warning(
+                        f"Tile {tile} still returned {parsed.total} alerts at max depth; "
+                        "some alerts may be missing"
+                    )
+
+        await asyncio.gather(
+            *(
+                fetch_recursive(tile, 0)
+                for tile in split_bounds(bounds, self.rows, self.cols)
+            )
+        )
+
+        if stats["failed"] == stats["requests"]:
+            # Report a rate limit in preference to other failures
+            errors.sort(key=lambda e: (e.rate_limited, e.retry_after or 0))
+            if errors:
+                error = errors[-1]
+                error.retry_after = self.retry_after
+                raise error
+            raise UpstreamError("Every tile request failed")
+        if stats["failed"]:
+            logger.warning(
+                f"{stats['failed']} of {stats['requests']} tile requests failed"
+            )
+        logger.debug(
+            f"Fetched {len(merged)} unique alerts in {stats['requests']} tile requests"
+        )
+        return list(merged.values())
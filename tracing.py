@@ -0,0 +1,218 @@
+import os
+import math
+import json
+import time
+import logging
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..100) of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class CycleTrace:
+    """Timings of one poll cycle (or coordinator batch)
+
+    ``spans`` are wall-clock times of the cycle's sequential phases.
+    ``busy`` sums the time spent in stages that run concurrently (tile
+    fetches, parsing, geocoding, notifying), so it can exceed the wall time.
+    """
+
+    def __init__(self, kind: str, regions: Iterable[str]):
+        self.kind = kind
+        self.regions = list(regions)
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self.spans: Dict[str, float] = {}
+        self.busy: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    def record(self) -> dict:
+        return {
+            "type": self.kind,
+            "ts": round(self.started, 3),
+            "pid": os.getpid(),
+            "regions": self.regions,
+            "seconds": round(time.perf_counter() - self._start, 6),
+            "spans": {k: round(v, 6) for k, v in self.spans.items()},
+            "busy": {k: round(v, 6) for k, v in self.busy.items()},
+            "counts": self.counts,
+        }
+
+
+# The cycle being traced; asyncio tasks started inside a cycle inherit it
+current_cycle: ContextVar[Optional[CycleTrace]] = ContextVar(
+    "current_cycle", default=None
+)
+
+
+@contextmanager
+def span(name: str):
+    """Time a sequential phase of the current cycle"""
+    cycle = current_cycle.get()
+    if cycle is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        cycle.spans[name] = cycle.spans.get(name, 0.0) + time.perf_counter() - start
+
+
+@contextmanager
+def stage(name: str):
+    """Time one call of a concurrent stage of the current cycle"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add(name, time.perf_counter() - start)
+
+
+def add(stage: str, seconds: float):
+    """Add time spent in a concurrent stage to the current cycle"""
+    cycle = current_cycle.get()
+    if cycle is not None:
+        cycle.busy[stage] = cycle.busy.get(stage, 0.0) + seconds
+
+
+def count(name: str, value: int):
+    cycle = current_cycle.get()
+    if cycle is not None:
+        cycle.counts[name] = cycle.counts.get(name, 0) + value
+
+
+def timed(stage: str, func):
+    """Wrap a function so its calls add to ``stage`` of the current cycle"""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            add(stage, time.perf_counter() - start)
+
+    return wrapper
+
+
+def timed_async(stage: str, func):
+    """Like ``timed`` for coroutine functions"""
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            add(stage, time.perf_counter() - start)
+
+    return wrapper
+
+
+class Tracer:
+    """Appends one JSON line per traced poll cycle and notification delivery"""
+
+    def __init__(self, path: str = None, enabled: Optional[bool] = None):
+        self.path = Path(path or os.getenv("TRACE_FILE", "poll_trace.jsonl"))
+        if enabled is None:
+            enabled = os.getenv("TRACE_ENABLED", "0") == "1"
+        self.enabled = enabled
+        self._file = None
+
+    def write(self, record: dict):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        # One write per line keeps lines whole when worker processes share the file
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    @contextmanager
+    def cycle(self, regions: Iterable[str], kind: str = "cycle"):
+        """Trace the enclosed cycle; a no-op while tracing is disabled"""
+        if not self.enabled:
+            yield None
+            return
+        trace = CycleTrace(kind, regions)
+        token = current_cycle.set(trace)
+        try:
+            yield trace
+        finally:
+            current_cycle.reset(token)
+            try:
+                self.write(trace.record())
+            except OSError as e:
+                logger.error(f"Could not write trace to {self.path}: {e}")
+
+    def delivery(self, channel: str, seconds: float, success: bool):
+        """Deliveries run in the outbox's background task, outside any cycle"""
+        if not self.enabled:
+            return
+        self.write(
+            {
+                "type": "delivery",
+                "ts": round(time.time(), 3),
+                "channel": channel,
+                "seconds": round(seconds, 6),
+                "success": success,
+            }
+        )
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_trace(path: Path, last: int) -> List[dict]:
+    """The last ``last`` cycles and batches of a trace file, with their deliveries"""
+    cycles: deque = deque(maxlen=last)
+    deliveries: List[dict] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A monitor killed mid-write can leave a partial last line
+                continue
+            if record.get("type") == "delivery":
+                deliveries.append(record)
+            else:
+                cycles.append(record)
+    if cycles:
+        since = min(record["ts"] for record in cycles)
+        deliveries = [record for record in deliveries if record["ts"] >= since]
+    return list(cycles) + deliveries
+
+
+def summarize(records: Iterable[dict]) -> Dict[str, List[float]]:
+    """Seconds per stage, keyed like "cycle", "span:fetch" or "deliver:pushover" """
+    stages: Dict[str, List[float]] = {}
+    for record in records:
+        kind = record.get("type")
+        if kind == "delivery":
+            stages.setdefault(f"deliver:{record['channel']}", []).append(
+                record["seconds"]
+            )
+            continue
+        stages.setdefault(kind, []).append(record["seconds"])
+        for name, seconds in record.get("spans", {}).items():
+            stages.setdefault(f"span:{name}", []).append(seconds)
+        for name, seconds in record.get("busy", {}).items():
+            stages.setdefault(f"busy:{name}", []).append(seconds)
+    return stages
@@ -0,0 +1,275 @@
+import time
+import queue
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from regions import Region, bounds_overlap
+
+if TYPE_CHECKING:
+    # Imported when a pool is created, so single-process runs never load it
+    import multiprocessing
+
+    from rules import Rule, RuleSet
+
+logger = logging.getLogger(__name__)
+
+# Separates a region's name from its stripe number in worker shards
+SHARD_SEPARATOR = "#"
+
+
+def base_name(name: str) -> str:
+    """The configured region name of a (possibly split) worker shard region"""
+    return name.split(SHARD_SEPARATOR, 1)[0]
+
+
+def route_alert(
+    alert: dict, regions: Iterable[Region], rule_set: "RuleSet"
+) -> Tuple[List[Region], Optional[List["Rule"]]]:
+    """The regions watching an alert and the rules that fire for it
+
+    Rules name configured regions, so shard stripes match as their base region.
+    """
+    matching = [region for region in regions if region.matches(alert)]
+    if not matching:
+        return matching, None
+    names = (base_name(region.name) for region in matching)
+    return matching, rule_set.match(alert, names)
+
+
+def region_area(region: Region) -> float:
+    b = region.bounds
+    return (b["top"] - b["bottom"]) * (b["right"] - b["left"])
+
+
+def split_region(region: Region, parts: int) -> List[Region]:
+    """Split a region into ``parts`` equal-width longitude stripes"""
+    if parts <= 1:
+        return [region]
+    b = region.bounds
+    width = (b["right"] - b["left"]) / parts
+    return [
+        replace(
+            region,
+            name=f"{region.name}{SHARD_SEPARATOR}{i}",
+            bounds={
+                **b,
+                "left": b["left"] + i * width,
+                "right": b["right"] if i == parts - 1 else b["left"] + (i + 1) * width,
+            },
+            alert_types=list(region.alert_types),
+        )
+        for i in range(parts)
+    ]
+
+
+def overlap_groups(regions: List[Region]) -> List[List[Region]]:
+    """Regions grouped into connected sets of overlapping bounding boxes"""
+    groups: List[List[Region]] = []
+    for region in regions:
+        touching = [
+            g for g in groups if any(bounds_overlap(region.bounds, r.bounds) for r in g)
+        ]
+        merged = [region] + [r for g in touching for r in g]
+        groups = [g for g in groups if g not in touching] + [merged]
+    return groups
+
+
+def shard_regions(regions: List[Region], workers: int) -> List[List[Region]]:
+    """Partition regions across workers, balancing the area each one polls
+
+    Overlapping regions stay in the same shard so an alert inside several of
+    them is still routed to all of them at once. While there are fewer groups
+    than workers, the largest single region is split into stripes.
+    """
+    groups = overlap_groups(regions)
+    while len(groups) < workers:
+        singles = [g for g in groups if len(g) == 1]
+        if not singles:
+            break
+        largest = max(singles, key=lambda g: region_area(g[0]))
+        groups.remove(largest)
+        # Split into as many stripes as there are idle workers, plus itself
+        parts = workers - len(groups)
+        groups.extend([stripe] for stripe in split_region(largest[0], parts))
+
+    shards: List[List[Region]] = [[] for _ in range(min(workers, len(groups)))]
+    loads = [0.0] * len(shards)
+    for group in sorted(groups, key=lambda g: -sum(region_area(r) for r in g)):
+        lightest = loads.index(min(loads))
+        shards[lightest].extend(group)
+        loads[lightest] += sum(region_area(r) for r in group)
+    return shards
+
+
+class ForwardFilter:
+    """UUIDs a worker already handed to the coordinator
+
+    An alert stays in the live map for as long as it is active, so each
+    worker only forwards an alert the first time it sees it; the coordinator
+    has already deduplicated the rest. Entries expire with the alert cache's
+    duration, so expiry and re-notification behave as with one process.
+    """
+
+    def __init__(self, duration_hours: float, max_entries: int = 0):
+        self.duration_seconds = duration_hours * 3600
+        self.max_entries = max_entries
+        self.forwarded: "OrderedDict[str, float]" = OrderedDict()
+
+    def admit(self, uuid: Optional[str]) -> bool:
+        if not uuid:
+            return True
+        now = time.monotonic()
+        while self.forwarded:
+            oldest, seen_at = next(iter(self.forwarded.items()))
+            if now - seen_at <= self.duration_seconds and (
+                not self.max_entries or len(self.forwarded) < self.max_entries
+            ):
+                break
+            del self.forwarded[oldest]
+        if uuid in self.forwarded:
+            return False
+        self.forwarded[uuid] = now
+        return True
+
+
+class FeedForwarder:
+    """Stands in for the AlertFeed in a worker process
+
+    Every poll's feed update is sent to the coordinator, which serves the
+    feed, so its snapshot covers all shards rather than only new alerts.
+    """
+
+    enabled = True
+
+    def __init__(self, index: int, queue):
+        self.index = index
+        self.queue = queue
+
+    def update(
+        self,
+        polled_regions: Iterable[str],
+        alerts: List[dict],
+        alert_regions: Dict[str, List[str]],
+    ):
+        self.queue.put(
+            ("feed", self.index, (list(polled_regions), alerts, alert_regions))
+        )
+
+    def publish_new(self, alert: dict, regions: Iterable[str], street_name=None):
+        """Workers never notify; the coordinator publishes new alerts"""
+
+
+class WorkerPool:
+    """Worker processes, one per shard, reporting to the coordinator over a queue
+
+    Every worker is called as ``target(index, shard, queue, *args)``. Workers
+    that die are restarted with the same shard unless ``restart`` is off.
+    """
+
+    def __init__(
+        self,
+        target: Callable,
+        shards: Sequence[List[Region]],
+        args: Tuple = (),
+        restart: bool = True,
+    ):
+        self.target = target
+        self.shards = list(shards)
+        self.args = args
+        self.restart = restart
+        # Spawned rather than forked, so workers (including restarts made
+        # while the coordinator's event loop runs) start from a clean state
+        from multiprocessing import get_context
+
+        self.context = get_context("spawn")
+        self.queue = self.context.Queue()
+        self.processes: List[Optional["multiprocessing.Process"]] = [None] * len(
+            self.shards
+        )
+        # Held while resharding, so reap() does not restart stopped workers
+        self._lock = threading.Lock()
+
+    def _spawn(self, index: int):
+        process = self.context.Process(
+            target=self.target,
+            args=(index, self.shards[index], self.queue, *self.args),
+            name=f"waze-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        self.processes[index] = process
+
+    def start(self):
+        for index, shard in enumerate(self.shards):
+            self._spawn(index)
+            logger.info(
+                f"Worker {index} (pid {self.processes[index].pid}) polls "
+                f"{', '.join(region.name for region in shard)}"
+            )
+
+    def get(self, timeout: float = 1.0) -> Optional[Tuple[str, int, Any]]:
+        """Next (kind, worker index, payload) message, or None on timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def reap(self):
+        """Restart workers that crashed; ones that exited cleanly are left alone"""
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._reap()
+        finally:
+            self._lock.release()
+
+    def _reap(self):
+        for index, process in enumerate(self.processes):
+            if process is None or process.is_alive() or process.exitcode == 0:
+                continue
+            logger.error(f"Worker {index} exited with code {process.exitcode}")
+            if self.restart:
+                self._spawn(index)
+            else:
+                self.processes[index] = None
+
+    def reshard(self, shards: Sequence[List[Region]], args: Tuple = None):
+        """Replace every worker with one per new shard (after a config reload)
+
+        Blocks while the old workers stop and the new ones spawn; callers on
+        an event loop run it in an executor.
+        """
+        with self._lock:
+            self.stop()
+            # Terminated workers may have left the old queue half-written
+            self.queue = self.context.Queue()
+            self.shards = list(shards)
+            if args is not None:
+                self.args = args
+            self.processes = [None] * len(self.shards)
+            self.start()
+
+    @property
+    def alive(self) -> bool:
+        return any(p is not None and p.is_alive() for p in self.processes)
+
+    def stop(self, timeout: float = 5.0):
+        for process in self.processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+        for process in self.processes:
+            if process is not None:
+                process.join(timeout)